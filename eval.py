@@ -103,7 +103,8 @@
 
 # Import the modules from the package subfolder regardless whether it is
 # installed as a package.
-from udtools.src.udtools.udeval import evaluate_wrapper, build_evaluation_table
+import sys
+from udtools.src.udtools.udeval import evaluate_wrapper, evaluate_systems_wrapper, build_evaluation_table, build_systems_table, build_evaluation_json
 from udtools.src.udtools.argparser import parse_args_scorer
 
 
@@ -112,10 +113,23 @@ def main():
     # Parse arguments
     args = parse_args_scorer()
 
-    # Evaluate
-    evaluation = evaluate_wrapper(args)
-    results = build_evaluation_table(evaluation, args.verbose, args.counts, args.enhanced)
+    # Evaluate (the same as udtools.cli.main_eval())
+    if not args.more_system_files and args.format == 'text':
+        evaluation = evaluate_wrapper(args)
+        results = build_evaluation_table(evaluation, args.verbose, args.counts, args.enhanced)
+        print(results)
+        return 0
+    # Evaluate several system files against the same gold data.
+    system_paths = [args.system_file] + args.more_system_files
+    evaluations = evaluate_systems_wrapper(args)
+    if args.format == 'json':
+        results = build_evaluation_json(system_paths, evaluations, args.enhanced)
+    else:
+        results = build_systems_table(system_paths, evaluations, args.counts, args.enhanced)
     print(results)
+    if any(isinstance(evaluation, Exception) for evaluation in evaluations):
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -51,6 +51,10 @@ def trees(inp):
     `inp` a file-like object yielding lines as unicode
     
     Yields the input a tree at a time.
+
+    The input is read linearly: the only user (overlap.py) needs every tree
+    of every file. To read selected sentences of a file by their ids or line
+    numbers, use udtools.index.SentenceIndex instead.
     """
     comments=[] #List of comment lines to go with the current tree
     lines=[] #List of token/word lines of the current tree
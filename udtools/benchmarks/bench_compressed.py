@@ -0,0 +1,69 @@
+#! /usr/bin/env python3
+"""
+Measures the validation of compressed files: the file is validated
+uncompressed, compressed with decompression in a reader thread, compressed
+with decompression in the main thread (the default), and decompressed to a
+temporary file first (what users had to do before).
+
+Usage: python udtools/benchmarks/bench_compressed.py [file.conllu] [--copies N] [--level N]
+(run from the root folder of tools; the default input is the Czech PUD test
+case, repeated N times).
+"""
+import argparse
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.state import State
+from udtools.src.udtools.compression import open_text
+
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--copies', type=int, default=10)
+    parser.add_argument('--level', type=int, default=1)
+    args = parser.parse_args()
+    with open(args.input, 'rb') as f:
+        data = f.read() * args.copies
+    validator = Validator(lang='ud', level=args.level, output=None, jobs=1)
+    def validate(inp):
+        state = State()
+        start = time.perf_counter()
+        validator.validate_file_handle(inp, state)
+        return time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plain = os.path.join(tmpdir, 'input.conllu')
+        with open(plain, 'wb') as f:
+            f.write(data)
+        print(f'{args.input} x {args.copies}: {len(data)/1e6:.1f} MB, level {args.level}')
+        with open_text(plain) as inp:
+            print(f'uncompressed           {validate(inp):7.3f} s')
+        for module, suffix in ((gzip, 'gz'), (lzma, 'xz')):
+            path = f'{plain}.{suffix}'
+            with open(path, 'wb') as f:
+                f.write(module.compress(data))
+            with open_text(path, threaded=True) as inp:
+                t_thread = validate(inp)
+            with open_text(path) as inp:
+                t_main = validate(inp)
+            start = time.perf_counter()
+            with module.open(path, 'rb') as src, open(plain + '.tmp', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            with open_text(plain + '.tmp') as inp:
+                validate(inp)
+            t_temp = time.perf_counter() - start
+            print(f'{suffix}, reader thread       {t_thread:7.3f} s')
+            print(f'{suffix}, main thread         {t_main:7.3f} s')
+            print(f'{suffix}, temporary file      {t_temp:7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+"""
+Measures how the time of Level6.check_misc_entity() scales with the length
+of a document. The synthetic document introduces new entities in every
+sentence, so the number of entities seen so far grows with the document;
+each sentence has nested mentions that are closed in the opposite order
+(i.e., they are ill-nested, so the closing brackets do not match the
+innermost open mention). The time per sentence should not grow with the
+number of sentences.
+
+Usage: python udtools/benchmarks/bench_coref.py [--sentences N ...] [--depth D]
+(run from the root folder of tools).
+"""
+import argparse
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.state import State
+
+
+
+def make_document(n_sentences, depth):
+    """
+    Returns the CoNLL-U text of a document with n_sentences sentences, each
+    with depth mentions of new entities plus one mention of an entity from
+    the first sentence.
+    """
+    lines = ['# newdoc id = d1', '# global.Entity = eid-etype-head-other']
+    n_words = 2 * depth + 1
+    for s in range(n_sentences):
+        lines.append(f'# sent_id = s{s}')
+        lines.append('# text = ' + ' '.join(['w'] * n_words))
+        eids = [f'e{s}x{i}' for i in range(depth)]
+        for i in range(n_words):
+            if i < depth:
+                misc = f'Entity=({eids[i]}-person-1'
+            elif i == depth:
+                misc = 'Entity=(e0x0-person-1)'
+            else:
+                # Close the outermost open mention first.
+                misc = f'Entity={eids[i-depth-1]})'
+            lines.append(f'{i+1}\tw\tw\tX\t_\t_\t{0 if i == 0 else 1}\t{"root" if i == 0 else "dep"}\t_\t{misc}')
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sentences', type=int, nargs='+', default=[1000, 2000, 4000])
+    parser.add_argument('--depth', type=int, default=8)
+    args = parser.parse_args()
+    for n in args.sentences:
+        text = make_document(n, args.depth)
+        validator = Validator(lang='ud', level=2, check_coref=True, output=None, jobs=1, profile_checks=True)
+        start = time.perf_counter()
+        validator.validate_file_handle(io.StringIO(text), State())
+        t_validate = time.perf_counter() - start
+        level, calls, seconds, incidents = validator.profiler.stats['check_misc_entity']
+        print(f'{n:6} sentences: check_misc_entity {seconds:7.3f} s ({1e6*seconds/calls:7.1f} us/sentence), validation {t_validate:7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#! /usr/bin/env python3
+"""
+Measures the dispatch of the tests of individual nodes: the level 3 tests of
+the basic tree (and the level 4 and 5 tests of all nodes with --level 5) are
+run on prepared sentences either by calling every test for every node, or by
+calling only the tests that the udtools.dispatch.NodeDispatcher selects.
+
+Usage: python udtools/benchmarks/bench_dispatch.py [file.conllu] [--copies N] [--level N] [--lang L]
+(run from the root folder of tools; the default input is the Czech PUD test
+case).
+"""
+import argparse
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.state import State
+from udtools.src.udtools.sentence import Sentence, SentenceContext
+import udtools.src.udtools.utils as utils
+
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--copies', type=int, default=3)
+    parser.add_argument('--level', type=int, default=3)
+    parser.add_argument('--lang', default='cs')
+    args = parser.parse_args()
+    with open(args.input, encoding='utf-8') as f:
+        text = f.read() * args.copies
+    validator = Validator(lang=args.lang, level=args.level, output=None, jobs=1)
+    node_dispatcher, basic_dispatcher = validator.get_node_dispatchers()
+    # The trees and contexts are built in advance; only the tests are timed.
+    state = State()
+    sentences = []
+    for lines in utils.next_sentence(state, io.StringIO(text)):
+        table = [l.split('\t') for l in lines if l and l[0].isdigit()]
+        linenos = {cols[0]: i for i, cols in enumerate(table)}
+        root = Sentence(table).root
+        sentences.append((root, linenos, SentenceContext(root, linenos)))
+    node_checks = [x[0] for x in node_dispatcher.checks]
+    basic_checks = [x[0] for x in basic_dispatcher.checks]
+
+    def run_all():
+        for root, linenos, context in sentences:
+            state.current_node_linenos = linenos
+            for node in root.descendants_and_empty:
+                for check in node_checks:
+                    check(state, node)
+            for node in root.descendants:
+                for check in basic_checks:
+                    check(state, node, context)
+
+    def run_dispatched():
+        for root, linenos, context in sentences:
+            state.current_node_linenos = linenos
+            for node in root.descendants_and_empty:
+                for check in node_dispatcher.select(context.udeprel(node), node.upos):
+                    check(state, node)
+            for node in root.descendants:
+                for check in basic_dispatcher.select(context.udeprel(node), node.upos):
+                    check(state, node, context)
+
+    print(f'{args.input} x {args.copies}: {len(sentences)} sentences, level {args.level}')
+    for name, function in (('all tests for every node', run_all), ('dispatched tests', run_dispatched)):
+        best = None
+        for i in range(3):
+            start = time.perf_counter()
+            function()
+            seconds = time.perf_counter() - start
+            best = seconds if best == None or seconds < best else best
+        print(f'{name:30} {best:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
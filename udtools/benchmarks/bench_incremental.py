@@ -0,0 +1,57 @@
+#! /usr/bin/env python3
+"""
+Measures incremental validation (udvalidate --incremental): the time of
+validating a file without the cache, with an empty cache, with the cache of
+the same file, and with the cache after one sentence has been edited.
+
+Usage: python udtools/benchmarks/bench_incremental.py [file.conllu] [--lang xx]
+(run from the root folder of tools; the default input is the Czech PUD test
+case).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--lang', default='cs')
+    args = parser.parse_args()
+    with open(args.input, encoding='utf-8') as f:
+        sentences = f.read().rstrip('\n').split('\n\n')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'input.conllu')
+        cachedir = os.path.join(tmpdir, 'cache')
+        data = Validator(lang=args.lang).data
+        def run(incremental):
+            validator = Validator(lang=args.lang, output=None, incremental=incremental, data=data)
+            start = time.perf_counter()
+            validator.validate_files([path])
+            return time.perf_counter() - start
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n\n'.join(sentences) + '\n\n')
+        run(False) # load the data of the language
+        t_plain = run(False)
+        t_cold = run(cachedir)
+        t_warm = run(cachedir)
+        # Edit one sentence in the middle: add a comment.
+        sentences[len(sentences)//2] = '# comment = edited\n' + sentences[len(sentences)//2]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n\n'.join(sentences) + '\n\n')
+        t_edited = run(cachedir)
+    print(f'{args.input}: {len(sentences)} sentences')
+    print(f'no cache         {t_plain:7.3f} s')
+    print(f'empty cache      {t_cold:7.3f} s')
+    print(f'same file        {t_warm:7.3f} s   speedup {t_plain/t_warm:6.1f}x')
+    print(f'1 sentence edited {t_edited:6.3f} s   speedup {t_plain/t_edited:6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
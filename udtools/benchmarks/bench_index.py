@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+"""
+Measures the sentence index (udtools.index.SentenceIndex): the time to build
+it and to load it from the sidecar file, its size, and the time to validate
+one sentence found by its id, compared with validating the whole file (the
+only way before the index).
+
+Usage: python udtools/benchmarks/bench_index.py [file.conllu] [--copies N] [--lang xx]
+(run from the root folder of tools; the default input is the Czech PUD test
+case, repeated N times with new sentence ids, in a temporary folder).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.index import SentenceIndex
+
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--copies', type=int, default=10)
+    parser.add_argument('--lang', default='cs')
+    args = parser.parse_args()
+    with open(args.input, encoding='utf-8') as f:
+        text = f.read()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'input.conllu')
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(args.copies):
+                f.write(text.replace('# sent_id = ', f'# sent_id = c{i}-'))
+        start = time.perf_counter()
+        index = SentenceIndex.for_file(path)
+        t_build = time.perf_counter() - start
+        start = time.perf_counter()
+        index = SentenceIndex.for_file(path)
+        t_load = time.perf_counter() - start
+        n = len(index)
+        sent_id = list(index.sent_ids)[n // 2]
+        index.close()
+        mb = os.path.getsize(path) / 1e6
+        kb = os.path.getsize(path + '.udindex') / 1e3
+
+        validator = Validator(lang=args.lang, output=None, jobs=1)
+        validator.validate_files([path], sent_ids=[sent_id])
+        start = time.perf_counter()
+        validator.validate_files([path], sent_ids=[sent_id])
+        t_one = time.perf_counter() - start
+        start = time.perf_counter()
+        validator.validate_files([path])
+        t_all = time.perf_counter() - start
+
+    print(f'{args.input} x {args.copies}: {mb:.1f} MB, {n} sentences, index {kb:.1f} kB ({1000*kb/n:.1f} bytes/sentence)')
+    print(f'build index            {t_build:8.3f} s')
+    print(f'load index             {t_load:8.3f} s')
+    print(f'validate 1 by sent_id  {t_one:8.3f} s')
+    print(f'validate whole file    {t_all:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#! /usr/bin/env python3
+"""
+Measures the speed of level 1 validation (udvalidate --level 1) in MB/s and
+compares it with the speed of merely reading the lines of the file, which is
+the limit for a validator that looks at every line.
+
+Usage: python udtools/benchmarks/bench_level1.py [file.conllu] [--copies N]
+(run from the root folder of tools; the default input is the Czech PUD test
+case, repeated N times).
+"""
+import argparse
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.state import State
+import udtools.src.udtools.utils as utils
+
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--copies', type=int, default=10)
+    args = parser.parse_args()
+    with open(args.input, encoding='utf-8') as f:
+        text = f.read() * args.copies
+    mb = len(text.encode('utf-8')) / 1e6
+
+    start = time.perf_counter()
+    for sentence in utils.next_sentence(State(), io.StringIO(text)):
+        pass
+    t_read = time.perf_counter() - start
+
+    validator = Validator(lang='ud', level=1, output=None, jobs=1)
+    state = State()
+    start = time.perf_counter()
+    validator.validate_file_handle(io.StringIO(text), state)
+    t_validate = time.perf_counter() - start
+
+    print(f'{args.input} x {args.copies}: {mb:.1f} MB, {state.current_line} lines')
+    print(f'reading lines      {t_read:7.3f} s  {mb/t_read:7.1f} MB/s')
+    print(f'level 1 validation {t_validate:7.3f} s  {mb/t_validate:7.1f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
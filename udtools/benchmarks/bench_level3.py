@@ -0,0 +1,53 @@
+#! /usr/bin/env python3
+"""
+Measures the time spent in the level 3 tests of individual nodes (the checks
+that Validator.validate_sentence() calls for every node, which share the
+udtools.sentence.SentenceContext of the sentence), and the time of the whole
+level 3 validation.
+
+Usage: python udtools/benchmarks/bench_level3.py [file.conllu] [--copies N]
+(run from the root folder of tools; the default input is the Czech PUD test
+case, repeated N times).
+"""
+import argparse
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.level3 import Level3
+from udtools.src.udtools.state import State
+
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--copies', type=int, default=3)
+    args = parser.parse_args()
+    with open(args.input, encoding='utf-8') as f:
+        text = f.read() * args.copies
+
+    validator = Validator(lang='ud', level=3, output=None, jobs=1)
+    start = time.perf_counter()
+    state = validator.validate_file_handle(io.StringIO(text), State())
+    t_validate = time.perf_counter() - start
+    validator = Validator(lang='ud', level=3, output=None, jobs=1, profile_checks=True)
+    validator.validate_file_handle(io.StringIO(text), State())
+    stats = validator.profiler.stats
+
+    print(f'{args.input} x {args.copies}: {state.current_line} lines')
+    total = 0.0
+    for name in Level3.__dict__:
+        if name.startswith('check_') and name in stats and stats[name][1] > 0:
+            level, calls, seconds, incidents = stats[name]
+            total += seconds
+            print(f'{name:40} {calls:8} calls {1e6*seconds/calls:8.2f} us/call')
+    print(f'{"level 3 checks":40} {total:8.3f} s')
+    print(f'{"level 3 validation (not profiled)":40} {t_validate:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+"""
+Measures the cost of printing the incidents in the text format and in the
+JSON Lines format (--format jsonl), under a heavy error load: the input is
+validated at level 5 with a language whose data do not match it (so that
+almost every node has an error). The incidents found are then printed again
+in each format to a pipe, the way validate.py prints them (text to the
+line-buffered stderr, JSON Lines to a block-buffered stream), so that the
+time of the output is measured without the time of the tests.
+
+Usage: python udtools/benchmarks/bench_output.py [file.conllu] [--lang xx] [--repeat N]
+(run from the root folder of tools; the default input is the Czech PUD test
+case, validated as Slovak).
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.state import State
+
+
+
+def replay(incidents, output, format):
+    state = State()
+    config = {'output': output, 'max_err': 0, 'max_store': 1, 'format': format}
+    start = time.perf_counter()
+    for incident in incidents:
+        incident.state = state
+        incident.config = config
+        incident.confirm()
+    output.flush()
+    return time.perf_counter() - start
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--lang', default='sk')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    validator = Validator(lang=args.lang, level=5, output=None)
+    state = validator.validate_files([args.input])
+    incidents = state.error_tracker
+    n = len(incidents)
+    # Read the pipe in another thread, as the consumer of the output would.
+    rfd, wfd = os.pipe()
+    reader = threading.Thread(target=lambda: [x for x in iter(lambda: os.read(rfd, 1<<16), b'')])
+    reader.start()
+    text = open(wfd, 'w', encoding='utf-8', buffering=1, closefd=False)
+    jsonl = open(wfd, 'w', encoding='utf-8', buffering=1<<16, closefd=False)
+    t_text = min(replay(incidents, text, 'text') for i in range(args.repeat))
+    t_jsonl = min(replay(incidents, jsonl, 'jsonl') for i in range(args.repeat))
+    os.close(wfd)
+    reader.join()
+    os.close(rfd)
+    print(f'{args.input}: {n} incidents')
+    print(f'text   {t_text/n*1e6:7.3f} us/incident')
+    print(f'jsonl  {t_jsonl/n*1e6:7.3f} us/incident   speedup {t_text/t_jsonl:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+"""
+Measures the per-node cost of the language-specific lookups of the level 4
+and 5 tests: the lookups in the JSON records of the language (the way the
+validator used to do them) and in the compiled LanguageProfile (the way it
+does them now). Then it measures the per-node cost of the level 4 and 5 tests
+as a whole.
+
+Usage: python udtools/benchmarks/bench_profile.py [file.conllu] [--lang xx] [--repeat N]
+(run from the root folder of tools; the default input is the Czech PUD test
+case).
+"""
+import argparse
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.sentence import Sentence
+from udtools.src.udtools.state import State
+
+
+
+def read_nodes(path):
+    with open(path, encoding='utf-8') as f:
+        blocks = f.read().split('\n\n')
+    nodes = []
+    for b in blocks:
+        lines = [l.split('\t') for l in b.split('\n') if l and not l.startswith('#')]
+        if lines:
+            nodes.extend(Sentence(lines).root.descendants)
+    return nodes
+
+
+def lookup_records(data, lang, nodes):
+    featset = data.get_feats_for_language(lang)
+    deprelset = data.get_deprel_for_language(lang)
+    auxlist = data.get_aux_for_language(lang)
+    coplist = data.get_cop_for_language(lang)
+    for node in nodes:
+        for f in node.feats:
+            for v in node.feats[f].split(','):
+                if f in featset:
+                    lfrecord = featset[f]
+                    if lfrecord['permitted'] != 0:
+                        values = lfrecord['uvalues'] + lfrecord['lvalues'] + lfrecord['unused_uvalues'] + lfrecord['unused_lvalues']
+                        if v in values and node.upos in lfrecord['byupos']:
+                            v in lfrecord['byupos'][node.upos] and lfrecord['byupos'][node.upos][v] != 0
+        node.deprel in deprelset
+        node.lemma in auxlist
+        node.lemma in coplist
+
+
+def lookup_profile(data, lang, nodes):
+    profile = data.get_profile(lang)
+    for node in nodes:
+        for f in node.feats:
+            for v in node.feats[f].split(','):
+                if f in profile.permitted_features and v in profile.feature_values[f]:
+                    (f, node.upos) in profile.feature_upos and (f, node.upos, v) in profile.feature_upos_values
+        node.deprel in profile.deprels
+        node.lemma in profile.aux
+        node.lemma in profile.cop
+
+
+def run_checks(validator, nodes):
+    state = State()
+    state.current_node_linenos = {str(node.ord): 0 for node in nodes}
+    for node in nodes:
+        validator.check_feature_values(state, node)
+        validator.check_deprels(state, node)
+        validator.check_auxiliary_verbs(state, node)
+        validator.check_copula_lemmas(state, node)
+
+
+def best_of(repeat, function):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--lang', default='cs')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    nodes = read_nodes(args.input)
+    print(f'{args.input}: {len(nodes)} nodes')
+    validator = Validator(lang=args.lang, level=5, output=io.StringIO())
+    data = validator.data
+    # Build the profile and the cached lists before timing.
+    lookup_records(data, args.lang, nodes)
+    lookup_profile(data, args.lang, nodes)
+    t_records = best_of(args.repeat, lambda: lookup_records(data, args.lang, nodes))
+    t_profile = best_of(args.repeat, lambda: lookup_profile(data, args.lang, nodes))
+    t_checks = best_of(args.repeat, lambda: run_checks(validator, nodes))
+    n = len(nodes)
+    print(f'lookups  records {t_records/n*1e6:7.3f} us/node   profile {t_profile/n*1e6:7.3f} us/node   speedup {t_records/t_profile:5.2f}x')
+    print(f'level 4-5 checks {t_checks/n*1e6:7.3f} us/node')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+"""
+Measures the tests of projectivity (check_projective_punctuation() and
+check_functional_leaves(), which use the projectivity index of the sentence)
+on long sentences: every N consecutive sentences of the input are glued to
+one sentence (the roots of the other sentences are attached to the root of
+the first one as parataxis).
+
+Usage: python udtools/benchmarks/bench_projectivity.py [file.conllu] [--join N] [--sentences N]
+(run from the root folder of tools; the default input is the Czech PUD test
+case).
+"""
+import argparse
+import io
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.state import State
+
+
+
+def join_sentences(sentences, n):
+    """
+    Glues every n sentences (lists of token lines, without comments) to one.
+    Multiword tokens and empty nodes are dropped.
+    """
+    for k in range(0, len(sentences), n):
+        lines = []
+        offset = 0
+        first_root = None
+        for sentence in sentences[k:k+n]:
+            words = [l.split('\t') for l in sentence if l.split('\t')[0].isdigit()]
+            for cols in words:
+                cols[0] = str(int(cols[0]) + offset)
+                if cols[6] == '0':
+                    if first_root == None:
+                        first_root = cols[0]
+                    else:
+                        cols[6], cols[7] = first_root, 'parataxis'
+                else:
+                    cols[6] = str(int(cols[6]) + offset)
+                cols[8] = '_'
+                lines.append('\t'.join(cols))
+            offset += len(words)
+        yield lines
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--join', type=int, default=15)
+    parser.add_argument('--sentences', type=int, default=1000)
+    args = parser.parse_args()
+    with open(args.input, encoding='utf-8') as f:
+        sentences = [s.split('\n') for s in f.read().split('\n\n') if s.strip()][:args.sentences]
+    text = ''.join(f'# sent_id = s{i}\n' + '\n'.join(lines) + '\n\n' for i, lines in enumerate(join_sentences(sentences, args.join)))
+    n = text.count('\n\n')
+    validator = Validator(lang='ud', level=3, output=None, jobs=1, profile_checks=True)
+    state = validator.validate_file_handle(io.StringIO(text), State())
+    print(f'{args.input}: {n} sentences of {args.join} joined sentences, {(text.count(chr(10)) - 2 * n) / n:.0f} words per sentence')
+    stats = validator.profiler.stats
+    for name in ('check_projective_punctuation', 'check_functional_leaves'):
+        level, calls, seconds, incidents = stats[name]
+        print(f'{name:30} {calls:8} calls {seconds:8.3f} s {1e6*seconds/calls:8.1f} us/call {sum(incidents.values()):6} incidents')
+    print(f'{"all checks":30} {sum(x[1] for x in stats.values()):8} calls {sum(x[2] for x in stats.values()):8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
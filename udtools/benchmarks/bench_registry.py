@@ -0,0 +1,75 @@
+#! /usr/bin/env python3
+"""
+Measures the memory taken by the registries of sentence ids and parallel ids
+(State.known_sent_ids etc.) with built-in sets and dicts (the way the
+validator used to keep them) and with IdSet and IdMap (the way it keeps them
+now), and the time of the lookups and insertions done for each sentence.
+
+The ids are synthetic but have the shapes of real ones: sentence ids with a
+file prefix and a number, and parallel ids with a corpus prefix and a
+sentence number, some with altN/partN suffixes (only the part before the
+suffix is a key of the dicts).
+
+Usage: python udtools/benchmarks/bench_registry.py [--sentences N]
+(run from the root folder of tools).
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.registry import IdSet, IdMap
+
+
+
+def generate_ids(n):
+    # New string objects for every sentence, as if they were read from the
+    # input (the built-in set keeps them alive, IdSet does not).
+    for i in range(n):
+        yield f'{("train", "dev", "test")[i % 3]}-s{i}', f'pud/n{i // 2:08d}' + ('/alt2' if i % 2 else '')
+
+
+def register(n, known_sent_ids, known_parallel_ids, lastalt, lastpart):
+    # The same operations as in check_sent_id() and check_parallel_id().
+    for sid, pid in generate_ids(n):
+        if not sid in known_sent_ids:
+            known_sent_ids.add(sid)
+        if not pid in known_parallel_ids:
+            key = pid[:13]
+            if key in lastalt:
+                lastalt[key]
+            lastalt[key] = 2 if len(pid) > 13 else None
+            lastpart[key] = None
+            known_parallel_ids.add(pid)
+
+
+def measure(n, factory_set, factory_map):
+    # Time without tracing the allocations, then memory with tracing.
+    start = time.perf_counter()
+    register(n, factory_set(), factory_set(), factory_map(), factory_map())
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    registries = (factory_set(), factory_set(), factory_map(), factory_map())
+    register(n, *registries)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(registries[0]) == n
+    return memory, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sentences', type=int, default=100000)
+    args = parser.parse_args()
+    n = args.sentences
+    m_builtin, t_builtin = measure(n, set, dict)
+    m_registry, t_registry = measure(n, IdSet, IdMap)
+    print(f'{n} sentences')
+    print(f'set/dict     {m_builtin/2**20:8.1f} MiB  {m_builtin/n:6.1f} bytes/sentence  {t_builtin/n*1e6:6.3f} us/sentence')
+    print(f'IdSet/IdMap  {m_registry/2**20:8.1f} MiB  {m_registry/n:6.1f} bytes/sentence  {t_registry/n*1e6:6.3f} us/sentence')
+    print(f'memory saved {(m_builtin-m_registry)/2**20:8.1f} MiB ({100*(1-m_registry/m_builtin):.0f}%)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#! /usr/bin/env python3
+"""
+Compares the throughput of the validator at --level 5 when the tree of each
+sentence is built by udtools.sentence (the default) and when it is built by
+Udapi (the way the validator used to work). Udapi must be installed for the
+comparison.
+
+Usage: python udtools/benchmarks/bench_sentence.py [file.conllu] [--repeat N]
+(run from the root folder of tools; the default input is the Czech PUD test
+case).
+"""
+import argparse
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.sentence import Sentence
+
+
+
+class UdapiValidator(Validator):
+    """
+    Validator that builds the trees with Udapi as before.
+    """
+    def build_sentence(self, state):
+        return self.build_tree_udapi(state.current_lines)
+
+
+
+def read_sentences(path):
+    with open(path, encoding='utf-8') as f:
+        blocks = f.read().split('\n\n')
+    return [[l for l in b.split('\n') if l] for b in blocks if b.strip()]
+
+
+def best_of(repeat, function):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    sentences = read_sentences(args.input)
+    ntokens = sum(len([l for l in s if not l.startswith('#')]) for s in sentences)
+    print(f'{args.input}: {len(sentences)} sentences, {ntokens} token lines')
+
+    # Building the trees alone.
+    import udapi.block.read.conllu
+    reader = udapi.block.read.conllu.Conllu()
+    tables = [[l.split('\t') for l in s if not l.startswith('#')] for s in sentences]
+    t_udapi = best_of(args.repeat, lambda: [reader.read_tree_from_lines(s).descendants_and_empty for s in sentences])
+    t_sentence = best_of(args.repeat, lambda: [Sentence(t).root.descendants_and_empty for t in tables])
+    print(f'build trees  udapi {t_udapi:8.3f} s   udtools {t_sentence:8.3f} s   speedup {t_udapi/t_sentence:5.2f}x')
+
+    # Complete validation at level 5.
+    def validate(cls):
+        cls(lang='cs', level=5, output=io.StringIO()).validate_files([args.input])
+    t_udapi = best_of(args.repeat, lambda: validate(UdapiValidator))
+    t_sentence = best_of(args.repeat, lambda: validate(Validator))
+    print(f'--level 5    udapi {t_udapi:8.3f} s   udtools {t_sentence:8.3f} s   speedup {t_udapi/t_sentence:5.2f}x')
+    print(f'             udapi {len(sentences)/t_udapi:8.0f} sent/s  udtools {len(sentences)/t_sentence:8.0f} sent/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#! /usr/bin/env python3
+"""
+Measures the overhead of the validation server (udvalidate --serve) per
+sentence: the sentences are validated directly by a Validator, then sent to
+the server one sentence per request, and then all in one request.
+
+Usage: python udtools/benchmarks/bench_server.py [file.conllu] [--lang xx] [--sentences N]
+(run from the root folder of tools; the default input is the Czech PUD test
+case).
+"""
+import argparse
+import http.client
+import io
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools.validator import Validator
+from udtools.src.udtools.state import State
+from udtools.src.udtools.server import ValidationServer
+
+
+
+def main():
+    default = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', nargs='?', default=default)
+    parser.add_argument('--lang', default='cs')
+    parser.add_argument('--sentences', type=int, default=300)
+    args = parser.parse_args()
+    with open(args.input, encoding='utf-8') as f:
+        sentences = [s + '\n\n' for s in f.read().split('\n\n') if s.strip()][:args.sentences]
+    n = len(sentences)
+    validator = Validator(lang=args.lang, output=None, jobs=1)
+    # Warm up (load the data of the language).
+    validator.validate_file_handle(io.StringIO(sentences[0]), State())
+
+    start = time.perf_counter()
+    for s in sentences:
+        validator.validate_file_handle(io.StringIO(s), State())
+    t_direct = time.perf_counter() - start
+
+    server = ValidationServer(('localhost', 0), validator)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    connection = http.client.HTTPConnection('localhost', server.server_address[1])
+    def post(text):
+        connection.request('POST', '/validate', body=text.encode('utf-8'))
+        return connection.getresponse().read()
+    start = time.perf_counter()
+    for s in sentences:
+        post(s)
+    t_single = time.perf_counter() - start
+    start = time.perf_counter()
+    post(''.join(sentences))
+    t_batch = time.perf_counter() - start
+    connection.close()
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+    print(f'{args.input}: {n} sentences')
+    print(f'direct             {t_direct/n*1000:7.3f} ms/sentence')
+    print(f'server, 1 per req  {t_single/n*1000:7.3f} ms/sentence   overhead {(t_single-t_direct)/n*1000:7.3f} ms/sentence')
+    print(f'server, 1 request  {t_batch/n*1000:7.3f} ms/sentence   overhead {(t_batch-t_direct)/n*1000:7.3f} ms/sentence')
+
+
+if __name__ == '__main__':
+    main()
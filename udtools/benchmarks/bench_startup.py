@@ -0,0 +1,58 @@
+#! /usr/bin/env python3
+"""
+Measures how long it takes to validate a one-sentence file in a new process,
+which is dominated by the start-up of the validator (importing the modules and
+loading the validation data). The time is measured with and without the
+snapshot of the validation data (see udtools.data.Data.load()).
+
+Usage: python udtools/benchmarks/bench_startup.py [--lang xx] [--repeat N]
+(run from the root folder of tools).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SENTENCE = """# sent_id = 1
+# text = Hello world!
+1	Hello	hello	INTJ	_	_	0	root	_	_
+2	world	world	NOUN	_	_	1	vocative	_	SpaceAfter=No
+3	!	!	PUNCT	_	_	1	punct	_	_
+
+"""
+
+
+def run(validate, inputfile, lang, cachedir, repeat):
+    env = dict(os.environ, UDTOOLS_CACHE_DIR=cachedir)
+    command = [sys.executable, validate, '--lang', lang, inputfile]
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    validate = os.path.join(os.path.dirname(__file__), '..', '..', 'validate.py')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        inputfile = os.path.join(tmpdir, 'one.conllu')
+        with open(inputfile, 'w', encoding='utf-8') as f:
+            f.write(SENTENCE)
+        cachedir = os.path.join(tmpdir, 'cache')
+        t_json = run(validate, inputfile, args.lang, '', args.repeat)
+        # The first run creates the snapshot.
+        run(validate, inputfile, args.lang, cachedir, 1)
+        t_snapshot = run(validate, inputfile, args.lang, cachedir, args.repeat)
+    print(f'validate.py --lang {args.lang} one sentence (best of {args.repeat}):')
+    print(f'  JSON files {t_json:6.3f} s   snapshot {t_snapshot:6.3f} s   speedup {t_json/t_snapshot:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#! /usr/bin/env python3
+"""
+Measures the evaluator (udtools.udeval): the time of load_conllu() and the
+memory taken by the loaded gold data, and the time of evaluate().
+
+Usage: python udtools/benchmarks/bench_udeval.py [gold.conllu system.conllu] [--copies N]
+(run from the root folder of tools; the default input is the Czech PUD gold
+data and UDPipe output from the test cases, repeated N times; 54 copies have
+about one million words).
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from udtools.src.udtools import udeval
+
+
+
+def main():
+    cases = os.path.join(os.path.dirname(__file__), '..', 'tests', 'test-cases', 'eval')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('gold', nargs='?', default=os.path.join(cases, 'cs_pud-gold.conllu'))
+    parser.add_argument('system', nargs='?', default=os.path.join(cases, 'cs_pud-udpipe-pdtc-ud-2.17-251125.conllu'))
+    parser.add_argument('--copies', type=int, default=5)
+    args = parser.parse_args()
+    texts = []
+    for path in (args.gold, args.system):
+        with open(path, encoding='utf-8') as f:
+            texts.append(f.read() * args.copies)
+
+    # Memory of the gold data (loaded again below without the time overhead
+    # of tracing).
+    tracemalloc.start()
+    traced_ud = udeval.load_conllu(io.StringIO(texts[0]), args.gold, {})
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del traced_ud
+    start = time.perf_counter()
+    gold_ud = udeval.load_conllu(io.StringIO(texts[0]), args.gold, {})
+    t_load = time.perf_counter() - start
+    system_ud = udeval.load_conllu(io.StringIO(texts[1]), args.system, {})
+    start = time.perf_counter()
+    udeval.evaluate(gold_ud, system_ud)
+    t_evaluate = time.perf_counter() - start
+
+    print(f'{args.gold} x {args.copies}: {len(gold_ud.words)} words, {len(gold_ud.characters)} characters')
+    print(f'{"load_conllu() of gold":30} {t_load:8.3f} s')
+    print(f'{"memory of gold":30} {memory/2**20:8.1f} MB')
+    print(f'{"evaluate()":30} {t_evaluate:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -34,6 +34,45 @@ def build_argparse_validator():
                           action='store', type=int, default=20,
                           help="""How many incidents to print per test class? 0 for all.
                           Default: %(default)d.""")
+    io_group.add_argument('--format',
+                          action='store', choices=['text', 'jsonl'], default='text',
+                          help="""Format of the incidents: text (for humans, printed to standard error)
+                          or jsonl (one JSON object per incident and a final summary object,
+                          one per line, printed to standard output).
+                          Default: %(default)s.""")
+    io_group.add_argument('-j', '--jobs',
+                          action='store', type=int, default=1,
+                          help="""Number of processes that validate each input file in parallel.
+                          The output is the same as with one process. Ignored with --coref.
+                          Default: %(default)d.""")
+    io_group.add_argument('--incremental',
+                          dest='incremental', action='store_true', default=False,
+                          help="""Cache the results of the individual sentences on disk (in the folder
+                          given by the UDTOOLS_CACHE_DIR environment variable, or in ~/.cache/udtools),
+                          and when validating the same file again, test only the sentences that have
+                          changed. The output is the same as without the cache. Implies --jobs 1.""")
+    io_group.add_argument('--profile-checks',
+                          dest='profile_checks', action='store_true', default=False,
+                          help="""Measure the time spent in each test and print a table of the tests
+                          at the end. Implies --jobs 1.""")
+    io_group.add_argument('--pstats',
+                          action='store', default=None, metavar='FILE',
+                          help="""Run the validation under cProfile and save the statistics in FILE
+                          (to be read with the pstats module). Only the main process is profiled.""")
+    io_group.add_argument('--serve',
+                          action='store', default=None, metavar='[HOST:]PORT',
+                          help="""Do not validate any files. Instead, run a server that validates
+                          CoNLL-U text sent by HTTP POST to http://HOST:PORT/validate and returns
+                          the incidents in JSON. The default host is localhost.""")
+    io_group.add_argument('--sent-id',
+                          dest='sent_id', nargs='+', default=None, metavar='ID',
+                          help="""Validate only the sentences with these ids. The sentences are found
+                          through an index of the input file, which is saved next to it (FILE.udindex)
+                          and updated when the file changes. Tests of the whole treebank are skipped.""")
+    io_group.add_argument('--line',
+                          dest='line', nargs='+', type=int, default=None, metavar='N',
+                          help="""Validate only the sentences that contain these lines (e.g. lines
+                          from an earlier report). See --sent-id.""")
     io_group.add_argument('input',
                           nargs='*',
                           help="""Input file name(s), or "-" or nothing for standard input.""")
@@ -93,6 +132,8 @@ def parse_args_validator(args=None):
         args.lang = 'ud'
     if args.input == []:
         args.input.append('-')
+    if (args.sent_id or args.line) and '-' in args.input:
+        opt_parser.error('Options --sent-id and --line cannot be used with standard input.')
     return args
 
 
@@ -125,6 +166,8 @@ def parse_args_scorer(args=None):
                         help='Name of the CoNLL-U file with the gold data.')
     parser.add_argument('system_file', type=str,
                         help='Name of the CoNLL-U file with the predicted data.')
+    parser.add_argument('more_system_files', type=str, nargs='*', metavar='system_file',
+                        help='More CoNLL-U files with predicted data, evaluated against the same gold data (loaded only once). The results are printed in a table with one row per system file.')
     parser.add_argument('--verbose', '-v', default=False, action='store_true',
                         help='Print all metrics.')
     parser.add_argument('--counts', '-c', default=False, action='store_true',
@@ -132,10 +175,14 @@ def parse_args_scorer(args=None):
     parser.add_argument('--no-enhanced', dest='enhanced', action='store_false', default=True,
                         help='Turn off evaluation of enhanced dependencies.')
     parser.add_argument('--enhancements', type=str, default='0',
-                        help='Level of enhancements in the gold data (see guidelines) 0=all (default), 1=no gapping, 2=no shared parents, 3=no shared dependents 4=no control, 5=no external arguments, 6=no lemma info, combinations: 12=both 1 and 2 apply, etc.')
+                        help='Level of enhancements in the gold data (see guidelines) 0=all (default), 1=no gapping, 2=no shared parents, 3=no shared dependents 4=no control, 5=no external arguments, 6=no lemma info, combinations: 12=both 1 and 2 apply, etc. A comma-separated list (e.g. 0,1,12) computes ELAS and EULAS for each level in one run; ELAS and EULAS without a level use the first one.')
     parser.add_argument('--no-empty-nodes', default=False,
                         help='Empty nodes have been collapsed (needed to correctly evaluate enhanced/gapping). Raise exception if an empty node is encountered.')
     parser.add_argument('--multiple-roots-okay', default=False, action='store_true',
                         help='A single sentence can have multiple nodes with HEAD=0.')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Number of processes that evaluate the system files in parallel. Default: %(default)d.')
+    parser.add_argument('--format', choices=['text', 'json'], default='text',
+                        help='Output format: text (a table) or json (a list with one object per system file). Default: %(default)s.')
     args = parser.parse_args(args=args)
     return args
@@ -0,0 +1,154 @@
+import os
+import sys
+import hashlib
+import pickle
+import tempfile
+import regex as re
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.data import default_snapshot_dir
+except ModuleNotFoundError:
+    from udtools.data import default_snapshot_dir
+
+# Increase this number whenever the structure of the cache files changes.
+CACHE_VERSION = 1
+
+
+
+def source_digest():
+    """
+    Returns a hash of the source code of the validator (the Python modules in
+    the folder of this module), so that cached results are not used after
+    the tests have changed.
+    """
+    thisdir = os.path.dirname(os.path.realpath(os.path.abspath(__file__)))
+    hasher = hashlib.sha256(f'{CACHE_VERSION} {sys.version_info[:2]}'.encode())
+    for name in sorted(os.listdir(thisdir)):
+        if name.endswith('.py'):
+            with open(os.path.join(thisdir, name), 'rb') as f:
+                hasher.update(name.encode() + b'\0' + f.read())
+    return hasher.hexdigest()
+
+
+
+class SentenceCache:
+    """
+    On-disk cache of the results of validating individual sentences, used by
+    Validator.validate_file_handle_cached() (udvalidate --incremental). Each
+    sentence is validated from scratch, as a chunk of one sentence (see
+    udtools.state.ChunkState), and the incidents and the chunk state are
+    stored under a hash of the lines of the sentence. When the file is
+    validated again, the stored result of an unchanged sentence is merged
+    into the state instead of running the tests.
+
+    There is one cache file for each input file, holding the sentences seen
+    in the last validation of the file. Its name is a hash of the file name,
+    the source code of the validator, the validation data and the options
+    that influence the result, so the cached results are never used with
+    a different validator, data or options.
+    """
+    def __init__(self, validator, cachedir=None):
+        """
+        Parameters
+        ----------
+        validator : udtools.validator.Validator
+            The validator whose results will be cached.
+        cachedir : str, optional
+            The folder for the cache files. By default, the subfolder
+            sentences of default_snapshot_dir() is used.
+        """
+        if cachedir == None:
+            cachedir = os.path.join(default_snapshot_dir() or '.', 'sentences')
+        self.cachedir = cachedir
+        options = (validator.lang, validator.level, validator.check_coref,
+                   sorted(validator.incfg.get('exclude', [])), sorted(validator.incfg.get('include_only', [])),
+                   validator.incfg.get('no_warnings', False))
+        hasher = hashlib.sha256(source_digest().encode())
+        hasher.update(validator.data.get_digest().encode())
+        hasher.update(repr(options).encode())
+        self.key = hasher.hexdigest()
+
+    @staticmethod
+    def sentence_key(lines):
+        """
+        Returns the key of a sentence in the cache (a hash of its lines).
+        """
+        return hashlib.blake2b('\n'.join(lines).encode('utf-8', 'surrogateescape'), digest_size=16).digest()
+
+    def path(self, filename):
+        return os.path.join(self.cachedir, hashlib.sha256(f'{self.key} {filename}'.encode()).hexdigest()[:32] + '.pickle')
+
+    def load(self, filename):
+        """
+        Returns the cached sentences of an input file: a dict from the keys
+        of the sentences to the entries (see record()). The dict is empty if
+        there is no usable cache file.
+        """
+        try:
+            with open(self.path(filename), 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return {}
+
+    def save(self, filename, entries):
+        """
+        Saves the entries of the sentences of an input file. The file is
+        written to a temporary file first and then renamed, so that parallel
+        runs never see an incomplete file. Failure to save the cache (e.g.
+        because the folder is not writable) is silently ignored.
+        """
+        try:
+            os.makedirs(self.cachedir, exist_ok=True)
+            fd, tmppath = tempfile.mkstemp(dir=self.cachedir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmppath, self.path(filename))
+            except BaseException:
+                os.unlink(tmppath)
+                raise
+        except OSError:
+            pass
+
+    @staticmethod
+    def record(first_line, lines, incidents, chunk_state):
+        """
+        Returns the cache entry of a sentence validated as a chunk: the line
+        before the sentence, whether the sentence can be moved to another
+        line, and the pickled incidents and chunk state. The sentence cannot
+        be moved if a message mentions the number of one of its lines (e.g.,
+        'we saw an empty node on line 15'), as we would have to change the
+        message.
+        """
+        # The lines of the sentence are not needed after it has been
+        # validated; they would only make the cache larger.
+        chunk_state.current_lines = []
+        chunk_state.current_token_node_table = []
+        chunk_state.current_node_linenos = {}
+        linenos = set(str(i) for i in range(first_line + 1, first_line + len(lines) + 1))
+        # (Bypass the tracking of the access to delayed_feature_errors.)
+        delayed = [o['incident'] for x in chunk_state.__dict__['delayed_feature_errors'].values() for o in x['occurrences']]
+        movable = all(linenos.isdisjoint(re.findall(r'\d+', x.message)) for x in incidents + delayed)
+        return (first_line, movable, pickle.dumps((incidents, chunk_state), protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def restore(entry, first_line):
+        """
+        Returns the incidents and the chunk state from a cache entry, moved
+        to first_line if the sentence has been moved in the file. Returns
+        None if the sentence has been moved and it cannot be.
+        """
+        (cached_first_line, movable, blob) = entry
+        if cached_first_line != first_line and not movable:
+            return None
+        incidents, chunk_state = pickle.loads(blob)
+        if cached_first_line != first_line:
+            offset = first_line - cached_first_line
+            chunk_state.shift_lines(offset)
+            for incident in incidents:
+                incident.shift_lines(offset)
+        return incidents, chunk_state
@@ -7,7 +7,9 @@
 import sys
 from udtools.argparser import parse_args_validator, parse_args_scorer
 from udtools.validator import Validator
-from udtools.udeval import evaluate_wrapper, build_evaluation_table
+from udtools.server import serve
+from udtools.incident import jlenc
+from udtools.udeval import evaluate_wrapper, evaluate_systems_wrapper, build_evaluation_table, build_systems_table, build_evaluation_json
 ###!!!import logging
 ###!!!import udtools.logging_utils as logging_utils
 
@@ -25,12 +27,33 @@ from udtools.udeval import evaluate_wrapper, build_evaluation_table
 def main():
     args = parse_args_validator()
     ###!!!logger.info("Arguments: \n%s", logging_utils.pprint(vars(args)))
-    validator = Validator(lang=args.lang, level=args.level, max_store=10, args=args)
-    state = validator.validate_files(args.input)
+    if args.serve:
+        validator = Validator(lang=args.lang, level=args.level, output=None, args=args,
+                              jobs=1, incremental=False, profile_checks=False)
+        return serve(validator, args.serve, args)
+    if args.format == 'jsonl':
+        # Machine-readable output goes to a buffered stream on stdout; it is
+        # flushed once at the end (or whenever the buffer is full).
+        output = open(sys.stdout.fileno(), 'w', encoding='utf-8', buffering=1<<16, closefd=False)
+    else:
+        output = sys.stderr
+    validator = Validator(lang=args.lang, level=args.level, max_store=10, args=args, output=output)
+    if args.pstats:
+        import cProfile
+        profile = cProfile.Profile()
+        state = profile.runcall(validator.validate_files, args.input, sent_ids=args.sent_id, linenos=args.line)
+        profile.dump_stats(args.pstats)
+    else:
+        state = validator.validate_files(args.input, sent_ids=args.sent_id, linenos=args.line)
+    if validator.profiler:
+        validator.profiler.report(file=sys.stderr)
     # Summarize the warnings and errors.
-    summary = str(state)
-    if not args.quiet:
-        print(summary, file=sys.stderr)
+    if args.format == 'jsonl':
+        if not args.quiet:
+            output.write(jlenc.encode(state.summary()) + '\n')
+        output.close()
+    elif not args.quiet:
+        print(str(state), file=sys.stderr)
     if state.passed():
         return 0
     else:
@@ -43,9 +66,21 @@ def main_eval():
     args = parse_args_scorer()
 
     # Evaluate
-    evaluation = evaluate_wrapper(args)
-    results = build_evaluation_table(evaluation, args.verbose, args.counts, args.enhanced)
+    if not args.more_system_files and args.format == 'text':
+        evaluation = evaluate_wrapper(args)
+        results = build_evaluation_table(evaluation, args.verbose, args.counts, args.enhanced)
+        print(results)
+        return 0
+    # Evaluate several system files against the same gold data.
+    system_paths = [args.system_file] + args.more_system_files
+    evaluations = evaluate_systems_wrapper(args)
+    if args.format == 'json':
+        results = build_evaluation_json(system_paths, evaluations, args.enhanced)
+    else:
+        results = build_systems_table(system_paths, evaluations, args.counts, args.enhanced)
     print(results)
+    if any(isinstance(evaluation, Exception) for evaluation in evaluations):
+        return 1
     return 0
 
 
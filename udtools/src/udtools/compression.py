@@ -0,0 +1,147 @@
+import io
+import bz2
+import gzip
+import lzma
+import queue
+import threading
+
+# Signatures at the beginning of compressed files, and the modules that read
+# them. A CoNLL-U file cannot begin with any of them.
+MAGIC = ((b'\x1f\x8b', gzip), (b'\xfd7zXZ\x00', lzma), (b'BZh', bz2))
+
+
+
+def detect_compression(path):
+    """
+    Recognizes a compressed file by the bytes at its beginning (not by the
+    extension of its name).
+
+    Parameters
+    ----------
+    path : str
+        The name of the file.
+
+    Returns
+    -------
+    module : module or None
+        The module of the standard library that reads the file (gzip, lzma
+        or bz2), or None if the file is not compressed.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, module in MAGIC:
+        if head.startswith(magic):
+            return module
+    return None
+
+
+def open_text(path, threaded=False):
+    """
+    Opens a UTF-8 text file for reading, decompressing it on the fly if it
+    is compressed by gzip, xz or bzip2. The returned stream translates the
+    line breaks and records them in its newlines attribute, like a file
+    opened by open(path, 'r').
+
+    Parameters
+    ----------
+    path : str
+        The name of the file.
+    threaded : bool, optional
+        Should a compressed file be decompressed in a separate thread (see
+        ThreadedReader), so that decompression overlaps with the processing
+        of the text? The default is False: decompression of gzip and xz is
+        much faster than validation, and the validator holds the GIL most of
+        the time, so the thread rarely pays off (see
+        benchmarks/bench_compressed.py).
+
+    Returns
+    -------
+    stream : io.TextIOWrapper
+    """
+    module = detect_compression(path)
+    if module == None:
+        return io.open(path, 'r', encoding='utf-8')
+    raw = module.open(path, 'rb')
+    if threaded:
+        raw = io.BufferedReader(ThreadedReader(raw))
+    return io.TextIOWrapper(raw, encoding='utf-8')
+
+
+
+class ThreadedReader(io.RawIOBase):
+    """
+    Reads a binary stream in a background thread, a few blocks ahead of the
+    consumer. The decompressors of the standard library release the GIL, so
+    a compressed file is decompressed while the main thread validates the
+    text that has been decompressed before.
+    """
+    def __init__(self, raw, block_size=1<<18, depth=8):
+        """
+        Parameters
+        ----------
+        raw : binary stream
+            The stream to be read, e.g. gzip.GzipFile. It is closed when the
+            reader is closed.
+        block_size : int, optional
+            Number of bytes read at once.
+        depth : int, optional
+            Maximum number of blocks read ahead.
+        """
+        super().__init__()
+        self.raw = raw
+        self.block_size = block_size
+        self.queue = queue.Queue(depth)
+        self.stopped = threading.Event()
+        self.block = b''
+        self.position = 0
+        self.eof = False
+        self.thread = threading.Thread(target=self._read_ahead, daemon=True)
+        self.thread.start()
+
+    def _put(self, item):
+        # Do not block forever if the consumer has stopped reading.
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read_ahead(self):
+        try:
+            while True:
+                block = self.raw.read(self.block_size)
+                if not self._put(block) or not block:
+                    return
+        except Exception as e:
+            # The exception (e.g. a corrupt file) is raised in the consumer.
+            self._put(e)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.position == len(self.block):
+            if self.eof:
+                return 0
+            block = self.queue.get()
+            if isinstance(block, Exception):
+                self.eof = True
+                raise block
+            if not block:
+                self.eof = True
+                return 0
+            self.block = block
+            self.position = 0
+        n = min(len(buffer), len(self.block) - self.position)
+        buffer[:n] = self.block[self.position:self.position+n]
+        self.position += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self.stopped.set()
+            self.thread.join()
+            self.raw.close()
+        super().close()
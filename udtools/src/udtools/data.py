@@ -1,4 +1,12 @@
+import os
 import os.path
+import hashlib
+import pickle
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from functools import cached_property
+from types import MappingProxyType
 # According to https://stackoverflow.com/questions/1832893/python-regex-matching-unicode-properties,
 # the regex module has the same API as re but it can check Unicode character properties using \p{}
 # as in Perl.
@@ -8,13 +16,145 @@ import json
 
 
 
+# The JSON files in the data folder that the validator reads.
+JSON_FILES = ['upos.json', 'feats.json', 'udeprels.json', 'deprels.json', 'edeprels.json', 'data.json', 'tospace.json']
+# Increase this number whenever the structure of the snapshot changes, so that
+# old snapshots are not used.
+SNAPSHOT_VERSION = 2
+# The fields of the language-specific records that the validator reads. The
+# other fields (examples, comments, time stamps etc.) are not saved in the
+# snapshot, which makes it much smaller and faster to load.
+FEATS_FIELDS = ['permitted', 'errors', 'uvalues', 'lvalues', 'unused_uvalues', 'unused_lvalues', 'byupos']
+DEPREL_FIELDS = ['permitted', 'errors']
+EDEPREL_FIELDS = ['extends']
+# The language-specific tables: attribute of Data, JSON file and the key in the
+# file under which the languages are listed.
+TABLES = {
+    'feats': ('feats.json', 'features'),
+    'deprel': ('deprels.json', 'deprels'),
+    'edeprel': ('edeprels.json', 'edeprels'),
+    'auxcop': ('data.json', 'auxiliaries'),
+    'tospace': ('tospace.json', 'expressions')
+}
+
+
+
+def default_snapshot_dir():
+    """
+    Returns the folder where snapshots of the validation data are cached.
+    It can be set in the environment variable UDTOOLS_CACHE_DIR; an empty
+    value means that no snapshots should be used. Otherwise the folder is
+    udtools in the user's cache folder (XDG_CACHE_HOME or ~/.cache).
+    """
+    if 'UDTOOLS_CACHE_DIR' in os.environ:
+        return os.environ['UDTOOLS_CACHE_DIR'] or None
+    cachehome = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cachehome, 'udtools')
+
+
+
+@dataclass(frozen=True)
+class LanguageProfile:
+    """
+    The language-specific data of one language, compiled for fast lookups in
+    the level 4 and 5 tests. Profiles are created by Data.get_profile() and
+    must not be modified. Each part of the profile is compiled when it is
+    accessed for the first time, so that only the tables that the tests
+    really need are loaded (e.g., the features are not loaded when only the
+    tokens with spaces are checked).
+    """
+    lcode: str
+    data: 'Data' = field(repr=False, compare=False)
+
+    def __reduce__(self):
+        # The profile is sent to worker processes with the validator. The
+        # compiled parts are not sent (mapping proxies cannot be pickled);
+        # they are compiled again when needed.
+        return (LanguageProfile, (self.lcode, self.data))
+
+    @cached_property
+    def _featset(self):
+        return self.data.get_feats_for_language(self.lcode)
+
+    @cached_property
+    def features(self):
+        """ Features documented for the language. """
+        return frozenset(self._featset)
+
+    @cached_property
+    def permitted_features(self):
+        """ Features that are permitted in the language. """
+        return frozenset(f for f, record in self._featset.items() if record['permitted'] != 0)
+
+    @cached_property
+    def feature_values(self):
+        """ Key: feature; value: all its documented values (used or not). """
+        return MappingProxyType({f: frozenset(record['uvalues'] + record['lvalues'] + record['unused_uvalues'] + record['unused_lvalues'])
+                                 for f, record in self._featset.items()})
+
+    @cached_property
+    def feature_upos(self):
+        """ (feature, UPOS) pairs that are permitted. """
+        return frozenset((f, upos) for f, record in self._featset.items() for upos in record['byupos'])
+
+    @cached_property
+    def feature_upos_values(self):
+        """ (feature, UPOS, value) triples that are permitted. """
+        return frozenset((f, upos, v) for f, record in self._featset.items()
+                         for upos, values in record['byupos'].items()
+                         for v in values if values[v] != 0)
+
+    @cached_property
+    def deprels(self):
+        """ Permitted basic relation types. """
+        return frozenset(self.data.get_deprel_for_language(self.lcode))
+
+    @cached_property
+    def edeprels(self):
+        """ Permitted enhanced relation types. """
+        return frozenset(self.data.get_edeprel_for_language(self.lcode))
+
+    @cached_property
+    def aux(self):
+        """ Auxiliary lemmas. """
+        return frozenset(self.data.get_aux_for_language(self.lcode))
+
+    @cached_property
+    def cop(self):
+        """ Copula lemmas. """
+        return frozenset(self.data.get_cop_for_language(self.lcode))
+
+    @cached_property
+    def tospace(self):
+        """
+        Regular expression of the permitted tokens with spaces (see
+        Data.get_tospace_for_language()), or None.
+        """
+        return self.data.get_tospace_for_language(self.lcode)
+
+
+
 class Data:
     """
     The Data class holds various dictionaries of tags, auxiliaries, regular
     expressions etc. needed for detailed testing, especially for language-
     specific constraints.
     """
-    def __init__(self, datapath=None):
+    def __init__(self, datapath=None, snapshotdir=None):
+        """
+        Parameters
+        ----------
+        datapath : str, optional
+            The folder with the JSON files. By default, the data folder of
+            the tools repository (or of the installed package) is used.
+        snapshotdir : str or bool, optional
+            The folder where the snapshot of the loaded data is cached (see
+            load()). By default, default_snapshot_dir() is used. False means
+            that no snapshot should be read or written.
+        """
+        if snapshotdir is None:
+            snapshotdir = default_snapshot_dir()
+        self.snapshotdir = snapshotdir or None
         if datapath:
             self.datapath = datapath
         else:
@@ -33,6 +173,8 @@ class Data:
         self.upos = set()
         # Morphological features in the FEATS column.
         # Key: language code; value: feature-value-UPOS data from feats.json.
+        # This and the other language-specific tables below are filled on
+        # demand, see load_table().
         self.feats = {}
         # Universal dependency relation types (without subtypes) in the DEPREL
         # column. For consistency, they are also read from a file. but these
@@ -57,6 +199,10 @@ class Data:
         # Tokens with spaces in the FORM and LEMMA columns.
         # Key: language code; value: data from tospace.json.
         self.tospace = {}
+        # Compiled profiles. Key: language code; value: LanguageProfile.
+        self.profiles = {}
+        # Hash of the contents of the JSON files, see get_digest().
+        self.digest = None
         # Load language-specific data from external JSON files.
         self.load()
         # For each of the language-specific lists, we can generate an
@@ -79,6 +225,7 @@ class Data:
         """
         ###!!! If lcode is 'ud', we should permit all universal feature-value pairs,
         ###!!! regardless of language-specific documentation.
+        self.load_table('feats', lcode)
         # Do not crash if the user asks for an unknown language.
         if not lcode in self.feats:
             return {}
@@ -98,10 +245,12 @@ class Data:
         # regardless of language-specific documentation.
         if lcode == 'ud':
             deprelset = self.udeprel
-        elif lcode in self.deprel:
-            for r in self.deprel[lcode]:
-                if self.deprel[lcode][r]['permitted'] > 0:
-                    deprelset.add(r)
+        else:
+            self.load_table('deprel', lcode)
+            if lcode in self.deprel:
+                for r in self.deprel[lcode]:
+                    if self.deprel[lcode][r]['permitted'] > 0:
+                        deprelset.add(r)
         self.cached_deprel_for_language[lcode] = deprelset
         return deprelset
 
@@ -119,6 +268,7 @@ class Data:
         for bdeprel in basic_deprels:
             if re.match(r"^[nc]subj(:|$)", bdeprel):
                 edeprelset.add(bdeprel+':xsubj')
+        self.load_table('edeprel', lcode)
         if lcode in self.edeprel:
             for c in self.edeprel[lcode]:
                 for deprel in self.edeprel[lcode][c]['extends']:
@@ -141,6 +291,7 @@ class Data:
         # If any of the functions of the lemma is cop.*, it counts as a copula.
         auxlist = []
         coplist = []
+        self.load_table('auxcop', lcode)
         lemmalist = self.auxcop.get(lcode, {}).keys()
         auxlist = [x for x in lemmalist
                    if len([y for y in self.auxcop[lcode][x]['functions']
@@ -179,11 +330,25 @@ class Data:
         Searches the previously loaded database of regular expressions describing
         permitted tokens with spaces. Returns the expressions for a given language code.
         """
+        self.load_table('tospace', lcode)
         # Do not crash if the user asks for an unknown language.
         if not lcode in self.tospace:
             return None
         return self.tospace[lcode]
 
+    def get_profile(self, lcode):
+        """
+        Returns the LanguageProfile of a given language code, which holds the
+        language-specific data in sets for fast lookups. The profile is created
+        when it is requested for the first time and its parts are compiled
+        when they are first used.
+        """
+        if lcode in self.profiles:
+            return self.profiles[lcode]
+        profile = LanguageProfile(lcode, self)
+        self.profiles[lcode] = profile
+        return profile
+
     def explain_feats(self, lcode):
         """
         Returns explanation message for features of a particular language.
@@ -290,7 +455,7 @@ class Data:
             msg += f"The following {len(sorted_case_markers)} enhanced relations are currently permitted in language [{lcode}]:\n"
             msg += ', '.join(sorted_case_markers) + "\n"
             msg += "See https://quest.ms.mff.cuni.cz/udvalidator/cgi-bin/unidep/langspec/specify_edeprel.pl for details.\n"
-        self._explanation_deprel[lcode] = msg
+        self._explanation_edeprel[lcode] = msg
         return msg
 
     def explain_aux(self, lcode):
@@ -353,6 +518,7 @@ class Data:
         # this global information pertains to the default validation language and it
         # should not be used with code-switched segments in alternative languages.
         msg = ''
+        self.load_table('tospace', lcode)
         if not lcode in self.tospace:
             msg += f"No tokens with spaces have been permitted for language [{lcode}].\n"
             msg += "They can be permitted at the address below (if the language has an ISO code and is registered with UD):\n"
@@ -371,33 +537,208 @@ class Data:
         combinations, and stores them in self. The source JSON files are
         supposed to be in the data subfolder of the folder where the script
         lives.
+
+        Only the universal lists (UPOS tags and relation types) are loaded
+        here. The language-specific tables are loaded on demand by
+        load_table(), when the data of a language is needed for the first
+        time. A run typically needs only one or two languages, and levels 1
+        to 3 do not need any language-specific table.
+
+        Parsing the JSON files takes much longer than validating a small
+        file, hence the loaded data is also saved as a binary snapshot in
+        self.snapshotdir. The snapshot is a folder with the universal lists
+        and a separate file for each language, so that only the languages
+        that are needed are read. The name of the snapshot contains a hash of
+        the contents of the JSON files, so the snapshot is used only as long
+        as the files do not change, and a new snapshot is made automatically
+        afterwards.
         """
-        with open(os.path.join(self.datapath, 'upos.json'), 'r', encoding='utf-8') as f:
-            contents = json.load(f)
+        # Language-specific tables that have been loaded completely from the
+        # JSON files, and languages whose tables have been loaded from the
+        # snapshot.
+        self.loaded_tables = set()
+        self.loaded_languages = set()
+        # The snapshot folder, if we are reading from a snapshot; and the set
+        # of languages that have a file in the snapshot.
+        self.snapshot = None
+        self.snapshot_languages = set()
+        if self.snapshotdir:
+            hasher = hashlib.sha256(f'{SNAPSHOT_VERSION} {re.__version__}'.encode())
+            raw = {}
+            for name in JSON_FILES:
+                with open(os.path.join(self.datapath, name), 'rb') as f:
+                    raw[name] = f.read()
+                hasher.update(name.encode() + b'\0' + raw[name])
+            self.digest = hasher.hexdigest()
+            snapshot = os.path.join(self.snapshotdir, f'data-{self.digest[:32]}')
+            if self.load_snapshot(snapshot):
+                return
+            # There is no usable snapshot. Parse all the JSON files (we need
+            # all languages for the snapshot anyway) and save the snapshot.
+            self.load_json(raw)
+            self.save_snapshot(snapshot)
+        else:
+            contents = json.loads(self.read_json_file('upos.json'))
+            self.upos = set(contents['upos'])
+            contents = json.loads(self.read_json_file('udeprels.json'))
+            self.udeprel = set(contents['udeprels'])
+
+    def get_digest(self):
+        """
+        Returns a hash (hexadecimal string) of the contents of the JSON files,
+        which identifies the version of the data, e.g. in cached results of
+        the validation.
+        """
+        if self.digest == None:
+            hasher = hashlib.sha256(f'{SNAPSHOT_VERSION} {re.__version__}'.encode())
+            for name in JSON_FILES:
+                hasher.update(name.encode() + b'\0' + self.read_json_file(name))
+            self.digest = hasher.hexdigest()
+        return self.digest
+
+    def read_json_file(self, name):
+        """
+        Returns the contents of a JSON file from the data folder as bytes.
+        """
+        with open(os.path.join(self.datapath, name), 'rb') as f:
+            return f.read()
+
+    def load_json(self, raw):
+        """
+        Takes the contents of the JSON files (a dict from file names to
+        bytes), parses them and stores the data in self.
+        """
+        contents = json.loads(raw['upos.json'])
         upos_list = contents['upos']
         self.upos = set(upos_list)
-        with open(os.path.join(self.datapath, 'feats.json'), 'r', encoding='utf-8') as f:
-            contents = json.load(f)
-        self.feats = contents['features']
-        with open(os.path.join(self.datapath, 'udeprels.json'), 'r', encoding='utf-8') as f:
-            contents = json.load(f)
+        contents = json.loads(raw['udeprels.json'])
         udeprel_list = contents['udeprels']
         self.udeprel = set(udeprel_list)
-        with open(os.path.join(self.datapath, 'deprels.json'), 'r', encoding='utf-8') as f:
-            contents = json.load(f)
-        self.deprel = contents['deprels']
-        with open(os.path.join(self.datapath, 'edeprels.json'), 'r', encoding='utf-8') as f:
-            contents = json.load(f)
-        self.edeprel = contents['edeprels']
-        with open(os.path.join(self.datapath, 'data.json'), 'r', encoding='utf-8') as f:
-            contents = json.load(f)
-        self.auxcop = contents['auxiliaries']
-        with open(os.path.join(self.datapath, 'tospace.json'), 'r', encoding='utf-8') as f:
-            contents = json.load(f)
-        # There is one or more regular expressions for each language in the file.
-        # If there are multiple expressions, combine them in one and compile it.
-        self.tospace = {}
-        for l in contents['expressions']:
-            combination = '('+'|'.join(sorted(list(contents['expressions'][l])))+')'
-            compilation = re.compile(combination)
-            self.tospace[l] = (combination, compilation)
+        for table in TABLES:
+            self.load_json_table(table, raw[TABLES[table][0]])
+
+    def load_json_table(self, table, raw):
+        """
+        Parses the contents of the JSON file with a language-specific table
+        and stores the table (for all languages) in self.
+        """
+        (name, key) = TABLES[table]
+        contents = json.loads(raw)[key]
+        if table == 'tospace':
+            # There is one or more regular expressions for each language in the file.
+            # If there are multiple expressions, combine them in one and compile it.
+            tospace = {}
+            for l in contents:
+                combination = '('+'|'.join(sorted(list(contents[l])))+')'
+                compilation = re.compile(combination)
+                tospace[l] = (combination, compilation)
+            contents = tospace
+        setattr(self, table, contents)
+        self.loaded_tables.add(table)
+
+    def load_table(self, table, lcode):
+        """
+        Makes sure that the language-specific table (one of the keys of
+        TABLES) is loaded for the language lcode. If we read from a snapshot,
+        all tables of the language are read from its file. Otherwise the
+        whole table is parsed from its JSON file.
+        """
+        if table in self.loaded_tables:
+            return
+        if self.snapshot:
+            if lcode in self.loaded_languages:
+                return
+            if self.load_snapshot_language(lcode):
+                return
+            # The snapshot has disappeared or it is damaged. Fall back to the
+            # JSON files.
+            self.snapshot = None
+        self.load_json_table(table, self.read_json_file(TABLES[table][0]))
+
+    @staticmethod
+    def prune(records, fields):
+        """
+        Takes the records of one language from a JSON file (a dict from
+        labels to records) and returns a copy where each record has only the
+        given fields. Records with identical contents are shared, which saves
+        memory and makes the snapshot smaller; the records must therefore not
+        be modified.
+        """
+        shared = {}
+        pruned = {}
+        for label, record in records.items():
+            record = {k: record[k] for k in fields}
+            pruned[label] = shared.setdefault(repr(record), record)
+        return pruned
+
+    def load_snapshot(self, path):
+        """
+        Loads the universal data from a snapshot previously saved by
+        save_snapshot(), and remembers the snapshot so that the language-
+        specific data can be loaded from it later. Returns False if the
+        snapshot does not exist or cannot be read.
+        """
+        try:
+            with open(os.path.join(path, 'index.pickle'), 'rb') as f:
+                (self.upos, self.udeprel, self.snapshot_languages) = pickle.load(f)
+        except Exception:
+            return False
+        self.snapshot = path
+        return True
+
+    def load_snapshot_language(self, lcode):
+        """
+        Loads all language-specific tables of one language from the snapshot.
+        Returns False if the file of the language cannot be read.
+        """
+        if lcode in self.snapshot_languages:
+            try:
+                with open(os.path.join(self.snapshot, f'{lcode}.pickle'), 'rb') as f:
+                    language = pickle.load(f)
+            except Exception:
+                return False
+            for table in language:
+                getattr(self, table)[lcode] = language[table]
+        self.loaded_languages.add(lcode)
+        return True
+
+    def save_snapshot(self, path):
+        """
+        Saves the loaded data as a snapshot: a folder with index.pickle (the
+        universal lists and the list of languages) and one file per language
+        with its tables. Only the fields that the validator reads are saved
+        (see FEATS_FIELDS etc.) The snapshot is written to a temporary folder
+        first and then renamed, so that parallel runs never see an incomplete
+        snapshot. Failure to save the snapshot (e.g. because the cache folder
+        is not writable) is silently ignored.
+        """
+        languages = {}
+        for table in TABLES:
+            for l, records in getattr(self, table).items():
+                if table == 'feats':
+                    records = self.prune(records, FEATS_FIELDS)
+                elif table == 'deprel':
+                    records = self.prune(records, DEPREL_FIELDS)
+                elif table == 'edeprel':
+                    records = self.prune(records, EDEPREL_FIELDS)
+                elif table == 'auxcop':
+                    records = {lemma: {'functions': [{'function': y['function']} for y in record['functions']]}
+                               for lemma, record in records.items()}
+                languages.setdefault(l, {})[table] = records
+        try:
+            os.makedirs(self.snapshotdir, exist_ok=True)
+            tmppath = tempfile.mkdtemp(dir=self.snapshotdir, suffix='.tmp')
+            try:
+                for l in languages:
+                    with open(os.path.join(tmppath, f'{l}.pickle'), 'wb') as f:
+                        pickle.dump(languages[l], f, protocol=pickle.HIGHEST_PROTOCOL)
+                with open(os.path.join(tmppath, 'index.pickle'), 'wb') as f:
+                    pickle.dump((self.upos, self.udeprel, set(languages)), f, protocol=pickle.HIGHEST_PROTOCOL)
+                # If there is a damaged snapshot, replace it.
+                shutil.rmtree(path, ignore_errors=True)
+                os.rename(tmppath, path)
+            except BaseException:
+                shutil.rmtree(tmppath, ignore_errors=True)
+                raise
+        except OSError:
+            pass
@@ -0,0 +1,76 @@
+"""
+Dispatch of the tests of individual nodes. Many tests apply only to nodes
+with certain relations or UPOS tags (e.g. check_orphan() only looks at
+'orphan' dependents) and return immediately for all other nodes. Such tests
+declare the relations and tags with the applies_to() decorator, and the
+validator calls them only for the nodes that can trigger them (see
+NodeDispatcher).
+"""
+
+
+
+def applies_to(udeprels=None, upos=None):
+    """
+    Decorator of a check method that takes a node: declares that the check
+    cannot report anything unless the universal part of the DEPREL of the
+    node is one of udeprels and its UPOS is one of upos. None means any
+    relation or tag. The check itself must still test the condition, as it
+    may also be called directly, without the dispatcher.
+
+    Parameters
+    ----------
+    udeprels : iterable(str), optional
+        The universal relations of the nodes to which the check applies.
+    upos : iterable(str), optional
+        The UPOS tags of the nodes to which the check applies.
+    """
+    def decorate(check):
+        check.udeprels = frozenset(udeprels) if udeprels != None else None
+        check.upos = frozenset(upos) if upos != None else None
+        return check
+    return decorate
+
+
+
+class NodeDispatcher:
+    """
+    Selects the checks to be called for a node, given its universal relation
+    and UPOS tag. The checks keep their order, so the incidents are reported
+    in the same order as if all checks were called for every node. The
+    selection for each combination of relation and tag is computed once and
+    cached.
+    """
+    def __init__(self, validator, names):
+        """
+        Parameters
+        ----------
+        validator : udtools.validator.Validator
+            The validator whose check methods will be called.
+        names : list(str)
+            Names of the check methods, in the order in which they should be
+            called. The declarations (see applies_to()) are read from the
+            class of the validator, so that a subclass that overrides a check
+            without the decorator gets it called for all nodes; the methods
+            are taken from the validator object (which may be instrumented
+            by udtools.profiler.CheckProfiler).
+        """
+        self.checks = []
+        for name in names:
+            declared = getattr(type(validator), name)
+            self.checks.append((getattr(validator, name),
+                                getattr(declared, 'udeprels', None),
+                                getattr(declared, 'upos', None)))
+        self.table = {}
+
+    def select(self, udeprel, upos):
+        """
+        Returns the checks (bound methods) that apply to a node with the
+        given universal relation and UPOS tag.
+        """
+        key = (udeprel, upos)
+        checks = self.table.get(key)
+        if checks == None:
+            checks = tuple(check for check, udeprels, uposset in self.checks
+                           if (udeprels == None or udeprel in udeprels) and (uposset == None or upos in uposset))
+            self.table[key] = checks
+        return checks
@@ -1,8 +1,11 @@
 from dataclasses import dataclass
 from enum import Enum
 from json import JSONEncoder
+from json.encoder import encode_basestring
 
 jenc = JSONEncoder()
+# Compact encoder for the JSON Lines output (--format jsonl).
+jlenc = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
 
 
 
@@ -36,7 +39,7 @@ class IncidentType(Enum):
 
 
 
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class Reference:
     """
     Points to a position in the source file. Each incident (error or warning)
@@ -55,18 +58,48 @@ class Reference:
     nodeid: str = ''
     comment: str = ''
 
+    def dict(self):
+        """
+        Returns the reference description as a dict of strings that can be
+        encoded in JSON.
+        """
+        return {
+            'filename': str(self.filename),
+            'lineno': str(self.lineno),
+            'sentid': str(self.sentid),
+            'nodeid': str(self.nodeid),
+            'comment': self.comment
+        }
+
     def json(self):
         """
         Returns the reference description in JSON format so it can be passed to
         external applications easily.
         """
-        jsonlist = []
-        jsonlist.append(f'"filename": {jenc.encode(str(self.filename))}')
-        jsonlist.append(f'"lineno": "{str(self.lineno)}"')
-        jsonlist.append(f'"sentid": {jenc.encode(str(self.sentid))}')
-        jsonlist.append(f'"nodeid": "{str(self.nodeid)}"')
-        jsonlist.append(f'"comment": {jenc.encode(self.comment)}')
-        return '{' + ', '.join(jsonlist) + '}'
+        return jenc.encode(self.dict())
+
+
+
+class IncidentDefaults:
+    """
+    Default values of the parameters of incidents that are created without
+    them. Checks can set the defaults before a batch of similar tests, then
+    they do not have to repeat the shared parameters for each test. Each
+    validation state has its own defaults (State.incident_defaults), so that
+    validators running in parallel threads do not interfere with each other.
+    """
+    __slots__ = ('level', 'testclass', 'lineno')
+    def __init__(self):
+        # Validation level, see Incident.level.
+        self.level = 1
+        # Thematic area, see Incident.testclass.
+        self.testclass = TestClass.FORMAT
+        # Line number, see Incident.lineno. None means the most recently read
+        # line; negative number means the first token line of the sentence.
+        self.lineno = None
+
+    def __getstate__(self):
+        return (None, {k: getattr(self, k) for k in self.__slots__})
 
 
 
@@ -74,32 +107,38 @@ class Incident:
     """
     Instances of this class describe individual errors or warnings in the input
     file.
+
+    The message and the explanation can be given either as strings, or as
+    functions without arguments that return the strings. The functions are
+    called only when the incident is printed or stored, so that the messages
+    of incidents that are suppressed (excluded, over --max-err, --quiet) are
+    never formatted.
     """
-    # We can modify the class-level defaults before a batch of similar tests.
-    # Then we do not have to repeat the shared parameters for each test.
-    default_level = 1
-    default_testclass = TestClass.FORMAT
+    __slots__ = ('state', 'config', 'level', 'testclass', 'testid', '_message', '_explanation',
+                 'filename', 'lineno', 'sentid', 'nodeid', 'references')
+    # The level, the test class and the line number can be set in advance
+    # for a batch of similar tests, see IncidentDefaults.
     default_testid = 'generic-error'
     default_message = 'No error description provided.'
-    default_lineno = None
     def __init__(self, state, config, level=None, testclass=None, testid=None, message=None, lineno=None, nodeid=None, explanation='', references=[]):
         self.state = state
         self.config = config
+        defaults = state.incident_defaults
 
         # Validation level to which the incident belongs. Integer 1-5.
-        self.level = self.default_level if level == None else level
+        self.level = defaults.level if level == None else level
         # Thematic area to which the incident belongs: Format, Meta, Morpho,
         # Syntax, Enhanced, Coref, Warning.
-        self.testclass = self.default_testclass if testclass == None else testclass
+        self.testclass = defaults.testclass if testclass == None else testclass
         # Identifier of the test that lead to the incident. Short string.
         self.testid = self.default_testid if testid == None else testid
         # Verbose description of the error for the user. It does not have to be
         # identical for all errors with the same testid because it can contain
         # instance-specific data (e.g. the word form).
-        self.message = self.default_message if message == None else message
+        self._message = self.default_message if message == None else message
         # Additional more verbose information. To be printed with the first
         # incident of a given type.
-        self.explanation = explanation
+        self._explanation = explanation
         # File name. The default is the file from which we are reading right
         # now ('-' if reading from STDIN).
         self.filename = state.get_current_file_name()
@@ -108,7 +147,7 @@ class Incident:
         # during instantiation, as the most recently read line is the last line
         # of the sentence, and the error was found on one of the words of the
         # sentence.
-        self.lineno = lineno if lineno != None else self.default_lineno if self.default_lineno != None else state.current_line
+        self.lineno = lineno if lineno != None else defaults.lineno if defaults.lineno != None else state.current_line
         if self.lineno < 0:
             self.lineno = state.sentence_line
         # Current (most recently read) sentence id.
@@ -121,25 +160,61 @@ class Incident:
         # nodeid parameters.
         self.references = references
 
+    @property
+    def message(self):
+        if callable(self._message):
+            self._message = self._message()
+        return self._message
+
+    @property
+    def explanation(self):
+        if callable(self._explanation):
+            self._explanation = self._explanation()
+        return self._explanation
+
+    def render(self):
+        """
+        Formats the message and the explanation if they were given as
+        functions. This must happen before the incident outlives the check
+        that created it, because the functions may refer to variables that the
+        check will change later.
+        """
+        self.message
+        self.explanation
+
+    def __getstate__(self):
+        # Incidents are sent back from worker processes when validating in
+        # parallel, and functions cannot be pickled.
+        self.render()
+        return (None, {k: getattr(self, k) for k in Incident.__slots__})
+
+    def dict(self, explanation=None):
+        """
+        Returns the incident description as a dict that can be encoded in
+        JSON. The values are strings (except for the list of references).
+        The explanation can be overridden, e.g. by an empty string if it has
+        already been reported.
+        """
+        return {
+            'level': str(self.level),
+            'type': str(self.get_type()),
+            'testclass': str(self.testclass),
+            'testid': str(self.testid),
+            'filename': str(self.filename),
+            'lineno': str(self.lineno),
+            'sentid': str(self.sentid),
+            'nodeid': str(self.nodeid),
+            'message': str(self.message),
+            'explanation': str(self.explanation) if explanation == None else explanation,
+            'references': [x.dict() for x in self.references]
+        }
+
     def json(self):
         """
         Returns the incident description in JSON format so it can be passed to
         external applications easily.
         """
-        jsonlist = []
-        jsonlist.append(f'"level": "{self.level}"')
-        jsonlist.append(f'"type": "{str(self.get_type())}"')
-        jsonlist.append(f'"testclass": "{str(self.testclass)}"')
-        jsonlist.append(f'"testid": "{str(self.testid)}"')
-        jsonlist.append(f'"filename": {jenc.encode(str(self.filename))}')
-        jsonlist.append(f'"lineno": "{str(self.lineno)}"')
-        jsonlist.append(f'"sentid": {jenc.encode(str(self.sentid))}')
-        jsonlist.append(f'"nodeid": "{str(self.nodeid)}"')
-        jsonlist.append(f'"message": {jenc.encode(str(self.message))}')
-        jsonlist.append(f'"explanation": {jenc.encode(str(self.explanation))}')
-        refjson = '[' + ', '.join([x.json() for x in self.references]) + ']'
-        jsonlist.append(f'"references": {refjson}')
-        return '{' + ', '.join(jsonlist) + '}'
+        return jenc.encode(self.dict())
 
     def _count_me(self):
         self.state.error_counter[self.get_type()][self.testclass] += 1
@@ -158,8 +233,47 @@ class Incident:
         # self.state.error_tracker is a list of incidents.
         if 'max_store' in self.config and self.config['max_store'] > 0 and len(self.state.error_tracker) >= self.config['max_store']:
             return # we cannot store more incidents
+        self.render()
         self.state.error_tracker.append(self)
 
+    def shift_lines(self, offset):
+        """
+        Adds offset to the line number of the incident and its references
+        (used when the sentence is found elsewhere in the file than where it
+        was validated). Positive numbers only are line numbers.
+        """
+        if type(self.lineno) == int and self.lineno > 0:
+            self.lineno += offset
+        for reference in self.references:
+            if type(reference.lineno) == int and reference.lineno > 0:
+                reference.lineno += offset
+
+    def jsonl(self):
+        """
+        Returns the incident description as one line of compact JSON, for the
+        --format jsonl output. Like in the text output, the explanation is
+        included only the first time it is reported.
+        """
+        explanation = self.explanation
+        if explanation:
+            if explanation in self.state.explanation_printed:
+                explanation = ''
+            else:
+                self.state.explanation_printed.add(explanation)
+        # The result is the same as jlenc.encode(self.dict(...)) but JSONEncoder
+        # sets up its encoder anew for every object, which costs more than the
+        # encoding itself. Here we only escape the strings that may need it
+        # (level and line number are numbers, type and test class are enum
+        # names).
+        e = encode_basestring
+        references = ','.join([jlenc.encode(x.dict()) for x in self.references]) if self.references else ''
+        return (f'{{"level":"{self.level}","type":"{self.get_type()._name_}",'
+                f'"testclass":"{self.testclass._name_}","testid":{e(str(self.testid))},'
+                f'"filename":{e(str(self.filename))},"lineno":"{self.lineno}",'
+                f'"sentid":{e(str(self.sentid))},"nodeid":{e(str(self.nodeid))},'
+                f'"message":{e(str(self.message))},"explanation":{e(str(explanation))},'
+                f'"references":[{references}]}}')
+
     def __str__(self):
         # If we are here, the error message should really be printed.
         # Address of the incident.
@@ -203,11 +317,17 @@ class Incident:
         if not self.config['output'] or 'quiet' in self.config and self.config['quiet']:
             return
         # Suppress error messages of a type of which we have seen too many.
+        # (In JSON Lines, the number of suppressed incidents can be seen in
+        # the summary record.)
+        jsonl = self.config.get('format') == 'jsonl'
         if too_many > 0:
-            if too_many == 1:
+            if too_many == 1 and not jsonl:
                 print(f'...suppressing further messages regarding {str(self.get_type())}/{str(self.testclass)}', file=self.config['output'])
             return # suppressed
-        print(str(self), file=self.config['output'])
+        if jsonl:
+            self.config['output'].write(self.jsonl() + '\n')
+        else:
+            print(str(self), file=self.config['output'])
 
     def get_type(self):
         """ This method must be overridden in derived classes. """
@@ -226,6 +346,7 @@ class Incident:
 
 
 class Error(Incident):
+    __slots__ = ()
     def get_type(self):
         return IncidentType.ERROR
     def testclass_to_report(self):
@@ -234,6 +355,7 @@ class Error(Incident):
 
 
 class Warning(Incident):
+    __slots__ = ()
     def get_type(self):
         return IncidentType.WARNING
     def testclass_to_report(self):
@@ -0,0 +1,276 @@
+import os
+import bisect
+import mmap
+import pickle
+from array import array
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    import udtools.src.udtools.utils as utils
+    from udtools.src.udtools.registry import IdMap
+    from udtools.src.udtools.compression import detect_compression
+except ModuleNotFoundError:
+    import udtools.utils as utils
+    from udtools.registry import IdMap
+    from udtools.compression import detect_compression
+
+# Increase this number whenever the structure of the index files changes.
+INDEX_VERSION = 1
+# The index of FILE is stored in FILE + INDEX_SUFFIX.
+INDEX_SUFFIX = '.udindex'
+
+
+
+class SentenceIndex:
+    """
+    Index of the sentences of a CoNLL-U file, for random access to them:
+    the byte offset and the number of the first line of each sentence, and
+    the sentence ids. The sentences are numbered from 0 in the order of the
+    file. A sentence is what udtools.utils.next_sentence() would read: the
+    lines up to and including the next empty (or whitespace-only) line.
+
+    The offsets and line numbers are kept in arrays and the sentence ids in
+    an udtools.registry.IdMap, so the index of a large treebank is small. It
+    is stored in a sidecar file next to the CoNLL-U file (FILE.udindex) and
+    built again whenever the CoNLL-U file has changed (see for_file()). The
+    sentences are read from a memory map of the file.
+
+    Only LF and CR LF are recognized as line breaks (a lone CR is reported
+    by the validator as an error anyway, but here it does not start a new
+    line).
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            The CoNLL-U file. The index is empty until build() or load() is
+            called.
+        """
+        self.path = path
+        # Size and modification time of the file when it was indexed.
+        self.size = 0
+        self.mtime_ns = 0
+        # Byte offset of each sentence, plus the size of the file at the end.
+        self.offsets = array('Q', [0])
+        # Number of lines before each sentence, plus the number of lines in
+        # the file at the end.
+        self.lines = array('Q', [0])
+        # Key: sentence id; value: number of the first sentence with this id.
+        self.sent_ids = IdMap()
+        self._file = None
+        self._mm = None
+
+    @classmethod
+    def for_file(cls, path, save=True):
+        """
+        Returns the index of a file: the sidecar index if it is up to date,
+        otherwise a new index, which is saved as the sidecar (unless save is
+        False or the folder is not writable).
+        """
+        index = cls(path)
+        if not index.load():
+            index.build()
+            if save:
+                index.save()
+        return index
+
+    def build(self):
+        """
+        Reads the file and builds the index. Raises ValueError if the file is
+        compressed (the offsets in it would be useless).
+        """
+        if detect_compression(self.path):
+            raise ValueError(f'Cannot index the compressed file {self.path}; decompress it first.')
+        stat = os.stat(self.path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        offsets = array('Q')
+        lines = array('Q')
+        sent_ids = IdMap()
+        sent_id = None
+        offset = 0
+        lineno = 0
+        in_sentence = False
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not in_sentence:
+                    offsets.append(offset)
+                    lines.append(lineno)
+                    in_sentence = True
+                    sent_id = None
+                offset += len(line)
+                lineno += 1
+                # Only lines that begin with whitespace can be empty (see
+                # also next_sentence()). Other lines may be comments with the
+                # sentence id.
+                first = line[:1]
+                if first == b'#':
+                    match = utils.crex.sentid.fullmatch(line.rstrip(b'\r\n').decode('utf-8', 'replace'))
+                    if match:
+                        sent_id = match.group(1)
+                elif not first.isalnum():
+                    line = line.rstrip(b'\n').decode('utf-8', 'replace')
+                    if not line or utils.is_whitespace(line):
+                        in_sentence = False
+                        if sent_id != None and not sent_id in sent_ids:
+                            sent_ids[sent_id] = len(offsets) - 1
+        if in_sentence and sent_id != None and not sent_id in sent_ids:
+            sent_ids[sent_id] = len(offsets) - 1
+        offsets.append(offset)
+        lines.append(lineno)
+        self.offsets = offsets
+        self.lines = lines
+        self.sent_ids = sent_ids
+        self.close()
+
+    def sidecar_path(self):
+        return self.path + INDEX_SUFFIX
+
+    def is_up_to_date(self):
+        """
+        Is the index up to date with the file (same size and modification
+        time as when the index was built)?
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    def load(self):
+        """
+        Loads the sidecar index. Returns False (and leaves the index as it
+        was) if there is no usable sidecar index, or if it is out of date.
+        """
+        try:
+            with open(self.sidecar_path(), 'rb') as f:
+                data = pickle.load(f)
+        except Exception:
+            return False
+        if type(data) != dict or data.get('version') != INDEX_VERSION:
+            return False
+        size, mtime_ns = self.size, self.mtime_ns
+        self.size, self.mtime_ns = data['size'], data['mtime_ns']
+        if not self.is_up_to_date():
+            self.size, self.mtime_ns = size, mtime_ns
+            return False
+        self.offsets = data['offsets']
+        self.lines = data['lines']
+        self.sent_ids = data['sent_ids']
+        self.close()
+        return True
+
+    def save(self):
+        """
+        Saves the index as the sidecar file. As in udtools.cache, the file is
+        written to a temporary file first and then renamed, and failure to
+        save it is silently ignored.
+        """
+        data = {'version': INDEX_VERSION, 'size': self.size, 'mtime_ns': self.mtime_ns,
+                'offsets': self.offsets, 'lines': self.lines, 'sent_ids': self.sent_ids}
+        try:
+            tmppath = f'{self.sidecar_path()}.{os.getpid()}.tmp'
+            try:
+                with open(tmppath, 'wb') as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmppath, self.sidecar_path())
+            except BaseException:
+                os.unlink(tmppath)
+                raise
+        except OSError:
+            pass
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def find_sent_id(self, sent_id):
+        """
+        Returns the number of the (first) sentence with the given id, or None
+        if there is no such sentence.
+        """
+        return self.sent_ids[sent_id] if sent_id in self.sent_ids else None
+
+    def find_line(self, lineno):
+        """
+        Returns the number of the sentence that contains the given line
+        (1-based, as in the messages of the validator), or None if the file
+        does not have so many lines.
+        """
+        if lineno < 1 or lineno > self.lines[-1]:
+            return None
+        return bisect.bisect_left(self.lines, lineno) - 1
+
+    def first_line(self, i):
+        """
+        Returns the number of lines before sentence i (so that the first line
+        of the sentence is first_line(i) + 1).
+        """
+        return self.lines[i]
+
+    def shards(self, n):
+        """
+        Splits the sentences to at most n contiguous ranges of roughly the
+        same size in bytes, e.g. for validating the file in parallel.
+        Returns a list of (first sentence, last sentence + 1).
+        """
+        if len(self) == 0:
+            return []
+        bounds = [0]
+        for k in range(1, n):
+            i = bisect.bisect_left(self.offsets, self.offsets[-1] * k // n, lo=bounds[-1] + 1, hi=len(self))
+            if i < len(self) and i > bounds[-1]:
+                bounds.append(i)
+        bounds.append(len(self))
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def read_bytes(self, start, end=None):
+        """
+        Returns the bytes of the sentences from start to end (exclusive; by
+        default, only the sentence start), read from a memory map of the file.
+        """
+        if end == None:
+            end = start + 1
+        if self.offsets[-1] == 0:
+            return b''
+        if self._mm == None:
+            self._file = open(self.path, 'rb')
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm[self.offsets[start]:self.offsets[end]]
+
+    def read_text(self, start, end=None):
+        """
+        Returns the CoNLL-U text of the sentences from start to end (see
+        read_bytes()), with LF line breaks.
+        """
+        return self.read_bytes(start, end).decode('utf-8').replace('\r\n', '\n')
+
+    def sentence_lines(self, i):
+        """
+        Returns the lines of sentence i without the line breaks, as they
+        would be read by udtools.utils.next_sentence().
+        """
+        lines = self.read_text(i).split('\n')
+        # Text that ends with a line break has an extra empty item.
+        if len(lines) > 1 and lines[-1] == '':
+            lines.pop()
+        return lines
+
+    def close(self):
+        """
+        Closes the memory map (it is opened again when needed).
+        """
+        if self._mm != None:
+            self._mm.close()
+            self._file.close()
+        self._mm = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
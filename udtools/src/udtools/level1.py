@@ -11,11 +11,11 @@ import unicodedata
 # from udtools import Validator.
 try:
     import udtools.src.udtools.utils as utils
-    from udtools.src.udtools.incident import Incident, Error, TestClass
+    from udtools.src.udtools.incident import Error, TestClass
     ###!!!from udtools.src.udtools.logging_utils import setup_logging
 except ModuleNotFoundError:
     import udtools.utils as utils
-    from udtools.incident import Incident, Error, TestClass
+    from udtools.incident import Error, TestClass
     ###!!!from udtools.logging_utils import setup_logging
 
 ###!!!logger = logging.getLogger(__name__)
@@ -88,8 +88,8 @@ class Level1:
             Is it OK to run subsequent checks? It can be OK even after some
             less severe errors.
         """
-        Incident.default_level = 1
-        Incident.default_testclass = TestClass.FORMAT
+        state.incident_defaults.level = 1
+        state.incident_defaults.testclass = TestClass.FORMAT
         # When we arrive here, state.current_line points to the last line of the
         # sentence, that is, the terminating empty line (if the input is valid).
         lines = state.current_lines
@@ -100,10 +100,14 @@ class Level1:
         seen_token_node = False # at least one such line per sentence required
         last_line_is_empty = False
         ok = True # is it ok to run subsequent tests? It can be ok even after some less severe errors.
+        # Test the normalization of the whole sentence at once; only if it
+        # fails, we have to find the offending lines.
+        check_nfc = not utils.is_nfc('\n'.join(lines))
         for i in range(n_lines):
             lineno = state.comment_start_line + i
             line = lines[i]
-            self.check_unicode_normalization(state, line, lineno)
+            if check_nfc:
+                self.check_unicode_normalization(state, line, lineno)
             # Comment lines.
             if line and line[0] == '#':
                 # We will really validate sentence ids later. But now we want to remember
@@ -165,7 +169,7 @@ class Level1:
                     Error(
                         state=state, config=self.incfg, lineno=lineno,
                         testid='invalid-line',
-                        message=f"Spurious line: '{line}'. All non-empty lines should start with a digit or the # character."
+                        message=lambda: f"Spurious line: '{line}'. All non-empty lines should start with a digit or the # character."
                     ).confirm()
                     ok = False
         # If the last line is not empty (e.g. because the file ended prematurely),
@@ -223,8 +227,8 @@ class Level1:
             Is it OK to run subsequent checks? It can be OK even after some
             less severe errors.
         """
-        Incident.default_level = 1
-        Incident.default_testclass = TestClass.FORMAT
+        state.incident_defaults.level = 1
+        state.incident_defaults.testclass = TestClass.FORMAT
         n_comment_lines = state.sentence_line-state.comment_start_line
         n_lines = len(state.current_lines)
         # Normally we should exclude the last line because it is the empty line
@@ -235,6 +239,10 @@ class Level1:
         n_token_lines = len(token_lines)
         token_lines_fields = [] # List of token/word lines of the current sentence, converted from string to list of fields.
         ok = True # is it ok to run subsequent tests? It can be ok even after some less severe errors.
+        # Most sentences have no whitespace other than the TABs between the
+        # columns, and no empty columns. A bulk test of all lines tells us
+        # whether we have to test the columns one by one.
+        check_ws = utils.has_suspicious_whitespace('\n'.join(token_lines))
         for i in range(n_token_lines):
             lineno = state.sentence_line + i
             line = token_lines[i]
@@ -245,12 +253,17 @@ class Level1:
             # an exception if a column value is missing.
             if len(cols) == COLCOUNT:
                 # Low-level tests, mostly universal constraints on whitespace in fields, also format of the ID field.
-                self.check_whitespace(state, cols, lineno)
+                if check_ws:
+                    self.check_whitespace(state, cols, lineno)
+                else:
+                    # Keep the default line number of incidents as if
+                    # check_whitespace() had been called.
+                    state.incident_defaults.lineno = lineno
             else:
                 Error(
                     state=state, config=self.incfg, lineno=lineno,
                     testid='number-of-columns',
-                    message=f'The line has {len(cols)} columns but {COLCOUNT} are expected.'
+                    message=lambda: f'The line has {len(cols)} columns but {COLCOUNT} are expected.'
                 ).confirm()
                 ok = False
         state.current_token_node_table = token_lines_fields
@@ -284,6 +297,8 @@ class Level1:
         ---------
         unicode-normalization
         """
+        if utils.is_nfc(text):
+            return
         normalized_text = unicodedata.normalize('NFC', text)
         if text != normalized_text:
             # Find the first unmatched character and include it in the report.
@@ -345,9 +360,9 @@ class Level1:
         trailing-whitespace
         repeated-whitespace
         """
-        Incident.default_level = 1
-        Incident.default_testclass = TestClass.FORMAT
-        Incident.default_lineno = lineno
+        state.incident_defaults.level = 1
+        state.incident_defaults.testclass = TestClass.FORMAT
+        state.incident_defaults.lineno = lineno
         # Some whitespace may be permitted in FORM, LEMMA and MISC but not elsewhere.
         # Multi-word tokens may have whitespaces in MISC but not in FORM or LEMMA.
         # If it contains a space, it does not make sense to treat it as a MWT.
@@ -359,14 +374,14 @@ class Level1:
                 Error(
                     state=state, config=self.incfg,
                     testid='invalid-whitespace-mwt',
-                    message=f"White space not allowed in multi-word token '{cols[col_idx]}'. If it contains a space, it is not a single surface token."
+                    message=lambda: f"White space not allowed in multi-word token '{cols[col_idx]}'. If it contains a space, it is not a single surface token."
                 ).confirm()
             # These columns must not have whitespace.
             elif col_idx in (ID, UPOS, XPOS, FEATS, HEAD, DEPREL, DEPS) and utils.crex.ws.search(cols[col_idx]):
                 Error(
                     state=state, config=self.incfg,
                     testid='invalid-whitespace',
-                    message=f"White space not allowed in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
+                    message=lambda: f"White space not allowed in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
                 ).confirm()
             # Only perform the following tests if we have not found and reported a space above.
             else:
@@ -375,7 +390,7 @@ class Level1:
                     Error(
                         state=state, config=self.incfg,
                         testid='empty-column',
-                        message=f"Empty value in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
+                        message=lambda: f"Empty value in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
                     ).confirm()
                 else:
                     # Must never have leading/trailing/repeated whitespace.
@@ -384,20 +399,20 @@ class Level1:
                         Error(
                             state=state, config=self.incfg,
                             testid='leading-whitespace',
-                            message=f"Leading whitespace not allowed in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
+                            message=lambda: f"Leading whitespace not allowed in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
                         ).confirm()
                     if cols[col_idx][-1].isspace():
                         Error(
                             state=state, config=self.incfg,
                             testid='trailing-whitespace',
-                            message=f"Trailing whitespace not allowed in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
+                            message=lambda: f"Trailing whitespace not allowed in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
                         ).confirm()
                     # Must never contain two consecutive whitespace characters
                     if utils.crex.ws2.search(cols[col_idx]):
                         Error(
                             state=state, config=self.incfg,
                             testid='repeated-whitespace',
-                            message=f"Two or more consecutive whitespace characters not allowed in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
+                            message=lambda: f"Two or more consecutive whitespace characters not allowed in column {COLNAMES[col_idx]}: '{cols[col_idx]}'."
                         ).confirm()
 
 
@@ -445,8 +460,13 @@ class Level1:
             less severe errors.
         """
         ok = True
-        Incident.default_level = 1
-        Incident.default_testclass = TestClass.FORMAT
+        state.incident_defaults.level = 1
+        state.incident_defaults.testclass = TestClass.FORMAT
+        # The most common sequence, words 1, 2, ... without multiword tokens
+        # and empty nodes, cannot have any of the errors below.
+        ids = [cols[ID] for cols in state.current_token_node_table]
+        if ids == [str(x) for x in range(1, len(ids) + 1)]:
+            return True
         words=[]
         tokens=[]
         current_word_id, next_empty_id = 0, 1
@@ -458,7 +478,7 @@ class Level1:
                 Error(
                     state=state, config=self.incfg, lineno=lineno,
                     testid='invalid-word-id',
-                    message=f"Unexpected ID format '{cols[ID]}'."
+                    message=lambda: f"Unexpected ID format '{cols[ID]}'."
                 ).confirm()
                 ok = False
                 continue
@@ -477,7 +497,7 @@ class Level1:
                     Error(
                         state=state, config=self.incfg, lineno=lineno,
                         testid='invalid-word-interval',
-                        message=f"Spurious word interval definition: '{cols[ID]}'."
+                        message=lambda: f"Spurious word interval definition: '{cols[ID]}'."
                     ).confirm()
                     ok = False
                     continue
@@ -497,7 +517,7 @@ class Level1:
                     Error(
                         state=state, config=self.incfg, lineno=lineno,
                         testid='misplaced-empty-node',
-                        message=f'Empty node id {cols[ID]}, expected {current_word_id}.{next_empty_id}'
+                        message=lambda: f'Empty node id {cols[ID]}, expected {current_word_id}.{next_empty_id}'
                     ).confirm()
                     ok = False
                 next_empty_id += 1
@@ -509,7 +529,7 @@ class Level1:
                     Error(
                         state=state, config=self.incfg, lineno=lineno,
                         testid='misplaced-empty-node',
-                        message=f"Empty node id {cols[ID]} must occur before multiword token {tokens[-1][0]}-{tokens[-1][1]}."
+                        message=lambda: f"Empty node id {cols[ID]} must occur before multiword token {tokens[-1][0]}-{tokens[-1][1]}."
                     ).confirm()
                     ok = False
         # Now let's do some basic sanity checks on the sequences.
@@ -520,7 +540,7 @@ class Level1:
             Error(
                 state=state, config=self.incfg, lineno=-1,
                 testid='word-id-sequence',
-                message=f"Words do not form a sequence. Got '{wrdstrseq}'. Expected '{expstrseq}'."
+                message=lambda: f"Words do not form a sequence. Got '{wrdstrseq}'. Expected '{expstrseq}'."
             ).confirm()
             ok = False
         # Check elementary sanity of word intervals.
@@ -530,7 +550,7 @@ class Level1:
                 Error(
                     state=state, config=self.incfg, lineno=lineno,
                     testid='reversed-word-interval',
-                    message=f'Spurious token interval {b}-{e}'
+                    message=lambda: f'Spurious token interval {b}-{e}'
                 ).confirm()
                 ok = False
                 continue
@@ -538,7 +558,7 @@ class Level1:
                 Error(
                     state=state, config=self.incfg, lineno=lineno,
                     testid='word-interval-out',
-                    message=f'Spurious token interval {b}-{e} (out of range)'
+                    message=lambda: f'Spurious token interval {b}-{e} (out of range)'
                 ).confirm()
                 ok = False
                 continue
@@ -576,8 +596,8 @@ class Level1:
             less severe errors.
         """
         ok = True
-        Incident.default_level = 1
-        Incident.default_testclass = TestClass.FORMAT
+        state.incident_defaults.level = 1
+        state.incident_defaults.testclass = TestClass.FORMAT
         covered = set()
         for i in range(len(state.current_token_node_table)):
             lineno = state.sentence_line + i
@@ -589,7 +609,7 @@ class Level1:
                 Error(
                     state=state, config=self.incfg, lineno=lineno,
                     testid='invalid-word-interval',
-                    message=f"Spurious word interval definition: '{cols[ID]}'."
+                    message=lambda: f"Spurious word interval definition: '{cols[ID]}'."
                 ).confirm()
                 continue
             start, end = m.groups()
@@ -599,7 +619,7 @@ class Level1:
                 Error(
                     state=state, config=self.incfg, lineno=lineno,
                     testid='overlapping-word-intervals',
-                    message=f'Range overlaps with others: {cols[ID]}'
+                    message=lambda: f'Range overlaps with others: {cols[ID]}'
                 ).confirm()
                 ok = False
             covered |= set(range(start, end+1))
@@ -624,13 +644,16 @@ class Level1:
         state : udtools.state.State
             The state of the validation run.
         inp : TextIO
-            File handler that is being read.
+            File handler that is being read. The test relies on its newlines
+            attribute (see io.TextIOWrapper); streams without it are not
+            tested.
 
         Incidents
         ---------
         non-unix-newline
         """
-        if inp.newlines and inp.newlines != '\n':
+        newlines = getattr(inp, 'newlines', None)
+        if newlines and newlines != '\n':
             Error(
                 state=state, config=self.incfg,
                 level=1,
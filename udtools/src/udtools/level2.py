@@ -14,11 +14,11 @@ import regex as re
 # from udtools import Validator.
 try:
     import udtools.src.udtools.utils as utils
-    from udtools.src.udtools.incident import Incident, Error, Warning, TestClass, Reference
+    from udtools.src.udtools.incident import Error, Warning, TestClass, Reference
     from udtools.src.udtools.level1 import Level1
 except ModuleNotFoundError:
     import udtools.utils as utils
-    from udtools.incident import Incident, Error, Warning, TestClass, Reference
+    from udtools.incident import Error, Warning, TestClass, Reference
     from udtools.level1 import Level1
 
 
@@ -77,7 +77,7 @@ class Level2(Level1):
                     level=2,
                     testclass=TestClass.FORMAT,
                     testid='mwt-nonempty-field',
-                    message=f"A multi-word token line must have '_' in the column {COLNAMES[col_idx]}. Now: '{cols[col_idx]}'."
+                    message=lambda: f"A multi-word token line must have '_' in the column {COLNAMES[col_idx]}. Now: '{cols[col_idx]}'."
                 ).confirm()
 
 
@@ -111,7 +111,7 @@ class Level2(Level1):
                     level=2,
                     testclass=TestClass.FORMAT,
                     testid='empty-node-nonempty-field',
-                    message=f"An empty node must have '_' in the column {COLNAMES[col_idx]}. Now: '{cols[col_idx]}'."
+                    message=lambda: f"An empty node must have '_' in the column {COLNAMES[col_idx]}. Now: '{cols[col_idx]}'."
                 ).confirm()
 
 
@@ -145,7 +145,7 @@ class Level2(Level1):
                 level=2,
                 testclass=TestClass.MORPHO,
                 testid='unknown-upos',
-                message=f"Unknown UPOS tag: '{cols[UPOS]}'."
+                message=lambda: f"Unknown UPOS tag: '{cols[UPOS]}'."
             ).confirm()
 
 
@@ -180,9 +180,9 @@ class Level2(Level1):
             There were no errors or the errors are not so severe that we should
             refrain from loading the sentence into Udapi.
         """
-        Incident.default_lineno = line
-        Incident.default_level = 2
-        Incident.default_testclass = TestClass.MORPHO
+        state.incident_defaults.lineno = line
+        state.incident_defaults.level = 2
+        state.incident_defaults.testclass = TestClass.MORPHO
         feats = cols[FEATS]
         if feats == '_':
             return True
@@ -192,7 +192,7 @@ class Level2(Level1):
             Error(
                 state=state, config=self.incfg,
                 testid='unsorted-features',
-                message=f"Morphological features must be sorted: '{feats}'."
+                message=lambda: f"Morphological features must be sorted: '{feats}'."
             ).confirm()
         attr_set = set() # I'll gather the set of features here to check later that none is repeated.
         # Subsequent higher-level tests could fail if a feature is not in the
@@ -205,7 +205,7 @@ class Level2(Level1):
                 Error(
                     state=state, config=self.incfg,
                     testid='invalid-feature',
-                    message=f"Spurious morphological feature: '{f}'. Should be of the form Feature=Value and must start with [A-Z] and only contain [A-Za-z0-9]."
+                    message=lambda: f"Spurious morphological feature: '{f}'. Should be of the form Feature=Value and must start with [A-Z] and only contain [A-Za-z0-9]."
                 ).confirm()
                 attr_set.add(f) # to prevent misleading error "Repeated features are disallowed"
                 safe = False
@@ -218,27 +218,27 @@ class Level2(Level1):
                     Error(
                         state=state, config=self.incfg,
                         testid='repeated-feature-value',
-                        message=f"Repeated feature values are disallowed: '{feats}'"
+                        message=lambda: f"Repeated feature values are disallowed: '{feats}'"
                     ).confirm()
                 if [v.lower() for v in values] != sorted(v.lower() for v in values):
                     Error(
                         state=state, config=self.incfg,
                         testid='unsorted-feature-values',
-                        message=f"If a feature has multiple values, these must be sorted: '{f}'"
+                        message=lambda: f"If a feature has multiple values, these must be sorted: '{f}'"
                     ).confirm()
                 for v in values:
                     if not utils.crex.val.fullmatch(v):
                         Error(
                             state=state, config=self.incfg,
                             testid='invalid-feature-value',
-                            message=f"Spurious value '{v}' in '{f}'. Must start with [A-Z0-9] and only contain [A-Za-z0-9]."
+                            message=lambda: f"Spurious value '{v}' in '{f}'. Must start with [A-Z0-9] and only contain [A-Za-z0-9]."
                         ).confirm()
                     # Level 2 tests character properties and canonical order but not that the f-v pair is known.
         if len(attr_set) != len(feat_list):
             Error(
                 state=state, config=self.incfg,
                 testid='repeated-feature',
-                message=f"Repeated features are disallowed: '{feats}'."
+                message=lambda: f"Repeated features are disallowed: '{feats}'."
             ).confirm()
         return safe
 
@@ -296,10 +296,10 @@ class Level2(Level1):
         Incidents
         ---------
         invalid-deprel
-        unknown-deprel
+        unknown-udeprel
         """
-        Incident.default_level = 2
-        Incident.default_lineno = line
+        state.incident_defaults.level = 2
+        state.incident_defaults.lineno = line
         if utils.is_multiword_token(cols):
             return
         # Empty nodes must have '_' in DEPREL but that has been already checked
@@ -311,7 +311,7 @@ class Level2(Level1):
                 state=state, config=self.incfg,
                 testclass=TestClass.SYNTAX,
                 testid='invalid-deprel',
-                message=f"Invalid DEPREL value '{cols[DEPREL]}'. Only lowercase English letters or a colon are expected."
+                message=lambda: f"Invalid DEPREL value '{cols[DEPREL]}'. Only lowercase English letters or a colon are expected."
             ).confirm()
         else:
             # At this level, ignore the language-specific lists and use
@@ -324,7 +324,7 @@ class Level2(Level1):
                     state=state, config=self.incfg,
                     testclass=TestClass.SYNTAX,
                     testid='unknown-udeprel',
-                    message=f"Unknown main DEPREL type: '{deprel}'."
+                    message=lambda: f"Unknown main DEPREL type: '{deprel}'."
                 ).confirm()
 
 
@@ -367,8 +367,8 @@ class Level2(Level1):
         invalid-edeprel
         unknown-eudeprel
         """
-        Incident.default_level = 2
-        Incident.default_lineno = line
+        state.incident_defaults.level = 2
+        state.incident_defaults.lineno = line
         if utils.is_multiword_token(cols):
             return
         if cols[DEPS] == '_':
@@ -388,7 +388,7 @@ class Level2(Level1):
                 state=state, config=self.incfg,
                 testclass=TestClass.FORMAT,
                 testid='unsorted-deps',
-                message=f"DEPS not sorted by head index: '{cols[DEPS]}'."
+                message=lambda: f"DEPS not sorted by head index: '{cols[DEPS]}'."
             ).confirm()
         else:
             lasth = None
@@ -400,14 +400,14 @@ class Level2(Level1):
                             state=state, config=self.incfg,
                             testclass=TestClass.FORMAT,
                             testid='unsorted-deps-2',
-                            message=f"DEPS pointing to head '{h}' not sorted by relation type: '{cols[DEPS]}'."
+                            message=lambda: f"DEPS pointing to head '{h}' not sorted by relation type: '{cols[DEPS]}'."
                         ).confirm()
                     elif d == lastd:
                         Error(
                             state=state, config=self.incfg,
                             testclass=TestClass.FORMAT,
                             testid='repeated-deps',
-                            message=f"DEPS contain multiple instances of the same relation '{h}:{d}'."
+                            message=lambda: f"DEPS contain multiple instances of the same relation '{h}:{d}'."
                         ).confirm()
                 lasth = h
                 lastd = d
@@ -417,7 +417,7 @@ class Level2(Level1):
                 state=state, config=self.incfg,
                 testclass=TestClass.ENHANCED,
                 testid='deps-self-loop',
-                message=f"Self-loop in DEPS for '{cols[ID]}'"
+                message=lambda: f"Self-loop in DEPS for '{cols[ID]}'"
             ).confirm()
         # At this level, ignore the language-specific lists and use language
         # 'ud' instead.
@@ -429,7 +429,7 @@ class Level2(Level1):
                     state=state, config=self.incfg,
                     testclass=TestClass.ENHANCED,
                     testid='invalid-edeprel',
-                    message=f"Invalid enhanced relation type: '{cols[DEPS]}'."
+                    message=lambda: f"Invalid enhanced relation type: '{cols[DEPS]}'."
                 ).confirm()
             else:
                 # Test only the universal part if testing at universal level.
@@ -439,7 +439,7 @@ class Level2(Level1):
                         state=state, config=self.incfg,
                         testclass=TestClass.ENHANCED,
                         testid='unknown-eudeprel',
-                        message=f"Unknown main relation type '{udeprel}' in '{head}:{deprel}'."
+                        message=lambda: f"Unknown main relation type '{udeprel}' in '{head}:{deprel}'."
                     ).confirm()
 
 
@@ -473,9 +473,9 @@ class Level2(Level1):
         misc-attr-typo
         repeated-misc
         """
-        Incident.default_lineno = line
-        Incident.default_level = 2
-        Incident.default_testclass = TestClass.FORMAT
+        state.incident_defaults.lineno = line
+        state.incident_defaults.level = 2
+        state.incident_defaults.testclass = TestClass.FORMAT
         if cols[MISC] == '_':
             return
         misc = [ma.split('=', 1) for ma in cols[MISC].split('|')]
@@ -492,7 +492,7 @@ class Level2(Level1):
                     Warning(
                         state=state, config=self.incfg,
                         testid='empty-misc-key',
-                        message=f"Empty MISC attribute name in '{ma[0]}={ma[1]}'."
+                        message=lambda: f"Empty MISC attribute name in '{ma[0]}={ma[1]}'."
                     ).confirm()
             # We do not warn about MISC items that do not contain '='.
             # But the remaining error messages below assume that ma[1] exists.
@@ -502,25 +502,25 @@ class Level2(Level1):
                 Warning(
                     state=state, config=self.incfg,
                     testid='misc-extra-space',
-                    message=f"MISC attribute name starts with space in '{ma[0]}={ma[1]}'."
+                    message=lambda: f"MISC attribute name starts with space in '{ma[0]}={ma[1]}'."
                 ).confirm()
             elif re.search(r"\s$", ma[0]):
                 Warning(
                     state=state, config=self.incfg,
                     testid='misc-extra-space',
-                    message=f"MISC attribute name ends with space in '{ma[0]}={ma[1]}'."
+                    message=lambda: f"MISC attribute name ends with space in '{ma[0]}={ma[1]}'."
                 ).confirm()
             elif re.match(r"^\s", ma[1]):
                 Warning(
                     state=state, config=self.incfg,
                     testid='misc-extra-space',
-                    message=f"MISC attribute value starts with space in '{ma[0]}={ma[1]}'."
+                    message=lambda: f"MISC attribute value starts with space in '{ma[0]}={ma[1]}'."
                 ).confirm()
             elif re.search(r"\s$", ma[1]):
                 Warning(
                     state=state, config=self.incfg,
                     testid='misc-extra-space',
-                    message=f"MISC attribute value ends with space in '{ma[0]}={ma[1]}'."
+                    message=lambda: f"MISC attribute value ends with space in '{ma[0]}={ma[1]}'."
                 ).confirm()
             if re.match(r"^(SpaceAfter|Lang|Translit|LTranslit|Gloss|LId|LDeriv|Ref)$", ma[0]):
                 mamap.setdefault(ma[0], 0)
@@ -529,7 +529,7 @@ class Level2(Level1):
                 Warning(
                     state=state, config=self.incfg,
                     testid='misc-attr-typo',
-                    message=f"Possible typo (case or spaces) in MISC attribute '{ma[0]}={ma[1]}'."
+                    message=lambda: f"Possible typo (case or spaces) in MISC attribute '{ma[0]}={ma[1]}'."
                 ).confirm()
         for a in list(mamap):
             if mamap[a] > 1:
@@ -537,7 +537,7 @@ class Level2(Level1):
                     state=state, config=self.incfg,
                     testclass=TestClass.FORMAT, # this one is real error
                     testid='repeated-misc',
-                    message=f"MISC attribute '{a}' not supposed to occur twice"
+                    message=lambda: f"MISC attribute '{a}' not supposed to occur twice"
                 ).confirm()
 
 
@@ -583,8 +583,8 @@ class Level2(Level1):
             less severe errors.
         """
         ok = True
-        Incident.default_level = 2
-        Incident.default_testclass = TestClass.FORMAT
+        state.incident_defaults.level = 2
+        state.incident_defaults.testclass = TestClass.FORMAT
         ids = set([cols[ID] for cols in state.current_token_node_table if utils.is_word(cols) or utils.is_empty_node(cols)])
         for i in range(len(state.current_token_node_table)):
             lineno = state.sentence_line + i
@@ -599,7 +599,7 @@ class Level2(Level1):
                     Error(
                         state=state, config=self.incfg, lineno=lineno,
                         testid='invalid-head',
-                        message=f"Invalid HEAD: '{cols[HEAD]}'."
+                        message=lambda: f"Invalid HEAD: '{cols[HEAD]}'."
                     ).confirm()
                     ok = False
                 if not (cols[HEAD] in ids or cols[HEAD] == '0'):
@@ -607,7 +607,7 @@ class Level2(Level1):
                         state=state, config=self.incfg, lineno=lineno,
                         testclass=TestClass.SYNTAX,
                         testid='unknown-head',
-                        message=f"Undefined HEAD (no such ID): '{cols[HEAD]}'."
+                        message=lambda: f"Undefined HEAD (no such ID): '{cols[HEAD]}'."
                     ).confirm()
                     ok = False
             try:
@@ -617,7 +617,7 @@ class Level2(Level1):
                 Error(
                     state=state, config=self.incfg, lineno=lineno,
                     testid='invalid-deps',
-                    message=f"Failed to parse DEPS: '{cols[DEPS]}'."
+                    message=lambda: f"Failed to parse DEPS: '{cols[DEPS]}'."
                 ).confirm()
                 ok = False
                 continue
@@ -627,7 +627,7 @@ class Level2(Level1):
                     Error(
                         state=state, config=self.incfg, lineno=lineno,
                         testid='invalid-ehead',
-                        message=f"Invalid enhanced head reference: '{head}'."
+                        message=lambda: f"Invalid enhanced head reference: '{head}'."
                     ).confirm()
                     ok = False
                 if not (head in ids or head == '0'):
@@ -635,7 +635,7 @@ class Level2(Level1):
                         state=state, config=self.incfg, lineno=lineno,
                         testclass=TestClass.ENHANCED,
                         testid='unknown-ehead',
-                        message=f"Undefined enhanced head reference (no such ID): '{head}'."
+                        message=lambda: f"Undefined enhanced head reference (no such ID): '{head}'."
                     ).confirm()
                     ok = False
         return ok
@@ -687,8 +687,8 @@ class Level2(Level1):
             Is it OK to run subsequent checks? It can be OK even after some
             less severe errors.
         """
-        Incident.default_level = 2
-        Incident.default_testclass = TestClass.SYNTAX
+        state.incident_defaults.level = 2
+        state.incident_defaults.testclass = TestClass.SYNTAX
         children = {} # int(node id) -> set of children
         n_words = 0
         for i in range(len(state.current_token_node_table)):
@@ -706,7 +706,7 @@ class Level2(Level1):
                 Error(
                     state=state, config=self.incfg, lineno=lineno,
                     testid='head-self-loop',
-                    message=f'HEAD == ID for {cols[ID]}'
+                    message=lambda: f'HEAD == ID for {cols[ID]}'
                 ).confirm()
                 return False
             # Incrementally build the set of children of every node.
@@ -723,7 +723,7 @@ class Level2(Level1):
             Error(
                 state=state, config=self.incfg, lineno=state.sentence_line,
                 testid='multiple-roots',
-                message=f"Multiple root words: {children_0}",
+                message=lambda: f"Multiple root words: {children_0}",
                 references=references
             ).confirm()
             return False
@@ -747,7 +747,7 @@ class Level2(Level1):
             Error(
                 state=state, config=self.incfg, lineno=state.sentence_line,
                 testid='non-tree',
-                message=f'Non-tree structure. Words {str_unreachable} are not reachable from the root 0.'
+                message=lambda: f'Non-tree structure. Words {str_unreachable} are not reachable from the root 0.'
             ).confirm()
             return False
         return True
@@ -774,6 +774,16 @@ class Level2(Level1):
             The line number (relative to input file, 1-based) of the first
             node/token line in the current sentence.
 
+        Writes to state
+        ----------------
+        seen_enhanced_graph : int
+            The line of the first sentence with an enhanced graph.
+        seen_tree_without_enhanced_graph : int
+            The line of the first sentence without an enhanced graph.
+        last_enhanced_graph_line : int
+            The last node line of the most recent sentence with an enhanced
+            graph (see Validator.validate_end()).
+
         Incidents
         ---------
         edeps-only-sometimes
@@ -789,17 +799,18 @@ class Level2(Level1):
         # However, we should not allow that one sentence has a connected egraph and another
         # has no enhanced dependencies. Such inconsistency could come as a nasty surprise
         # to the users.
-        Incident.default_lineno = state.sentence_line
-        Incident.default_level = 2
-        Incident.default_testclass = TestClass.ENHANCED
+        state.incident_defaults.lineno = state.sentence_line
+        state.incident_defaults.level = 2
+        state.incident_defaults.testclass = TestClass.ENHANCED
         if egraph_exists:
+            state.last_enhanced_graph_line = state.sentence_line + len(state.current_token_node_table) - 1
             if not state.seen_enhanced_graph:
                 state.seen_enhanced_graph = state.sentence_line
                 if state.seen_tree_without_enhanced_graph:
                     Error(
                         state=state, config=self.incfg,
                         testid='edeps-only-sometimes',
-                        message=f"Enhanced graph must be empty because we saw empty DEPS on line {state.seen_tree_without_enhanced_graph}"
+                        message=lambda: f"Enhanced graph must be empty because we saw empty DEPS on line {state.seen_tree_without_enhanced_graph}"
                     ).confirm()
         else:
             if not state.seen_tree_without_enhanced_graph:
@@ -808,7 +819,7 @@ class Level2(Level1):
                     Error(
                         state=state, config=self.incfg,
                         testid='edeps-only-sometimes',
-                        message=f"Enhanced graph cannot be empty because we saw non-empty DEPS on line {state.seen_enhanced_graph}"
+                        message=lambda: f"Enhanced graph cannot be empty because we saw non-empty DEPS on line {state.seen_enhanced_graph}"
                     ).confirm()
 
 
@@ -823,7 +834,7 @@ class Level2(Level1):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        nodes : list of udapi.core.node.Node objects
+        nodes : list of udtools.sentence.Node objects
             List of nodes in the sentence, including empty nodes, sorted by word
             order.
 
@@ -879,7 +890,7 @@ class Level2(Level1):
                 level=2,
                 testclass=TestClass.ENHANCED,
                 testid='unconnected-egraph',
-                message=f"Enhanced graph is not connected. Nodes {sur} are not reachable from any root"
+                message=lambda: f"Enhanced graph is not connected. Nodes {sur} are not reachable from any root"
             ).confirm()
             return None
 
@@ -916,12 +927,12 @@ class Level2(Level1):
         sentence_line : int
             The line number (relative to input file, 1-based) of the first
             node/token line in the current sentence.
-        known_sent_ids : set
+        known_sent_ids : udtools.registry.IdSet
             Sentence ids already seen in this treebank.
 
         Writes to state
         ----------------
-        known_sent_ids : set
+        known_sent_ids : udtools.registry.IdSet
             Sentence ids already seen in this treebank.
 
         Incidents
@@ -932,9 +943,9 @@ class Level2(Level1):
             non-unique-sent-id
             slash-in-sent-id
         """
-        Incident.default_level = 2
-        Incident.default_testclass = TestClass.METADATA
-        Incident.default_lineno = -1 # use the first line after the comments
+        state.incident_defaults.level = 2
+        state.incident_defaults.testclass = TestClass.METADATA
+        state.incident_defaults.lineno = -1 # use the first line after the comments
         n_comment_lines = state.sentence_line-state.comment_start_line
         comments = state.current_lines[0:n_comment_lines]
         matched = []
@@ -947,7 +958,7 @@ class Level2(Level1):
                     Error(
                         state=state, config=self.incfg,
                         testid='invalid-sent-id',
-                        message=f"Spurious sent_id line: '{c}' should look like '# sent_id = xxxxx' where xxxxx is not whitespace. Forward slash reserved for special purposes."
+                        message=lambda: f"Spurious sent_id line: '{c}' should look like '# sent_id = xxxxx' where xxxxx is not whitespace. Forward slash reserved for special purposes."
                     ).confirm()
         if not matched:
             Error(
@@ -969,13 +980,13 @@ class Level2(Level1):
                 Error(
                     state=state, config=self.incfg,
                     testid='non-unique-sent-id',
-                    message=f"Non-unique sent_id attribute '{sid}'."
+                    message=lambda: f"Non-unique sent_id attribute '{sid}'."
                 ).confirm()
             if sid.count('/') > 1 or (sid.count('/') == 1 and self.lang != 'ud'):
                 Error(
                     state=state, config=self.incfg,
                     testid='slash-in-sent-id',
-                    message=f"The forward slash is reserved for special use in parallel treebanks: '{sid}'"
+                    message=lambda: f"The forward slash is reserved for special use in parallel treebanks: '{sid}'"
                 ).confirm()
             state.known_sent_ids.add(sid)
 
@@ -1010,17 +1021,17 @@ class Level2(Level1):
         sentence_line : int
             The line number (relative to input file, 1-based) of the first
             node/token line in the current sentence.
-        known_parallel_ids : set
+        known_parallel_ids : udtools.registry.IdSet
             Parallel sentence ids already seen in this treebank.
-        parallel_id_lastalt : dict
-        parallel_id_lastpart : dict
+        parallel_id_lastalt : udtools.registry.IdMap
+        parallel_id_lastpart : udtools.registry.IdMap
 
         Writes to state
         ----------------
-        known_parallel_ids : set
+        known_parallel_ids : udtools.registry.IdSet
             Parallel sentence ids already seen in this treebank.
-        parallel_id_lastalt : dict
-        parallel_id_lastpart : dict
+        parallel_id_lastalt : udtools.registry.IdMap
+        parallel_id_lastpart : udtools.registry.IdMap
 
         Incidents
         ---------
@@ -1030,9 +1041,9 @@ class Level2(Level1):
             parallel-id-alt
             parallel-id-part
         """
-        Incident.default_level = 2
-        Incident.default_testclass = TestClass.METADATA
-        Incident.default_lineno = -1 # use the first line after the comments
+        state.incident_defaults.level = 2
+        state.incident_defaults.testclass = TestClass.METADATA
+        state.incident_defaults.lineno = -1 # use the first line after the comments
         n_comment_lines = state.sentence_line-state.comment_start_line
         comments = state.current_lines[0:n_comment_lines]
         matched = []
@@ -1045,7 +1056,7 @@ class Level2(Level1):
                     Error(
                         state=state, config=self.incfg,
                         testid='invalid-parallel-id',
-                        message=f"Spurious parallel_id line: '{c}' should look like '# parallel_id = corpus/sentence' where corpus is [a-z]+ and sentence is [-0-9a-z]. Optionally, '/alt[1-9][0-9]*' and/or 'part[1-9][0-9]*' may follow."
+                        message=lambda: f"Spurious parallel_id line: '{c}' should look like '# parallel_id = corpus/sentence' where corpus is [a-z]+ and sentence is [-0-9a-z]. Optionally, '/alt[1-9][0-9]*' and/or 'part[1-9][0-9]*' may follow."
                     ).confirm()
         if len(matched) > 1:
             Error(
@@ -1061,7 +1072,7 @@ class Level2(Level1):
                 Error(
                     state=state, config=self.incfg,
                     testid='non-unique-parallel-id',
-                    message=f"Non-unique parallel_id attribute '{pid}'."
+                    message=lambda: f"Non-unique parallel_id attribute '{pid}'."
                 ).confirm()
             else:
                 # Additional tests when pid has altN or partN.
@@ -1084,19 +1095,19 @@ class Level2(Level1):
                         Error(
                             state=state, config=self.incfg,
                             testid='parallel-id-alt',
-                            message=f"Some instances of parallel sentence '{sid}' have the 'alt' suffix while others do not."
+                            message=lambda: f"Some instances of parallel sentence '{sid}' have the 'alt' suffix while others do not."
                         ).confirm()
                     elif alt != None and alt != state.parallel_id_lastalt[sid] + 1:
                         Error(
                             state=state, config=self.incfg,
                             testid='parallel-id-alt',
-                            message=f"The alt suffix of parallel sentence '{sid}' should be {state.parallel_id_lastalt[sid]}+1 but it is {alt}."
+                            message=lambda: f"The alt suffix of parallel sentence '{sid}' should be {state.parallel_id_lastalt[sid]}+1 but it is {alt}."
                         ).confirm()
                 elif alt != None and alt != 1:
                     Error(
                         state=state, config=self.incfg,
                         testid='parallel-id-alt',
-                        message=f"The alt suffix of parallel sentence '{sid}' should be 1 but it is {alt}."
+                        message=lambda: f"The alt suffix of parallel sentence '{sid}' should be 1 but it is {alt}."
                     ).confirm()
                 state.parallel_id_lastalt[sid] = alt
                 if sid in state.parallel_id_lastpart:
@@ -1104,19 +1115,19 @@ class Level2(Level1):
                         Error(
                             state=state, config=self.incfg,
                             testid='parallel-id-part',
-                            message=f"Some instances of parallel sentence '{sid}' have the 'part' suffix while others do not."
+                            message=lambda: f"Some instances of parallel sentence '{sid}' have the 'part' suffix while others do not."
                         ).confirm()
                     elif part != None and part != state.parallel_id_lastpart[sid] + 1:
                         Error(
                             state=state, config=self.incfg,
                             testid='parallel-id-part',
-                            message=f"The part suffix of parallel sentence '{sid}' should be {state.parallel_id_lastpart[sid]}+1 but it is {part}."
+                            message=lambda: f"The part suffix of parallel sentence '{sid}' should be {state.parallel_id_lastpart[sid]}+1 but it is {part}."
                         ).confirm()
                 elif part != None and part != 1:
                     Error(
                         state=state, config=self.incfg,
                         testid='parallel-id-part',
-                        message=f"The part suffix of parallel sentence '{sid}' should be 1 but it is {part}."
+                        message=lambda: f"The part suffix of parallel sentence '{sid}' should be 1 but it is {part}."
                     ).confirm()
                 state.parallel_id_lastpart[sid] = part
             state.known_parallel_ids.add(pid)
@@ -1153,17 +1164,17 @@ class Level2(Level1):
         sentence_line : int
             The line number (relative to input file, 1-based) of the first
             node/token line in the current sentence.
-        known_parallel_ids : set
+        known_parallel_ids : udtools.registry.IdSet
             Parallel sentence ids already seen in this treebank.
-        parallel_id_lastalt : dict
-        parallel_id_lastpart : dict
+        parallel_id_lastalt : udtools.registry.IdMap
+        parallel_id_lastpart : udtools.registry.IdMap
 
         Writes to state
         ----------------
-        known_parallel_ids : set
+        known_parallel_ids : udtools.registry.IdSet
             Parallel sentence ids already seen in this treebank.
-        parallel_id_lastalt : dict
-        parallel_id_lastpart : dict
+        parallel_id_lastalt : udtools.registry.IdMap
+        parallel_id_lastpart : udtools.registry.IdMap
 
         Incidents
         ---------
@@ -1172,6 +1183,7 @@ class Level2(Level1):
         spaceafter-newdocpar
         missing-text
         multiple-text
+        empty-text
         text-trailing-whitespace
         nospaceafter-yes
         spaceafter-value
@@ -1181,9 +1193,9 @@ class Level2(Level1):
         missing-spaceafter
         text-extra-chars
         """
-        Incident.default_level = 2
-        Incident.default_testclass = TestClass.METADATA
-        Incident.default_lineno = -1 # use the first line after the comments
+        state.incident_defaults.level = 2
+        state.incident_defaults.testclass = TestClass.METADATA
+        state.incident_defaults.lineno = -1 # use the first line after the comments
         n_comment_lines = state.sentence_line-state.comment_start_line
         comments = state.current_lines[0:n_comment_lines]
         newdoc_matched = []
@@ -1298,7 +1310,7 @@ class Level2(Level1):
                             state=state, config=self.incfg,
                             lineno=state.sentence_line+iline,
                             testid='text-form-mismatch',
-                            message=f"Mismatch between the text attribute and the FORM field. Form[{cols[ID]}] is '{cols[FORM]}' but text is '{stext[:len(cols[FORM])+20]}...'"+extra_message
+                            message=lambda: f"Mismatch between the text attribute and the FORM field. Form[{cols[ID]}] is '{cols[FORM]}' but text is '{stext[:len(cols[FORM])+20]}...'"+extra_message
                         ).confirm()
                         mismatch_reported = 1
                 else:
@@ -1314,12 +1326,12 @@ class Level2(Level1):
                                 state=state, config=self.incfg,
                                 lineno=state.sentence_line+iline,
                                 testid='missing-spaceafter',
-                                message=f"'SpaceAfter=No' is missing in the MISC field of node {cols[ID]} because the text is '{utils.shorten(cols[FORM]+stext)}'."
+                                message=lambda: f"'SpaceAfter=No' is missing in the MISC field of node {cols[ID]} because the text is '{utils.shorten(cols[FORM]+stext)}'."
                             ).confirm()
                         stext = stext.lstrip()
             if stext:
                 Error(
                     state=state, config=self.incfg,
                     testid='text-extra-chars',
-                    message=f"Extra characters at the end of the text attribute, not accounted for in the FORM fields: '{stext}'"
+                    message=lambda: f"Extra characters at the end of the text attribute, not accounted for in the FORM fields: '{stext}'"
                 ).confirm()
@@ -14,11 +14,13 @@ import regex as re
 # from udtools import Validator.
 try:
     import udtools.src.udtools.utils as utils
-    from udtools.src.udtools.incident import Incident, Error, Warning, TestClass
+    from udtools.src.udtools.incident import Error, Warning, TestClass
+    from udtools.src.udtools.dispatch import applies_to
     from udtools.src.udtools.level2 import Level2
 except ModuleNotFoundError:
     import udtools.utils as utils
-    from udtools.incident import Incident, Error, Warning, TestClass
+    from udtools.incident import Error, Warning, TestClass
+    from udtools.dispatch import applies_to
     from udtools.level2 import Level2
 
 
@@ -40,7 +42,7 @@ class Level3(Level2):
 
         Parameters
         ----------
-        feats : udapi.core.dualdict.DualDict object
+        feats : udtools.sentence.AttributeDict object
             The feature-value set to be tested whether they contain the required one.
         required_feature : str
             The name of the required feature.
@@ -63,12 +65,15 @@ class Level3(Level2):
             if state.seen_morpho_feature:
                 incident.confirm()
             else:
+                # The incident may wait until the end of the treebank. Its
+                # message must not keep the sentence (the node) in memory.
+                incident.render()
                 if not incident.testid in state.delayed_feature_errors:
                     state.delayed_feature_errors[incident.testid] = {'occurrences': []}
                 state.delayed_feature_errors[incident.testid]['occurrences'].append({'incident': incident})
 
 
-    def check_expected_features(self, state, node):
+    def check_expected_features(self, state, node, context):
         """
         Certain features are expected to occur with certain UPOS or certain values
         of other features. This function issues warnings instead of errors, as
@@ -82,28 +87,24 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
         pron-det-without-prontype
         verbform-fin-without-mood
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 3
-        Incident.default_testclass = TestClass.MORPHO
+        state.incident_defaults.lineno = context.lineno(node)
+        state.incident_defaults.level = 3
+        state.incident_defaults.testclass = TestClass.MORPHO
         if node.upos in ['PRON', 'DET']:
             self.check_required_feature(state, node.feats, 'PronType', None, Warning(
                 state=state, config=self.incfg,
                 testid='pron-det-without-prontype',
-                message=f"The word '{utils.formtl(node)}' is tagged '{node.upos}' but it lacks the 'PronType' feature"
+                message=lambda: f"The word '{utils.formtl(node)}' is tagged '{node.upos}' but it lacks the 'PronType' feature"
             ))
         # See https://github.com/UniversalDependencies/docs/issues/1155 for
         # complaints about this warning.
@@ -111,7 +112,7 @@ class Level3(Level2):
             Warning(
                 state=state, config=self.incfg,
                 testid='verbform-fin-without-mood',
-                message=f"Finite verb '{utils.formtl(node)}' lacks the 'Mood' feature"
+                message=lambda: f"Finite verb '{utils.formtl(node)}' lacks the 'Mood' feature"
             ).confirm()
         # We have to exclude AUX from the following test because they could be
         # nonverbal and Mood could be their lexical feature
@@ -126,7 +127,7 @@ class Level3(Level2):
 
 
 
-    def check_zero_root(self, state, node):
+    def check_zero_root(self, state, node, context):
         """
         Checks that DEPREL is "root" iff HEAD is 0.
 
@@ -134,16 +135,12 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The node whose incoming relation will be validated. This function
             operates on both regular and empty nodes. Make sure to call it for
             empty nodes, too!
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
@@ -152,9 +149,9 @@ class Level3(Level2):
         enhanced-0-is-not-root
         enhanced-root-is-not-0
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 3
-        Incident.default_testclass = TestClass.SYNTAX
+        state.incident_defaults.lineno = context.lineno(node)
+        state.incident_defaults.level = 3
+        state.incident_defaults.testclass = TestClass.SYNTAX
         if not node.is_empty():
             if node.parent.ord == 0 and node.udeprel != 'root':
                 Error(
@@ -187,7 +184,7 @@ class Level3(Level2):
 
 
 
-    def check_upos_vs_deprel(self, state, node):
+    def check_upos_vs_deprel(self, state, node, context):
         """
         For certain relations checks that the dependent word belongs to an expected
         part-of-speech category. Occasionally we may have to check the children of
@@ -197,14 +194,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
@@ -222,9 +215,9 @@ class Level3(Level2):
         upos-rel-punct
         rel-upos-fixed
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 3
-        Incident.default_testclass = TestClass.SYNTAX
+        state.incident_defaults.lineno = context.lineno(node)
+        state.incident_defaults.level = 3
+        state.incident_defaults.testclass = TestClass.SYNTAX
         # Occasionally a word may be marked by the feature ExtPos as acting as
         # a part of speech different from its usual one (which is given in UPOS).
         # Typical examples are words that head fixed multiword expressions (the
@@ -236,17 +229,17 @@ class Level3(Level2):
         if node.feats['ExtPos']:
             upos = node.feats['ExtPos']
         # This is a level 3 test, we will check only the universal part of the relation.
-        deprel = node.udeprel
-        childrels = set([x.udeprel for x in node.children])
+        deprel = context.udeprel(node)
+        childrels = context.child_udeprels(node)
         # It is recommended that the head of a fixed expression always has ExtPos,
         # even if it does not need it to pass the tests in this function.
         if 'fixed' in childrels and not node.feats['ExtPos']:
-            fixed_forms = [node.form] + [x.form for x in node.children if x.udeprel == 'fixed']
+            fixed_forms = [node.form] + [x.form for x in context.children(node, 'fixed')]
             str_fixed_forms = ' '.join(fixed_forms)
             Warning(
                 state=state, config=self.incfg,
                 testid='fixed-without-extpos',
-                message=f"Fixed expression '{str_fixed_forms}' does not have the 'ExtPos' feature"
+                message=lambda: f"Fixed expression '{str_fixed_forms}' does not have the 'ExtPos' feature"
             ).confirm()
         # Certain relations are reserved for nominals and cannot be used for verbs.
         # Nevertheless, they can appear with adjectives or adpositions if they are promoted due to ellipsis.
@@ -259,7 +252,7 @@ class Level3(Level2):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-det',
-                message=f"'det' should be 'DET' or 'PRON' but it is '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'det' should be 'DET' or 'PRON' but it is '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         # Nummod is for "number phrases" only. This could be interpreted as NUM only,
         # but some languages treat some cardinal numbers as NOUNs, and in
@@ -269,7 +262,7 @@ class Level3(Level2):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-nummod',
-                message=f"'nummod' should be 'NUM' but it is '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'nummod' should be 'NUM' but it is '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         # Advmod is for adverbs, perhaps particles but not for prepositional phrases or clauses.
         # Nevertheless, we should allow adjectives because they can be used as adverbs in some languages.
@@ -281,28 +274,28 @@ class Level3(Level2):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-advmod',
-                message=f"'advmod' should be 'ADV' but it is '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'advmod' should be 'ADV' but it is '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         # Known expletives are pronouns. Determiners and particles are probably acceptable, too.
         if deprel == 'expl' and not re.match(r"^(PRON|DET|PART)$", upos):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-expl',
-                message=f"'expl' should normally be 'PRON' but it is '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'expl' should normally be 'PRON' but it is '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         # Auxiliary verb/particle must be AUX.
         if deprel == 'aux' and not re.match(r"^(AUX)", upos):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-aux',
-                message=f"'aux' should be 'AUX' but it is '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'aux' should be 'AUX' but it is '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         # Copula is an auxiliary verb/particle (AUX) or a pronoun (PRON|DET).
         if deprel == 'cop' and not re.match(r"^(AUX|PRON|DET|SYM)", upos):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-cop',
-                message=f"'cop' should be 'AUX' or 'PRON'/'DET' but it is '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'cop' should be 'AUX' or 'PRON'/'DET' but it is '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         # Case is normally an adposition, maybe particle.
         # However, there are also secondary adpositions and they may have the original POS tag:
@@ -313,7 +306,7 @@ class Level3(Level2):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-case',
-                message=f"'case' should not be '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'case' should not be '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         # Mark is normally a conjunction or adposition, maybe particle but definitely not a pronoun.
         ###!!! February 2022: Temporarily allow mark+VERB ("regarding"). In the future, it should be banned again
@@ -326,37 +319,38 @@ class Level3(Level2):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-mark',
-                message=f"'mark' should not be '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'mark' should not be '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         # Cc is a conjunction, possibly an adverb or particle.
         if deprel == 'cc' and re.match(r"^(NOUN|PROPN|ADJ|PRON|DET|NUM|VERB|AUX|INTJ)", upos):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-cc',
-                message=f"'cc' should not be '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'cc' should not be '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         if deprel == 'punct' and upos != 'PUNCT':
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-punct',
-                message=f"'punct' must be 'PUNCT' but it is '{upos}' ('{utils.formtl(node)}')"
+                message=lambda: f"'punct' must be 'PUNCT' but it is '{upos}' ('{utils.formtl(node)}')"
             ).confirm()
         if upos == 'PUNCT' and not re.match(r"^(punct|root)", deprel):
             Error(
                 state=state, config=self.incfg,
                 testid='upos-rel-punct',
-                message=f"'PUNCT' must be 'punct' but it is '{node.deprel}' ('{utils.formtl(node)}')"
+                message=lambda: f"'PUNCT' must be 'punct' but it is '{node.deprel}' ('{utils.formtl(node)}')"
             ).confirm()
         if upos == 'PROPN' and (deprel == 'fixed' or 'fixed' in childrels):
             Error(
                 state=state, config=self.incfg,
                 testid='rel-upos-fixed',
-                message=f"'fixed' should not be used for proper nouns ('{utils.formtl(node)}')."
+                message=lambda: f"'fixed' should not be used for proper nouns ('{utils.formtl(node)}')."
             ).confirm()
 
 
 
-    def check_flat_foreign(self, state, node):
+    @applies_to(udeprels=['flat'])
+    def check_flat_foreign(self, state, node, context):
         """
         flat:foreign is an optional subtype of flat. It is used to connect two words
         in a code-switched segment of foreign words if the annotators did not want
@@ -368,28 +362,24 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
         flat-foreign-upos-feats
         """
-        Incident.default_level = 3
-        Incident.default_testclass = TestClass.MORPHO
+        state.incident_defaults.level = 3
+        state.incident_defaults.testclass = TestClass.MORPHO
         if node.deprel != 'flat:foreign':
             return
         parent = node.parent
         if node.upos != 'X' or str(node.feats) != 'Foreign=Yes':
             Warning(
                 state=state, config=self.incfg,
-                lineno=state.current_node_linenos[str(node.ord)],
+                lineno=context.lineno(node),
                 nodeid=node.ord,
                 testid='flat-foreign-upos-feats',
                 message="The child of a flat:foreign relation should have UPOS X and Foreign=Yes (but no other features)."
@@ -397,7 +387,7 @@ class Level3(Level2):
         if parent.upos != 'X' or str(parent.feats) != 'Foreign=Yes':
             Warning(
                 state=state, config=self.incfg,
-                lineno=state.current_node_linenos[str(parent.ord)],
+                lineno=context.lineno(parent),
                 nodeid=parent.ord,
                 testid='flat-foreign-upos-feats',
                 message="The parent of a flat:foreign relation should have UPOS X and Foreign=Yes (but no other features)."
@@ -405,7 +395,8 @@ class Level3(Level2):
 
 
 
-    def check_left_to_right_relations(self, state, node):
+    @applies_to(udeprels=['conj', 'fixed', 'flat', 'goeswith', 'appos'])
+    def check_left_to_right_relations(self, state, node, context):
         """
         Certain UD relations must always go left-to-right (in the logical order,
         meaning that parent precedes child, disregarding that some languages have
@@ -417,14 +408,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
@@ -446,17 +433,17 @@ class Level3(Level2):
                 # We keep it in the testid but we make the testmessage more neutral.
                 Error(
                     state=state, config=self.incfg,
-                    lineno=state.current_node_linenos[str(node.ord)],
+                    lineno=context.lineno(node),
                     nodeid=node.ord,
                     level=3,
                     testclass=TestClass.SYNTAX,
                     testid=f"right-to-left-{node.udeprel}",
-                    message=f"Parent of relation '{node.deprel}' must precede the child in the word order."
+                    message=lambda: f"Parent of relation '{node.deprel}' must precede the child in the word order."
                 ).confirm()
 
 
 
-    def check_single_subject(self, state, node):
+    def check_single_subject(self, state, node, context):
         """
         No predicate should have more than one subject.
         An xcomp dependent normally has no subject, but in some languages the
@@ -486,8 +473,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Reads from state
         ----------------
@@ -502,38 +491,39 @@ class Level3(Level2):
 
         def is_inner_subject(node):
             """
-            Takes a node (udapi.core.node.Node). Tells whether the node's deprel is
+            Takes a node (udtools.sentence.Node). Tells whether the node's deprel is
             nsubj or csubj without the :outer subtype. Alternatively, instead of the
             :outer subtype, the node could have Subject=Outer in MISC.
             """
-            if not re.search(r'subj', node.udeprel):
+            if node.deprel in ('nsubj:outer', 'csubj:outer'):
                 return False
-            if re.match(r'^[nc]subj:outer$', node.deprel):
-                return False
-            if node.misc['Subject'] == 'Outer':
+            if context.misc(node)['Subject'] == 'Outer':
                 return False
             return True
 
-        subjects = [x for x in node.children if is_inner_subject(x)]
-        subject_ids = [x.ord for x in subjects]
-        subject_forms = [utils.formtl(x) for x in subjects]
-        subject_references = utils.create_references(subjects, state, 'Subject')
+        # Only relations whose universal part contains 'subj' are subjects.
+        groups = context.children_by_udeprel[node.ord]
+        subjects = [x for udeprel in groups if udeprel is not None and 'subj' in udeprel for x in groups[udeprel] if is_inner_subject(x)]
         if len(subjects) > 1:
+            subjects.sort()
+            subject_ids = [x.ord for x in subjects]
+            subject_forms = [utils.formtl(x) for x in subjects]
+            subject_references = utils.create_references(subjects, state, 'Subject')
             Error(
                 state=state, config=self.incfg,
-                lineno=state.current_node_linenos[str(node.ord)],
+                lineno=context.lineno(node),
                 nodeid=node.ord,
                 level=3,
                 testclass=TestClass.SYNTAX,
                 testid='too-many-subjects',
-                message=f"Multiple subjects {str(subject_ids)} ({str(subject_forms)[1:-1]}) under the predicate '{utils.formtl(node)}' not subtyped as ':outer'.",
+                message=lambda: f"Multiple subjects {str(subject_ids)} ({str(subject_forms)[1:-1]}) under the predicate '{utils.formtl(node)}' not subtyped as ':outer'.",
                 explanation="Outer subjects are allowed if a clause acts as the predicate of another clause.",
                 references=subject_references
             ).confirm()
 
 
 
-    def check_single_object(self, state, node):
+    def check_single_object(self, state, node, context):
         """
         No predicate should have more than one direct object (number of indirect
         objects is unlimited). Theoretically, ccomp should be understood as a
@@ -544,8 +534,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Reads from state
         ----------------
@@ -557,25 +549,26 @@ class Level3(Level2):
         ---------
         too-many-objects
         """
-        objects = [x for x in node.children if x.udeprel == 'obj']
-        object_ids = [x.ord for x in objects]
-        object_forms = [utils.formtl(x) for x in objects]
-        object_references = utils.create_references(objects, state, 'Object')
+        objects = context.children(node, 'obj')
         if len(objects) > 1:
+            object_ids = [x.ord for x in objects]
+            object_forms = [utils.formtl(x) for x in objects]
+            object_references = utils.create_references(objects, state, 'Object')
             Error(
                 state=state, config=self.incfg,
-                lineno=state.current_node_linenos[str(node.ord)],
+                lineno=context.lineno(node),
                 nodeid=node.ord,
                 level=3,
                 testclass=TestClass.SYNTAX,
                 testid='too-many-objects',
-                message=f"Multiple direct objects {str(object_ids)} ({str(object_forms)[1:-1]}) under the predicate '{utils.formtl(node)}'.",
+                message=lambda: f"Multiple direct objects {str(object_ids)} ({str(object_forms)[1:-1]}) under the predicate '{utils.formtl(node)}'.",
                 references=object_references
             ).confirm()
 
 
 
-    def check_nmod_obl(self, state, node):
+    @applies_to(udeprels=['obl'])
+    def check_nmod_obl(self, state, node, context):
         """
         The difference between nmod and obl is that the former modifies a
         nominal while the latter modifies a predicate of a clause. Typically
@@ -591,8 +584,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Reads from state
         ----------------
@@ -618,22 +613,23 @@ class Level3(Level2):
             # copulas under the clause head, also it will still not catch
             # everything.
             if node.parent.udeprel in ['nsubj', 'obj', 'iobj', 'obl', 'vocative', 'dislocated', 'expl', 'nmod']:
-                clause_indicators = [x for x in node.parent.children if x.udeprel in ['cop', 'nsubj', 'csubj']]
-                if not clause_indicators:
+                pchildrels = context.child_udeprels(node.parent)
+                if not ('cop' in pchildrels or 'nsubj' in pchildrels or 'csubj' in pchildrels):
                     Error(
                         state=state, config=self.incfg,
-                        lineno=state.current_node_linenos[str(node.ord)],
+                        lineno=context.lineno(node),
                         nodeid=node.ord,
                         level=3,
                         testclass=TestClass.SYNTAX,
                         testid='obl-should-be-nmod',
-                        message=f"The parent (node [{node.parent.ord}] '{utils.formtl(node.parent)}') is a nominal (and not a predicate), hence the relation should be 'nmod', not 'obl'.",
+                        message=lambda: f"The parent (node [{node.parent.ord}] '{utils.formtl(node.parent)}') is a nominal (and not a predicate), hence the relation should be 'nmod', not 'obl'.",
                         references=utils.create_references([node.parent], state, 'Parent')
                     ).confirm()
 
 
 
-    def check_orphan(self, state, node):
+    @applies_to(udeprels=['orphan'])
+    def check_orphan(self, state, node, context):
         """
         The orphan relation is used to attach an unpromoted orphan to the promoted
         orphan in gapping constructions. A common error is that the promoted orphan
@@ -644,8 +640,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Reads from state
         ----------------
@@ -673,18 +671,19 @@ class Level3(Level2):
             if not re.match(r"^(conj|parataxis|root|csubj|ccomp|advcl|acl|reparandum)$", node.parent.udeprel):
                 Warning(
                     state=state, config=self.incfg,
-                    lineno=state.current_node_linenos[str(node.ord)],
+                    lineno=context.lineno(node),
                     nodeid=node.ord,
                     level=3,
                     testclass=TestClass.SYNTAX,
                     testid='orphan-parent',
-                    message=f"The parent of 'orphan' should normally be 'conj' but it is '{node.parent.udeprel}'.",
+                    message=lambda: f"The parent of 'orphan' should normally be 'conj' but it is '{node.parent.udeprel}'.",
                     references=utils.create_references([node.parent], state, 'Parent')
                 ).confirm()
 
 
 
-    def check_functional_leaves(self, state, node):
+    @applies_to(udeprels=['case', 'mark', 'cc', 'aux', 'cop', 'det', 'clf', 'fixed', 'goeswith', 'punct'])
+    def check_functional_leaves(self, state, node, context):
         """
         Most of the time, function-word nodes should be leaves. This function
         checks for known exceptions and warns in the other cases.
@@ -694,14 +693,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
@@ -722,9 +717,9 @@ class Level3(Level2):
             pfeats = node.feats
             for child in node.children:
                 idchild = child.ord
-                Incident.default_lineno = state.current_node_linenos[str(idchild)]
-                Incident.default_level = 3
-                Incident.default_testclass = TestClass.SYNTAX
+                state.incident_defaults.lineno = context.lineno(child)
+                state.incident_defaults.level = 3
+                state.incident_defaults.testclass = TestClass.SYNTAX
                 cdeprel = child.udeprel
                 # The guidelines explicitly say that negation can modify any function word
                 # (see https://universaldependencies.org/u/overview/syntax.html#function-word-modifiers).
@@ -773,14 +768,14 @@ class Level3(Level2):
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='leaf-mark-case',
-                        message=f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
+                        message=lambda: f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
                     ).confirm()
                 if re.match(r"^(aux|cop)$", pdeprel) and not re.match(r"^(goeswith|fixed|reparandum|conj|cc|punct)$", cdeprel):
                     Error(
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='leaf-aux-cop',
-                        message=f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
+                        message=lambda: f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
                     ).confirm()
                 # Classifiers must be allowed under demonstrative determiners according to the clf guidelines.
                 # People have identified various constructions where the restriction
@@ -821,21 +816,21 @@ class Level3(Level2):
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='leaf-det',
-                        message=f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
+                        message=lambda: f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
                     ).confirm()
                 if re.match(r"^(clf)$", pdeprel) and not re.match(r"^(advmod|obl|goeswith|fixed|reparandum|conj|cc|punct)$", cdeprel):
                     Error(
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='leaf-clf',
-                        message=f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
+                        message=lambda: f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
                     ).confirm()
                 if re.match(r"^(cc)$", pdeprel) and not re.match(r"^(goeswith|fixed|reparandum|conj|punct)$", cdeprel):
                     Error(
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='leaf-cc',
-                        message=f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
+                        message=lambda: f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
                     ).confirm()
                 # Fixed expressions should not be nested, i.e., no chains of fixed relations.
                 # As they are supposed to represent functional elements, they should not have
@@ -850,7 +845,7 @@ class Level3(Level2):
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='leaf-fixed',
-                        message=f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
+                        message=lambda: f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
                     ).confirm()
                 # Goeswith cannot have any children, not even another goeswith.
                 elif pdeprel == 'goeswith':
@@ -858,7 +853,7 @@ class Level3(Level2):
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='leaf-goeswith',
-                        message=f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
+                        message=lambda: f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
                     ).confirm()
                 # Punctuation can exceptionally have other punct children if an exclamation
                 # mark is in brackets or quotes. It cannot have other children.
@@ -867,12 +862,12 @@ class Level3(Level2):
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='leaf-punct',
-                        message=f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
+                        message=lambda: f"'{pdeprel}' not expected to have children ({idparent}:{node.form}:{pdeprel} --> {idchild}:{child.form}:{cdeprel})"
                     ).confirm()
 
 
 
-    def check_fixed_span(self, state, node):
+    def check_fixed_span(self, state, node, context):
         """
         Like with goeswith, the fixed relation should not in general skip words that
         are not part of the fixed expression. Unlike goeswith however, there can be
@@ -886,40 +881,36 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
         fixed-gap
         """
-        fxchildren = [c for c in node.children if c.udeprel == 'fixed']
+        fxchildren = context.children(node, 'fixed')
         if fxchildren:
             fxlist = sorted([node] + fxchildren)
-            fxrange = [n for n in node.root.descendants if n.ord >= node.ord and n.ord <= fxchildren[-1].ord]
+            fxrange = context.span(node, fxchildren[-1])
             # All nodes between me and my last fixed child should be either fixed or punct.
-            fxgap = [n for n in fxrange if n.udeprel != 'punct' and n not in fxlist]
+            fxgap = [n for n in fxrange if context.udeprel(n) != 'punct' and n not in fxlist]
             if fxgap:
                 fxordlist = [n.ord for n in fxlist]
                 fxexpr = ' '.join([(n.form if n in fxlist else '*') for n in fxrange])
                 Warning(
                     state=state, config=self.incfg,
-                    lineno=state.current_node_linenos[str(node.ord)],
+                    lineno=context.lineno(node),
                     nodeid=node.ord,
                     level=3,
                     testclass=TestClass.SYNTAX,
                     testid='fixed-gap',
-                    message=f"Gaps in fixed expression {str(fxordlist)} '{fxexpr}'"
+                    message=lambda: f"Gaps in fixed expression {str(fxordlist)} '{fxexpr}'"
                 ).confirm()
 
 
-    def check_goeswith_span(self, state, node):
+    def check_goeswith_span(self, state, node, context):
         """
         The relation 'goeswith' is used to connect word parts that are separated
         by whitespace and should be one word instead. We assume that the relation
@@ -932,14 +923,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
@@ -947,13 +934,13 @@ class Level3(Level2):
         goeswith-nospace
         goeswith-missing-typo
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 3
-        Incident.default_testclass = TestClass.SYNTAX
-        gwchildren = [c for c in node.children if c.udeprel == 'goeswith']
+        state.incident_defaults.lineno = context.lineno(node)
+        state.incident_defaults.level = 3
+        state.incident_defaults.testclass = TestClass.SYNTAX
+        gwchildren = context.children(node, 'goeswith')
         if gwchildren:
             gwlist = sorted([node] + gwchildren)
-            gwrange = [n for n in node.root.descendants if n.ord >= node.ord and n.ord <= gwchildren[-1].ord]
+            gwrange = context.span(node, gwchildren[-1])
             # All nodes between me and my last goeswith child should be goeswith too.
             if gwlist != gwrange:
                 gwordlist = [n.ord for n in gwlist]
@@ -962,10 +949,10 @@ class Level3(Level2):
                     state=state, config=self.incfg,
                     nodeid=node.ord,
                     testid='goeswith-gap',
-                    message=f"Gaps in goeswith group {str(gwordlist)} != {str(gwordrange)}."
+                    message=lambda: f"Gaps in goeswith group {str(gwordlist)} != {str(gwordrange)}."
                 ).confirm()
             # Non-last node in a goeswith range must have a space after itself.
-            nospaceafter = [x for x in gwlist[:-1] if x.misc['SpaceAfter'] == 'No']
+            nospaceafter = [x for x in gwlist[:-1] if context.misc(x)['SpaceAfter'] == 'No']
             if nospaceafter:
                 Error(
                     state=state, config=self.incfg,
@@ -988,7 +975,8 @@ class Level3(Level2):
 
 
 
-    def check_goeswith_morphology_and_edeps(self, state, node):
+    @applies_to(udeprels=['goeswith'])
+    def check_goeswith_morphology_and_edeps(self, state, node, context):
         """
         If a node has the 'goeswith' incoming relation, it is a non-first part of
         a mistakenly interrupted word. The lemma, upos tag and morphological features
@@ -998,14 +986,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
@@ -1014,9 +998,9 @@ class Level3(Level2):
         goeswith-feats
         goeswith-edeps
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 3
-        Incident.default_testclass = TestClass.MORPHO
+        state.incident_defaults.lineno = context.lineno(node)
+        state.incident_defaults.level = 3
+        state.incident_defaults.testclass = TestClass.MORPHO
         if node.udeprel == 'goeswith':
             if node.lemma != '_':
                 Error(
@@ -1050,7 +1034,8 @@ class Level3(Level2):
 
 
 
-    def check_projective_punctuation(self, state, node):
+    @applies_to(udeprels=['punct'])
+    def check_projective_punctuation(self, state, node, context):
         """
         Punctuation is not supposed to cause nonprojectivity or to be attached
         nonprojectively.
@@ -1059,8 +1044,10 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The tree node to be tested.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Reads from state
         ----------------
@@ -1073,9 +1060,9 @@ class Level3(Level2):
         punct-causes-nonproj
         punct-is-nonproj
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 3
-        Incident.default_testclass = TestClass.SYNTAX
+        state.incident_defaults.lineno = context.lineno(node)
+        state.incident_defaults.level = 3
+        state.incident_defaults.testclass = TestClass.SYNTAX
         if node.udeprel == 'punct':
             nonprojnodes = utils.get_caused_nonprojectivities(node)
             if nonprojnodes:
@@ -1084,7 +1071,7 @@ class Level3(Level2):
                     state=state, config=self.incfg,
                     nodeid=node.ord,
                     testid='punct-causes-nonproj',
-                    message=f"Punctuation must not cause non-projectivity of nodes {nonprojids}",
+                    message=lambda: f"Punctuation must not cause non-projectivity of nodes {nonprojids}",
                     references=utils.create_references(nonprojnodes, state, 'Node made nonprojective')
                 ).confirm()
             gapnodes = utils.get_gap(node)
@@ -1094,13 +1081,13 @@ class Level3(Level2):
                     state=state, config=self.incfg,
                     nodeid=node.ord,
                     testid='punct-is-nonproj',
-                    message=f"Punctuation must not be attached non-projectively over nodes {gapids}",
+                    message=lambda: f"Punctuation must not be attached non-projectively over nodes {gapids}",
                     references=utils.create_references(gapnodes, state, 'Node in gap')
                 ).confirm()
 
 
 
-    def check_enhanced_orphan(self, state, node):
+    def check_enhanced_orphan(self, state, node, context):
         """
         Checks universally valid consequences of the annotation guidelines in the
         enhanced representation. Currently tests only phenomena specific to the
@@ -1112,26 +1099,22 @@ class Level3(Level2):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The node whose incoming relation will be validated. This function
             operates on both regular and empty nodes. Make sure to call it for
             empty nodes, too!
-
-        Reads from state
-        ----------------
-        current_node_linenos : dict(str: int)
-            Mapping from node ids (including empty nodes) to line numbers in
-            the input file.
+        context : udtools.sentence.SentenceContext
+            Facts about the sentence shared by the level 3 tests.
 
         Incidents
         ---------
         empty-node-after-eorphan
         eorphan-after-empty-node
         """
-        lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_lineno = lineno
-        Incident.default_level = 3
-        Incident.default_testclass = TestClass.ENHANCED
+        lineno = context.lineno(node)
+        state.incident_defaults.lineno = lineno
+        state.incident_defaults.level = 3
+        state.incident_defaults.testclass = TestClass.ENHANCED
         # Enhanced dependencies should not contain the orphan relation.
         # However, all types of enhancements are optional and orphans are excluded
         # only if this treebank addresses gapping. We do not know it until we see
@@ -1148,7 +1131,7 @@ class Level3(Level2):
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='empty-node-after-eorphan',
-                        message=f"Empty node means that we address gapping and there should be no orphans in the enhanced graph; but we saw one on line {state.seen_enhanced_orphan}"
+                        message=lambda: f"Empty node means that we address gapping and there should be no orphans in the enhanced graph; but we saw one on line {state.seen_enhanced_orphan}"
                     ).confirm()
         udeprels = set([utils.lspec2ud(edep['deprel']) for edep in node.deps])
         if 'orphan' in udeprels:
@@ -1160,5 +1143,5 @@ class Level3(Level2):
                     state=state, config=self.incfg,
                     nodeid=node.ord,
                     testid='eorphan-after-empty-node',
-                    message=f"'orphan' not allowed in enhanced graph because we saw an empty node on line {state.seen_empty_node}"
+                    message=lambda: f"'orphan' not allowed in enhanced graph because we saw an empty node on line {state.seen_empty_node}"
                 ).confirm()
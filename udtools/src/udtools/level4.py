@@ -14,11 +14,11 @@ import regex as re
 # from udtools import Validator.
 try:
     import udtools.src.udtools.utils as utils
-    from udtools.src.udtools.incident import Incident, Error, TestClass
+    from udtools.src.udtools.incident import Error, TestClass
     from udtools.src.udtools.level3 import Level3
 except ModuleNotFoundError:
     import udtools.utils as utils
-    from udtools.incident import Incident, Error, TestClass
+    from udtools.incident import Error, TestClass
     from udtools.level3 import Level3
 
 
@@ -42,7 +42,7 @@ class Level4(Level3):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The node whose incoming relation will be validated. This function
             operates on both regular and empty nodes. Make sure to call it for
             empty nodes, too!
@@ -57,17 +57,16 @@ class Level4(Level3):
         ---------
         invalid-word-with-space
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 4
-        Incident.default_testclass = TestClass.FORMAT
+        state.incident_defaults.lineno = state.current_node_linenos[str(node.ord)]
+        state.incident_defaults.level = 4
+        state.incident_defaults.testclass = TestClass.FORMAT
         # List of permited words with spaces is language-specific.
         # The current token may be in a different language due to code switching.
-        tospacedata = self.data.get_tospace_for_language(self.lang)
         lang = self.lang
         altlang = utils.get_alt_language(node)
         if altlang:
             lang = altlang
-            tospacedata = self.data.get_tospace_for_language(altlang)
+        tospacedata = self.data.get_profile(lang).tospace
         for column in ('FORM', 'LEMMA'):
             word = node.form if column == 'FORM' else node.lemma
             # Is there whitespace in the word?
@@ -81,16 +80,16 @@ class Level4(Level3):
                             state=state, config=self.incfg,
                             nodeid=node.ord,
                             testid='invalid-word-with-space',
-                            message=f"'{word}' in column {column} is not on the list of exceptions allowed to contain whitespace.",
-                            explanation=self.data.explain_tospace(lang)
+                            message=lambda: f"'{word}' in column {column} is not on the list of exceptions allowed to contain whitespace.",
+                            explanation=lambda: self.data.explain_tospace(lang)
                         ).confirm()
                 else:
                     Error(
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='invalid-word-with-space',
-                        message=f"'{word}' in column {column} is not on the list of exceptions allowed to contain whitespace.",
-                        explanation=self.data.explain_tospace(lang)
+                        message=lambda: f"'{word}' in column {column} is not on the list of exceptions allowed to contain whitespace.",
+                        explanation=lambda: self.data.explain_tospace(lang)
                     ).confirm()
 
 
@@ -105,7 +104,7 @@ class Level4(Level3):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The node whose incoming relation will be validated. This function
             operates on both regular and empty nodes. Make sure to call it for
             empty nodes, too!
@@ -125,20 +124,20 @@ class Level4(Level3):
         feature-upos-not-permitted
         feature-value-upos-not-permitted
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 4
-        Incident.default_testclass = TestClass.MORPHO
+        state.incident_defaults.lineno = state.current_node_linenos[str(node.ord)]
+        state.incident_defaults.level = 4
+        state.incident_defaults.testclass = TestClass.MORPHO
         if str(node.feats) == '_':
             return True
         # List of permited features is language-specific.
         # The current token may be in a different language due to code switching.
         default_lang = self.lang
-        default_featset = featset = self.data.get_feats_for_language(self.lang)
+        default_profile = profile = self.data.get_profile(self.lang)
         lang = default_lang
         altlang = utils.get_alt_language(node)
         if altlang:
             lang = altlang
-            featset = self.data.get_feats_for_language(altlang)
+            profile = self.data.get_profile(altlang)
         for f in node.feats:
             values = node.feats[f].split(',')
             for v in values:
@@ -154,64 +153,59 @@ class Level4(Level3):
                             state=state, config=self.incfg,
                             nodeid=node.ord,
                             testid='mwt-typo-repeated-at-word',
-                            message=f"Feature Typo cannot occur at word [{node.ord}] if it already occurred at the corresponding multiword token [{mwt.ord_range}]."
+                            message=lambda: f"Feature Typo cannot occur at word [{node.ord}] if it already occurred at the corresponding multiword token [{mwt.ord_range}]."
                         ).confirm()
                 # In case of code switching, the current token may not be in the default language
                 # and then its features are checked against a different feature set. An exception
                 # is the feature Foreign, which always relates to the default language of the
                 # corpus (but Foreign=Yes should probably be allowed for all UPOS categories in
                 # all languages).
-                effective_featset = featset
+                effective_profile = profile
                 effective_lang = lang
                 if f == 'Foreign':
                     # Revert to the default.
-                    effective_featset = default_featset
+                    effective_profile = default_profile
                     effective_lang = default_lang
-                if effective_featset is not None:
-                    if f not in effective_featset:
-                        Error(
-                            state=state, config=self.incfg,
-                            nodeid=node.ord,
-                            testid='feature-unknown',
-                            message=f"Feature {f} is not documented for language [{effective_lang}] ('{utils.formtl(node)}', {f}={v}).",
-                            explanation=self.data.explain_feats(effective_lang)
-                        ).confirm()
-                    else:
-                        lfrecord = effective_featset[f]
-                        if lfrecord['permitted'] == 0:
-                            Error(
-                                state=state, config=self.incfg,
-                                nodeid=node.ord,
-                                testid='feature-not-permitted',
-                                message=f"Feature {f} is not permitted in language [{effective_lang}] ('{utils.formtl(node)}, {f}={v}').",
-                                explanation=self.data.explain_feats(effective_lang)
-                            ).confirm()
-                        else:
-                            values = lfrecord['uvalues'] + lfrecord['lvalues'] + lfrecord['unused_uvalues'] + lfrecord['unused_lvalues']
-                            if not v in values:
-                                Error(
-                                    state=state, config=self.incfg,
-                                    nodeid=node.ord,
-                                    testid='feature-value-unknown',
-                                    message=f"Value {v} is not documented for feature {f} in language [{effective_lang}] ('{utils.formtl(node)}').",
-                                    explanation=self.data.explain_feats(effective_lang)
-                                ).confirm()
-                            elif not node.upos in lfrecord['byupos']:
-                                Error(
-                                    state=state, config=self.incfg,
-                                    nodeid=node.ord,
-                                    testid='feature-upos-not-permitted',
-                                    message=f"Feature {f} is not permitted with UPOS {node.upos} in language [{effective_lang}] ('{utils.formtl(node)}').",
-                                    explanation=self.data.explain_feats(effective_lang)
-                                ).confirm()
-                            elif not v in lfrecord['byupos'][node.upos] or lfrecord['byupos'][node.upos][v]==0:
-                                Error(
-                                    state=state, config=self.incfg,
-                                    nodeid=node.ord,
-                                    testid='feature-value-upos-not-permitted',
-                                    message=f"Value {v} of feature {f} is not permitted with UPOS {node.upos} in language [{effective_lang}] ('{utils.formtl(node)}').",
-                                    explanation=self.data.explain_feats(effective_lang)
-                                ).confirm()
+                if f not in effective_profile.features:
+                    Error(
+                        state=state, config=self.incfg,
+                        nodeid=node.ord,
+                        testid='feature-unknown',
+                        message=lambda: f"Feature {f} is not documented for language [{effective_lang}] ('{utils.formtl(node)}', {f}={v}).",
+                        explanation=lambda: self.data.explain_feats(effective_lang)
+                    ).confirm()
+                elif f not in effective_profile.permitted_features:
+                    Error(
+                        state=state, config=self.incfg,
+                        nodeid=node.ord,
+                        testid='feature-not-permitted',
+                        message=lambda: f"Feature {f} is not permitted in language [{effective_lang}] ('{utils.formtl(node)}, {f}={v}').",
+                        explanation=lambda: self.data.explain_feats(effective_lang)
+                    ).confirm()
+                elif not v in effective_profile.feature_values[f]:
+                    Error(
+                        state=state, config=self.incfg,
+                        nodeid=node.ord,
+                        testid='feature-value-unknown',
+                        message=lambda: f"Value {v} is not documented for feature {f} in language [{effective_lang}] ('{utils.formtl(node)}').",
+                        explanation=lambda: self.data.explain_feats(effective_lang)
+                    ).confirm()
+                elif not (f, node.upos) in effective_profile.feature_upos:
+                    Error(
+                        state=state, config=self.incfg,
+                        nodeid=node.ord,
+                        testid='feature-upos-not-permitted',
+                        message=lambda: f"Feature {f} is not permitted with UPOS {node.upos} in language [{effective_lang}] ('{utils.formtl(node)}').",
+                        explanation=lambda: self.data.explain_feats(effective_lang)
+                    ).confirm()
+                elif not (f, node.upos, v) in effective_profile.feature_upos_values:
+                    Error(
+                        state=state, config=self.incfg,
+                        nodeid=node.ord,
+                        testid='feature-value-upos-not-permitted',
+                        message=lambda: f"Value {v} of feature {f} is not permitted with UPOS {node.upos} in language [{effective_lang}] ('{utils.formtl(node)}').",
+                        explanation=lambda: self.data.explain_feats(effective_lang)
+                    ).confirm()
 
 
 
@@ -226,7 +220,7 @@ class Level4(Level3):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The node whose incoming relation will be validated.
 
         Reads from state
@@ -240,9 +234,9 @@ class Level4(Level3):
         unknown-deprel
         unknown-edeprel
         """
-        Incident.default_lineno = state.current_node_linenos[str(node.ord)]
-        Incident.default_level = 4
-        Incident.default_testclass = TestClass.SYNTAX
+        state.incident_defaults.lineno = state.current_node_linenos[str(node.ord)]
+        state.incident_defaults.level = 4
+        state.incident_defaults.testclass = TestClass.SYNTAX
         # List of permited relations is language-specific.
         # The current token may be in a different language due to code switching.
         # Unlike with features and auxiliaries, with deprels it is less clear
@@ -259,10 +253,10 @@ class Level4(Level3):
         # The basic relation should be tested on regular nodes but not on empty nodes.
         if not node.is_empty():
             paltlang = utils.get_alt_language(node.parent)
-            main_deprelset = self.data.get_deprel_for_language(mainlang)
-            alt_deprelset = set()
+            main_deprelset = self.data.get_profile(mainlang).deprels
+            alt_deprelset = frozenset()
             if naltlang != None and naltlang != mainlang and naltlang == paltlang:
-                alt_deprelset = self.data.get_deprel_for_language(naltlang)
+                alt_deprelset = self.data.get_profile(naltlang).deprels
             # Test only the universal part if testing at universal level.
             deprel = node.deprel
             if deprel not in main_deprelset and deprel not in alt_deprelset:
@@ -270,17 +264,19 @@ class Level4(Level3):
                     state=state, config=self.incfg,
                     nodeid=node.ord,
                     testid='unknown-deprel',
-                    message=f"Unknown DEPREL label: '{deprel}'",
-                    explanation=self.data.explain_deprel(mainlang)
+                    message=lambda: f"Unknown DEPREL label: '{deprel}'",
+                    explanation=lambda: self.data.explain_deprel(mainlang)
                 ).confirm()
         # If there are enhanced dependencies, test their deprels, too.
         # We already know that the contents of DEPS is parsable (deps_list() was
         # first called from check_id_references() and the head indices are OK).
         # The order of enhanced dependencies was already checked in check_deps().
-        Incident.default_testclass = TestClass.ENHANCED
+        state.incident_defaults.testclass = TestClass.ENHANCED
         if str(node.deps) != '_':
-            main_edeprelset = self.data.get_edeprel_for_language(mainlang)
-            alt_edeprelset = self.data.get_edeprel_for_language(naltlang)
+            main_edeprelset = self.data.get_profile(mainlang).edeprels
+            alt_edeprelset = frozenset()
+            if naltlang != None:
+                alt_edeprelset = self.data.get_profile(naltlang).edeprels
             for edep in node.deps:
                 parent = edep['parent']
                 deprel = edep['deprel']
@@ -290,6 +286,6 @@ class Level4(Level3):
                         state=state, config=self.incfg,
                         nodeid=node.ord,
                         testid='unknown-edeprel',
-                        message=f"Unknown enhanced relation type '{deprel}' in '{parent.ord}:{deprel}'",
-                        explanation=self.data.explain_edeprel(mainlang)
+                        message=lambda: f"Unknown enhanced relation type '{deprel}' in '{parent.ord}:{deprel}'",
+                        explanation=lambda: self.data.explain_edeprel(mainlang)
                     ).confirm()
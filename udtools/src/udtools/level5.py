@@ -10,10 +10,12 @@
 try:
     import udtools.src.udtools.utils as utils
     from udtools.src.udtools.incident import Error, TestClass
+    from udtools.src.udtools.dispatch import applies_to
     from udtools.src.udtools.level4 import Level4
 except ModuleNotFoundError:
     import udtools.utils as utils
     from udtools.incident import Error, TestClass
+    from udtools.dispatch import applies_to
     from udtools.level4 import Level4
 
 
@@ -25,6 +27,7 @@ class Level5(Level4):
 
 
 
+    @applies_to(upos=['AUX'])
     def check_auxiliary_verbs(self, state, node):
         """
         Verifies that the UPOS tag AUX is used only with lemmas that are known to
@@ -34,7 +37,7 @@ class Level5(Level4):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The node whose incoming relation will be validated. This function
             operates on both regular and empty nodes. Make sure to call it for
             empty nodes, too!
@@ -54,8 +57,7 @@ class Level5(Level4):
             altlang = utils.get_alt_language(node)
             if altlang:
                 lang = altlang
-            auxlist = self.data.get_aux_for_language(lang)
-            if not auxlist or not node.lemma in auxlist:
+            if not node.lemma in self.data.get_profile(lang).aux:
                 Error(
                     state=state, config=self.incfg,
                     lineno=state.current_node_linenos[str(node.ord)],
@@ -63,12 +65,13 @@ class Level5(Level4):
                     level=5,
                     testclass=TestClass.MORPHO,
                     testid='aux-lemma',
-                    message=f"'{utils.lemmatl(node)}' is not an auxiliary in language [{lang}]",
-                    explanation=self.data.explain_aux(lang)
+                    message=lambda: f"'{utils.lemmatl(node)}' is not an auxiliary in language [{lang}]",
+                    explanation=lambda: self.data.explain_aux(lang)
                 ).confirm()
 
 
 
+    @applies_to(udeprels=['cop'])
     def check_copula_lemmas(self, state, node):
         """
         Verifies that the relation cop is used only with lemmas that are known to
@@ -78,7 +81,7 @@ class Level5(Level4):
         ----------
         state : udtools.state.State
             The state of the validation run.
-        node : udapi.core.node.Node object
+        node : udtools.sentence.Node object
             The node whose incoming relation will be validated. This function
             operates on both regular and empty nodes. Make sure to call it for
             empty nodes, too!
@@ -98,8 +101,7 @@ class Level5(Level4):
             altlang = utils.get_alt_language(node)
             if altlang:
                 lang = altlang
-            coplist = self.data.get_cop_for_language(lang)
-            if not coplist or not node.lemma in coplist:
+            if not node.lemma in self.data.get_profile(lang).cop:
                 Error(
                     state=state, config=self.incfg,
                     lineno=state.current_node_linenos[str(node.ord)],
@@ -107,6 +109,6 @@ class Level5(Level4):
                     level=5,
                     testclass=TestClass.SYNTAX,
                     testid='cop-lemma',
-                    message=f"'{utils.lemmatl(node)}' is not a copula in language [{lang}]",
-                    explanation=self.data.explain_cop(lang)
+                    message=lambda: f"'{utils.lemmatl(node)}' is not a copula in language [{lang}]",
+                    explanation=lambda: self.data.explain_cop(lang)
                 ).confirm()
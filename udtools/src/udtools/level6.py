@@ -14,11 +14,11 @@ import regex as re
 # from udtools import Validator.
 try:
     import udtools.src.udtools.utils as utils
-    from udtools.src.udtools.incident import Incident, Error, Warning, TestClass
+    from udtools.src.udtools.incident import Error, Warning, TestClass
     from udtools.src.udtools.level5 import Level5
 except ModuleNotFoundError:
     import udtools.utils as utils
-    from udtools.incident import Incident, Error, Warning, TestClass
+    from udtools.incident import Error, Warning, TestClass
     from udtools.level5 import Level5
 
 
@@ -77,7 +77,9 @@ class Level6(Level5):
         entity_types : dict
         entity_ids_this_document : dict
         entity_ids_other_documents : dict
-        open_entity_mentions : list
+        open_entity_mentions : dict
+        open_entity_mentions_by_beid : dict
+        entity_mention_serial : int
         open_discontinuous_mentions : dict
         entity_bridge_relations : dict
         entity_split_antecedents : dict
@@ -121,18 +123,17 @@ class Level6(Level5):
         only-one-split-antecedent
         split-antecedent-mismatch
         cross-sentence-mention
+        internal-error
         """
-        Incident.default_level = 6
-        Incident.default_testclass = TestClass.COREF
+        state.incident_defaults.level = 6
+        state.incident_defaults.testclass = TestClass.COREF
         n_comment_lines = state.sentence_line-state.comment_start_line
         comments = state.current_lines[0:n_comment_lines]
         iline = 0
-        sentid = ''
         for c in comments:
-            Incident.default_lineno = state.comment_start_line+iline
+            state.incident_defaults.lineno = state.comment_start_line+iline
             global_entity_match = utils.crex.global_entity.fullmatch(c)
             newdoc_match = utils.crex.newdoc.fullmatch(c)
-            sentid_match = utils.crex.sentid.fullmatch(c)
             if global_entity_match:
                 # As a global declaration, global.Entity is expected only once per file.
                 # However, we may be processing multiple files or people may have created
@@ -143,7 +144,7 @@ class Level6(Level5):
                         Error(
                             state=state, config=self.incfg,
                             testid='global-entity-mismatch',
-                            message=f"New declaration of global.Entity '{global_entity_match.group(1)}' does not match the first declaration '{state.global_entity_attribute_string}' on line {state.seen_global_entity}."
+                            message=lambda: f"New declaration of global.Entity '{global_entity_match.group(1)}' does not match the first declaration '{state.global_entity_attribute_string}' on line {state.seen_global_entity}."
                         ).confirm()
                 else:
                     state.seen_global_entity = state.comment_start_line + iline
@@ -152,7 +153,7 @@ class Level6(Level5):
                         Error(
                             state=state, config=self.incfg,
                             testid='spurious-global-entity',
-                            message=f"Cannot parse global.Entity attribute declaration '{state.global_entity_attribute_string}'."
+                            message=lambda: f"Cannot parse global.Entity attribute declaration '{state.global_entity_attribute_string}'."
                         ).confirm()
                     else:
                         global_entity_attributes = state.global_entity_attribute_string.split('-')
@@ -160,43 +161,43 @@ class Level6(Level5):
                             Error(
                                 state=state, config=self.incfg,
                                 testid='spurious-global-entity',
-                                message=f"Global.Entity attribute declaration '{state.global_entity_attribute_string}' does not include 'eid'."
+                                message=lambda: f"Global.Entity attribute declaration '{state.global_entity_attribute_string}' does not include 'eid'."
                             ).confirm()
                         elif global_entity_attributes[0] != 'eid':
                             Error(
                                 state=state, config=self.incfg,
                                 testid='spurious-global-entity',
-                                message=f"Attribute 'eid' must come first in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
+                                message=lambda: f"Attribute 'eid' must come first in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
                             ).confirm()
                         if not 'etype' in global_entity_attributes:
                             Error(
                                 state=state, config=self.incfg,
                                 testid='spurious-global-entity',
-                                message=f"Global.Entity attribute declaration '{state.global_entity_attribute_string}' does not include 'etype'."
+                                message=lambda: f"Global.Entity attribute declaration '{state.global_entity_attribute_string}' does not include 'etype'."
                             ).confirm()
                         elif global_entity_attributes[1] != 'etype':
                             Error(
                                 state=state, config=self.incfg,
                                 testid='spurious-global-entity',
-                                message=f"Attribute 'etype' must come second in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
+                                message=lambda: f"Attribute 'etype' must come second in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
                             ).confirm()
                         if not 'head' in global_entity_attributes:
                             Error(
                                 state=state, config=self.incfg,
                                 testid='spurious-global-entity',
-                                message=f"Global.Entity attribute declaration '{state.global_entity_attribute_string}' does not include 'head'."
+                                message=lambda: f"Global.Entity attribute declaration '{state.global_entity_attribute_string}' does not include 'head'."
                             ).confirm()
                         elif global_entity_attributes[2] != 'head':
                             Error(
                                 state=state, config=self.incfg,
                                 testid='spurious-global-entity',
-                                message=f"Attribute 'head' must come third in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
+                                message=lambda: f"Attribute 'head' must come third in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
                             ).confirm()
                         if 'other' in global_entity_attributes and global_entity_attributes[3] != 'other':
                             Error(
                                 state=state, config=self.incfg,
                                 testid='spurious-global-entity',
-                                message=f"Attribute 'other', if present, must come fourth in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
+                                message=lambda: f"Attribute 'other', if present, must come fourth in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
                             ).confirm()
                         # Fill the global dictionary that maps attribute names to list indices.
                         i = 0
@@ -205,7 +206,7 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='spurious-global-entity',
-                                    message=f"Attribute '{a}' occurs more than once in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
+                                    message=lambda: f"Attribute '{a}' occurs more than once in global.Entity attribute declaration '{state.global_entity_attribute_string}'."
                                 ).confirm()
                             else:
                                 state.entity_attribute_index[a] = i
@@ -215,16 +216,14 @@ class Level6(Level5):
                 for eid in state.entity_ids_this_document:
                     state.entity_ids_other_documents[eid] = state.entity_ids_this_document[eid]
                 state.entity_ids_this_document = {}
-            elif sentid_match:
-                sentid = sentid_match.group(1)
             iline += 1
         for iline in range(len(state.current_token_node_table)):
             cols = state.current_token_node_table[iline]
-            Incident.default_lineno = state.sentence_line+iline
+            state.incident_defaults.lineno = state.sentence_line+iline
             # Add the current word to all currently open mentions. We will use it in error messages.
             # Do this for regular and empty nodes but not for multi-word-token lines.
             if not utils.is_multiword_token(cols):
-                for m in state.open_entity_mentions:
+                for m in state.open_entity_mentions.values():
                     m['span'].append(cols[ID])
                     m['text'] += ' '+cols[FORM]
                     m['length'] += 1
@@ -243,35 +242,35 @@ class Level6(Level5):
                 Error(
                     state=state, config=self.incfg,
                     testid='multiple-entity-statements',
-                    message=f"There can be at most one 'Entity=' statement in MISC but we have {str(misc)}."
+                    message=lambda: f"There can be at most one 'Entity=' statement in MISC but we have {str(misc)}."
                 ).confirm()
                 continue
             if len(bridge)>1:
                 Error(
                     state=state, config=self.incfg,
                     testid='multiple-bridge-statements',
-                    message=f"There can be at most one 'Bridge=' statement in MISC but we have {str(misc)}."
+                    message=lambda: f"There can be at most one 'Bridge=' statement in MISC but we have {str(misc)}."
                 ).confirm()
                 continue
             if len(splitante)>1:
                 Error(
                     state=state, config=self.incfg,
                     testid='multiple-splitante-statements',
-                    message=f"There can be at most one 'SplitAnte=' statement in MISC but we have {str(misc)}."
+                    message=lambda: f"There can be at most one 'SplitAnte=' statement in MISC but we have {str(misc)}."
                 ).confirm()
                 continue
             if len(bridge)>0 and len(entity)==0:
                 Error(
                     state=state, config=self.incfg,
                     testid='bridge-without-entity',
-                    message=f"The 'Bridge=' statement can only occur together with 'Entity=' in MISC but we have {str(misc)}."
+                    message=lambda: f"The 'Bridge=' statement can only occur together with 'Entity=' in MISC but we have {str(misc)}."
                 ).confirm()
                 continue
             if len(splitante)>0 and len(entity)==0:
                 Error(
                     state=state, config=self.incfg,
                     testid='splitante-without-entity',
-                    message=f"The 'SplitAnte=' statement can only occur together with 'Entity=' in MISC but we have {str(misc)}."
+                    message=lambda: f"The 'SplitAnte=' statement can only occur together with 'Entity=' in MISC but we have {str(misc)}."
                 ).confirm()
                 continue
             # There is at most one Entity (and only if it is there, there may be also one Bridge and/or one SplitAnte).
@@ -288,7 +287,7 @@ class Level6(Level5):
                     Error(
                         state=state, config=self.incfg,
                         testid='spurious-entity-statement',
-                        message=f"Cannot parse the Entity statement '{entity[0]}'."
+                        message=lambda: f"Cannot parse the Entity statement '{entity[0]}'."
                     ).confirm()
                 else:
                     entity_string = match.group(1)
@@ -339,7 +338,7 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='too-many-entity-attributes',
-                                    message=f"Entity '{e}' has {len(attributes)} attributes while only {state.entity_attribute_number} attributes are globally declared."
+                                    message=lambda: f"Entity '{e}' has {len(attributes)} attributes while only {state.entity_attribute_number} attributes are globally declared."
                                 ).confirm()
                             # The raw eid (bracket eid) may include an identification of a part of a discontinuous mention,
                             # as in 'e155[1/2]'. This is fine for matching opening and closing brackets
@@ -352,7 +351,7 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='too-many-entity-attributes',
-                                    message=f"Entity '{e}' has {len(attributes)} attributes while only eid is expected at the closing bracket."
+                                    message=lambda: f"Entity '{e}' has {len(attributes)} attributes while only eid is expected at the closing bracket."
                                 ).confirm()
                             beid = attributes[0]
                         eid = beid
@@ -370,20 +369,20 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='spurious-entity-id',
-                                    message=f"Discontinuous mention must have at least two parts but it has one in '{beid}'."
+                                    message=lambda: f"Discontinuous mention must have at least two parts but it has one in '{beid}'."
                                 ).confirm()
                             if ipart > npart:
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='spurious-entity-id',
-                                    message=f"Entity id '{beid}' of discontinuous mention says the current part is higher than total number of parts."
+                                    message=lambda: f"Entity id '{beid}' of discontinuous mention says the current part is higher than total number of parts."
                                 ).confirm()
                         else:
                             if re.match(r"[\[\]]", beid):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='spurious-entity-id',
-                                    message=f"Entity id '{beid}' contains square brackets but does not have the form used in discontinuous mentions."
+                                    message=lambda: f"Entity id '{beid}' contains square brackets but does not have the form used in discontinuous mentions."
                                 ).confirm()
 
                         #--------------------------------------------------------------------------------------------------------------------------------
@@ -418,7 +417,7 @@ class Level6(Level5):
                                             Error(
                                                 state=state, config=self.incfg,
                                                 testid='misplaced-mention-part',
-                                                message=f"Unexpected part of discontinuous mention '{beid}': last part was '{discontinuous_mention['last_ipart']}/{discontinuous_mention['npart']}' on line {discontinuous_mention['last_part_line']}."
+                                                message=lambda: f"Unexpected part of discontinuous mention '{beid}': last part was '{discontinuous_mention['last_ipart']}/{discontinuous_mention['npart']}' on line {discontinuous_mention['last_part_line']}."
                                             ).confirm()
                                             # We will update last_ipart at closing bracket, i.e., after the current part has been entirely processed.
                                             # Otherwise nested discontinuous mentions might wrongly assess where they belong.
@@ -426,13 +425,13 @@ class Level6(Level5):
                                             Error(
                                                 state=state, config=self.incfg,
                                                 testid='mention-attribute-mismatch',
-                                                message=f"Attribute mismatch of discontinuous mention: current part has '{attrstring_to_match}', first part '{discontinuous_mention['attributes']}' was at line {discontinuous_mention['first_part_line']}."
+                                                message=lambda: f"Attribute mismatch of discontinuous mention: current part has '{attrstring_to_match}', first part '{discontinuous_mention['attributes']}' was at line {discontinuous_mention['first_part_line']}."
                                             ).confirm()
                                     else:
                                         Error(
                                             state=state, config=self.incfg,
                                             testid='misplaced-mention-part',
-                                            message=f"Unexpected part of discontinuous mention '{beid}': this is part {ipart} but we do not have information about the previous parts."
+                                            message=lambda: f"Unexpected part of discontinuous mention '{beid}': this is part {ipart} but we do not have information about the previous parts."
                                         ).confirm()
                                         discontinuous_mention = {'last_ipart': ipart, 'npart': npart,
                                                                 'first_part_line': state.sentence_line+iline,
@@ -445,7 +444,7 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='entity-across-newdoc',
-                                    message=f"Same entity id should not occur in multiple documents; '{eid}' first seen on line {state.entity_ids_other_documents[eid]}, before the last newdoc."
+                                    message=lambda: f"Same entity id should not occur in multiple documents; '{eid}' first seen on line {state.entity_ids_other_documents[eid]}, before the last newdoc."
                                 ).confirm()
                             elif not eid in state.entity_ids_this_document:
                                 state.entity_ids_this_document[eid] = state.sentence_line+iline
@@ -459,7 +458,7 @@ class Level6(Level5):
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='spurious-entity-type',
-                                        message=f"Spurious entity type '{etype}'."
+                                        message=lambda: f"Spurious entity type '{etype}'."
                                     ).confirm()
                             if 'identity' in state.entity_attribute_index and len(attributes) >= state.entity_attribute_index['identity']+1:
                                 identity = attributes[state.entity_attribute_index['identity']]
@@ -472,7 +471,7 @@ class Level6(Level5):
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='spurious-mention-head',
-                                        message=f"Entity head index '{attributes[state.entity_attribute_index['head']]}' must be a non-zero-starting integer."
+                                        message=lambda: f"Entity head index '{attributes[state.entity_attribute_index['head']]}' must be a non-zero-starting integer."
                                     ).confirm()
                                 else:
                                     head = int(attributes[state.entity_attribute_index['head']])
@@ -486,20 +485,22 @@ class Level6(Level5):
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='entity-type-mismatch',
-                                        message=f"Entity '{eid}' cannot have type '{etype}' that does not match '{state.entity_types[eid][0]}' from the first mention on line {state.entity_types[eid][2]}."
+                                        message=lambda: f"Entity '{eid}' cannot have type '{etype}' that does not match '{state.entity_types[eid][0]}' from the first mention on line {state.entity_types[eid][2]}."
                                     ).confirm()
                                 # All mentions of one entity (cluster) must have the same identity (Wikipedia link or similar).
                                 if identity != state.entity_types[eid][1]:
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='entity-identity-mismatch',
-                                        message=f"Entity '{eid}' cannot have identity '{identity}' that does not match '{state.entity_types[eid][1]}' from the first mention on line {state.entity_types[eid][2]}."
+                                        message=lambda: f"Entity '{eid}' cannot have identity '{identity}' that does not match '{state.entity_types[eid][1]}' from the first mention on line {state.entity_types[eid][2]}."
                                     ).confirm()
                             # Remember the line where (the current part of) the entity mention starts.
                             mention = {'beid': beid, 'line': state.sentence_line+iline,
                                        'span': [cols[ID]], 'text': cols[FORM],
                                        'length': 1, 'head': head, 'attrstring': attrstring_to_match}
-                            state.open_entity_mentions.append(mention)
+                            state.entity_mention_serial += 1
+                            state.open_entity_mentions[state.entity_mention_serial] = mention
+                            state.open_entity_mentions_by_beid.setdefault(beid, []).append(state.entity_mention_serial)
                             # The set of mentions starting at the current line will be needed later when checking Bridge and SplitAnte statements.
                             if ipart == 1:
                                 starting_mentions[eid] = True
@@ -516,7 +517,7 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='ill-nested-entities',
-                                    message=f"Cannot close entity '{beid}' because there are no open entities."
+                                    message=lambda: f"Cannot close entity '{beid}' because there are no open entities."
                                 ).confirm()
                                 return
                             else:
@@ -524,28 +525,31 @@ class Level6(Level5):
                                 # We have crossing mention spans in CorefUD 1.0 and it has not been decided yet whether all of them should be illegal.
                                 ###!!! Note that this will not catch ill-nested mentions whose only intersection is one node. The bracketing will
                                 ###!!! not be a problem in such cases because one mention will be closed first, then the other will be opened.
-                                if beid != state.open_entity_mentions[-1]['beid']:
+                                innermost = state.open_entity_mentions[next(reversed(state.open_entity_mentions))]
+                                if beid != innermost['beid']:
                                     Warning(
                                         state=state, config=self.incfg,
                                         testclass=TestClass.COREF,
                                         testid='ill-nested-entities-warning',
-                                        message=f"Entity mentions are not well nested: closing '{beid}' while the innermost open entity is '{state.open_entity_mentions[-1]['beid']}' from line {state.open_entity_mentions[-1]['line']}: {str(state.open_entity_mentions)}."
+                                        message=lambda: f"Entity mentions are not well nested: closing '{beid}' while the innermost open entity is '{innermost['beid']}' from line {innermost['line']}: {str(list(state.open_entity_mentions.values()))}."
                                     ).confirm()
                                 # Try to find and close the entity whether or not it was well-nested.
-                                for i in reversed(range(len(state.open_entity_mentions))):
-                                    if state.open_entity_mentions[i]['beid'] == beid:
-                                        mention_length = state.open_entity_mentions[i]['length']
-                                        mention_span = state.open_entity_mentions[i]['span']
-                                        head = state.open_entity_mentions[i]['head']
-                                        opening_line = state.open_entity_mentions[i]['line']
-                                        state.open_entity_mentions.pop(i)
-                                        break
+                                # The last opened mention with this beid is closed.
+                                if beid in state.open_entity_mentions_by_beid:
+                                    serials = state.open_entity_mentions_by_beid[beid]
+                                    mention = state.open_entity_mentions.pop(serials.pop())
+                                    if not serials:
+                                        del state.open_entity_mentions_by_beid[beid]
+                                    mention_length = mention['length']
+                                    mention_span = mention['span']
+                                    head = mention['head']
+                                    opening_line = mention['line']
                                 else:
                                     # If we did not find the entity to close, then the warning above was not enough and we have to make it a validation error.
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='ill-nested-entities',
-                                        message=f"Cannot close entity '{beid}' because it was not found among open entities: {str(state.open_entity_mentions)}"
+                                        message=lambda: f"Cannot close entity '{beid}' because it was not found among open entities: {str(list(state.open_entity_mentions.values()))}"
                                     ).confirm()
                                     return
                             # If this is a part of a discontinuous mention, update the information about the whole mention.
@@ -584,7 +588,7 @@ class Level6(Level5):
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='mention-head-out-of-range',
-                                        message=f"Entity mention head was specified as {head} on line {opening_line} but the mention has only {mention_length} nodes."
+                                        message=lambda: f"Entity mention head was specified as {head} on line {opening_line} but the mention has only {mention_length} nodes."
                                     ).confirm()
                                 # Check that no two mentions have identical spans (only if this is the last part of a mention).
                                 ending_mention_key = str(opening_line)+str(mention_span)
@@ -592,31 +596,26 @@ class Level6(Level5):
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='same-span-entity-mentions',
-                                        message=f"Entity mentions '{ending_mentions[ending_mention_key]}' and '{beid}' from line {opening_line} have the same span {str(mention_span)}."
+                                        message=lambda: f"Entity mentions '{ending_mentions[ending_mention_key]}' and '{beid}' from line {opening_line} have the same span {str(mention_span)}."
                                     ).confirm()
                                 else:
                                     ending_mentions[ending_mention_key] = beid
                                 # Remember the span of the current mention so that we can later check whether it crosses the span of another mention.
-                                # Use the current sentence id to partially qualify the node ids. It will not work well for mentions that span multiple
-                                # sentences but we do not expect cross-sentence mentions to be frequent.
+                                # Only mentions in the current sentence are compared, so the spans are forgotten at the end of the sentence.
                                 myset = set(mention_span)
                                 # Check whether any other mention of the same entity has span that crosses the current one.
                                 if eid in state.entity_mention_spans:
-                                    if sentid in state.entity_mention_spans[eid]:
-                                        for m in state.entity_mention_spans[eid][sentid]:
-                                            ms = state.entity_mention_spans[eid][sentid][m]
-                                            if ms.intersection(myset) and not ms.issubset(myset) and not myset.issubset(ms):
-                                                Error(
-                                                    state=state, config=self.incfg,
-                                                    testid='crossing-mentions-same-entity',
-                                                    message=f"Mentions of entity '{eid}' have crossing spans: {m} vs. {str(mention_span)}."
-                                                ).confirm()
-                                    else:
-                                        state.entity_mention_spans[eid][sentid] = {}
+                                    for m in state.entity_mention_spans[eid]:
+                                        ms = state.entity_mention_spans[eid][m]
+                                        if ms.intersection(myset) and not ms.issubset(myset) and not myset.issubset(ms):
+                                            Error(
+                                                state=state, config=self.incfg,
+                                                testid='crossing-mentions-same-entity',
+                                                message=lambda: f"Mentions of entity '{eid}' have crossing spans: {m} vs. {str(mention_span)}."
+                                            ).confirm()
                                 else:
                                     state.entity_mention_spans[eid] = {}
-                                    state.entity_mention_spans[eid][sentid] = {}
-                                state.entity_mention_spans[eid][sentid][str(mention_span)] = myset
+                                state.entity_mention_spans[eid][str(mention_span)] = myset
                             # At the end of the last part of a discontinuous mention, remove the information about the mention.
                             if npart > 1 and ipart == npart:
                                 if eidnpart in state.open_discontinuous_mentions:
@@ -633,13 +632,13 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='spurious-entity-statement',
-                                    message=f"If there are no closing entity brackets, single-node entity must follow all opening entity brackets in '{entity[0]}'."
+                                    message=lambda: f"If there are no closing entity brackets, single-node entity must follow all opening entity brackets in '{entity[0]}'."
                                 ).confirm()
                             if seen0 and seen2:
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='spurious-entity-statement',
-                                    message=f"Single-node entity must either precede all closing entity brackets or follow all opening entity brackets in '{entity[0]}'."
+                                    message=lambda: f"Single-node entity must either precede all closing entity brackets or follow all opening entity brackets in '{entity[0]}'."
                                 ).confirm()
                             seen0 = True
                             seen2 = False
@@ -649,7 +648,7 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='spurious-entity-statement',
-                                    message=f"If there are no opening entity brackets, single-node entity must precede all closing entity brackets in '{entity[0]}'."
+                                    message=lambda: f"If there are no opening entity brackets, single-node entity must precede all closing entity brackets in '{entity[0]}'."
                                 ).confirm()
                             seen2 = True
                             opening_bracket()
@@ -659,7 +658,7 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='spurious-entity-statement',
-                                    message=f"All closing entity brackets must precede all opening entity brackets in '{entity[0]}'."
+                                    message=lambda: f"All closing entity brackets must precede all opening entity brackets in '{entity[0]}'."
                                 ).confirm()
                             seen1 = True
                             closing_bracket()
@@ -671,7 +670,7 @@ class Level6(Level5):
                         Error(
                             state=state, config=self.incfg,
                             testid='spurious-bridge-statement',
-                            message=f"Cannot parse the Bridge statement '{bridge[0]}'."
+                            message=lambda: f"Cannot parse the Bridge statement '{bridge[0]}'."
                         ).confirm()
                     else:
                         bridges = match.group(1).split(',')
@@ -688,19 +687,19 @@ class Level6(Level5):
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='spurious-bridge-relation',
-                                        message=f"Bridge must not point from an entity to itself: '{b}'."
+                                        message=lambda: f"Bridge must not point from an entity to itself: '{b}'."
                                     ).confirm()
                                 if not tgteid in starting_mentions:
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='misplaced-bridge-statement',
-                                        message=f"Bridge relation '{b}' must be annotated at the beginning of a mention of entity '{tgteid}'."
+                                        message=lambda: f"Bridge relation '{b}' must be annotated at the beginning of a mention of entity '{tgteid}'."
                                     ).confirm()
                                 if bridgekey in srctgt:
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='repeated-bridge-relation',
-                                        message=f"Bridge relation '{bridgekey}' must not be repeated in '{b}'."
+                                        message=lambda: f"Bridge relation '{bridgekey}' must not be repeated in '{b}'."
                                     ).confirm()
                                 else:
                                     srctgt[bridgekey] = True
@@ -710,7 +709,7 @@ class Level6(Level5):
                                         Error(
                                             state=state, config=self.incfg,
                                             testid='bridge-relation-mismatch',
-                                            message=f"Bridge relation '{b}' type does not match '{state.entity_bridge_relations[bridgekey]['relation']}' specified earlier on line {state.entity_bridge_relations[bridgekey]['line']}."
+                                            message=lambda: f"Bridge relation '{b}' type does not match '{state.entity_bridge_relations[bridgekey]['relation']}' specified earlier on line {state.entity_bridge_relations[bridgekey]['line']}."
                                         ).confirm()
                                 else:
                                     state.entity_bridge_relations[bridgekey] = {'relation': relation, 'line': state.sentence_line+iline}
@@ -720,7 +719,7 @@ class Level6(Level5):
                         Error(
                             state=state, config=self.incfg,
                             testid='spurious-splitante-statement',
-                            message=f"Cannot parse the SplitAnte statement '{splitante[0]}'."
+                            message=lambda: f"Cannot parse the SplitAnte statement '{splitante[0]}'."
                         ).confirm()
                     else:
                         antecedents = match.group(1).split(',')
@@ -736,20 +735,20 @@ class Level6(Level5):
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='spurious-splitante-relation',
-                                        message=f"SplitAnte must not point from an entity to itself: '{srceid}<{tgteid}'."
+                                        message=lambda: f"SplitAnte must not point from an entity to itself: '{srceid}<{tgteid}'."
                                     ).confirm()
                                 elif not tgteid in starting_mentions:
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='misplaced-splitante-statement',
-                                        message=f"SplitAnte relation '{a}' must be annotated at the beginning of a mention of entity '{tgteid}'."
+                                        message=lambda: f"SplitAnte relation '{a}' must be annotated at the beginning of a mention of entity '{tgteid}'."
                                     ).confirm()
                                 if srceid+'<'+tgteid in srctgt:
                                     str_antecedents = ','.join(antecedents)
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='repeated-splitante-relation',
-                                        message=f"SplitAnte relation '{srceid}<{tgteid}' must not be repeated in '{str_antecedents}'."
+                                        message=lambda: f"SplitAnte relation '{srceid}<{tgteid}' must not be repeated in '{str_antecedents}'."
                                     ).confirm()
                                 else:
                                     srctgt[srceid+'<'+tgteid] = True
@@ -763,7 +762,7 @@ class Level6(Level5):
                                 Error(
                                     state=state, config=self.incfg,
                                     testid='only-one-split-antecedent',
-                                    message=f"SplitAnte statement '{str_antecedents}' must specify at least two antecedents for entity '{tgteid}'."
+                                    message=lambda: f"SplitAnte statement '{str_antecedents}' must specify at least two antecedents for entity '{tgteid}'."
                                 ).confirm()
                             # Check in the global dictionary whether this relation has been specified at another mention.
                             tgtante[tgteid].sort()
@@ -772,7 +771,7 @@ class Level6(Level5):
                                     Error(
                                         state=state, config=self.incfg,
                                         testid='split-antecedent-mismatch',
-                                        message=f"Split antecedent of entity '{tgteid}' does not match '{state.entity_split_antecedents[tgteid]['antecedents']}' specified earlier on line {state.entity_split_antecedents[tgteid]['line']}."
+                                        message=lambda: f"Split antecedent of entity '{tgteid}' does not match '{state.entity_split_antecedents[tgteid]['antecedents']}' specified earlier on line {state.entity_split_antecedents[tgteid]['line']}."
                                     ).confirm()
                             else:
                                 state.entity_split_antecedents[tgteid] = {'antecedents': str(tgtante[tgteid]), 'line': state.sentence_line+iline}
@@ -780,19 +779,18 @@ class Level6(Level5):
             Error(
                 state=state, config=self.incfg,
                 testid='cross-sentence-mention',
-                message=f"Entity mentions must not cross sentence boundaries; still open at sentence end: {str(state.open_entity_mentions)}."
+                message=lambda: f"Entity mentions must not cross sentence boundaries; still open at sentence end: {str(list(state.open_entity_mentions.values()))}."
             ).confirm()
             # Close the mentions forcibly. Otherwise one omitted closing bracket would cause the error messages to to explode because the words would be collected from the remainder of the file.
-            state.open_entity_mentions = []
+            state.open_entity_mentions = {}
+            state.open_entity_mentions_by_beid = {}
         if len(state.open_discontinuous_mentions)>0:
             Error(
                 state=state, config=self.incfg,
                 testid='cross-sentence-mention',
-                message=f"Entity mentions must not cross sentence boundaries; still open at sentence end: {str(state.open_discontinuous_mentions)}."
+                message=lambda: f"Entity mentions must not cross sentence boundaries; still open at sentence end: {str(state.open_discontinuous_mentions)}."
             ).confirm()
             # Close the mentions forcibly. Otherwise one omission would cause the error messages to to explode because the words would be collected from the remainder of the file.
             state.open_discontinuous_mentions = {}
         # Since we only test mentions within one sentence at present, we do not have to carry all mention spans until the end of the corpus.
-        for eid in state.entity_mention_spans:
-            if sentid in state.entity_mention_spans[eid]:
-                state.entity_mention_spans[eid].pop(sentid)
+        state.entity_mention_spans = {}
@@ -0,0 +1,107 @@
+"""
+Execution plan of the validator: when only some incidents can be reported
+(udvalidate --include-only or --exclude), the checks that cannot report any
+of them are skipped instead of being run only to have their incidents
+discarded by Incident.confirm().
+
+The test ids that a check can report are read from the Incidents section of
+its docstring (a line like '+ those issued by check_whitespace()' includes
+the test ids of another check). Checks without the section (e.g. checks
+added by a subclass) are never skipped.
+"""
+import inspect
+import regex as re
+
+# Checks that must run even if their incidents cannot be reported, because
+# their results control the other tests (they tell whether it is safe to
+# continue, or they prepare data or incident defaults for them).
+ALWAYS_RUN = frozenset([
+    'check_sentence_lines', 'check_sentence_columns', 'check_whitespace',
+    'check_unicode_normalization', 'check_id_sequence', 'check_token_range_overlaps',
+    'check_id_references', 'check_tree', 'check_feats_format', 'check_required_feature'
+])
+# Checks that record facts in the state for incidents reported elsewhere
+# (here by Validator.validate_end()), and the test ids of those incidents.
+RECORDS_FOR = {
+    'check_deps_format': frozenset(['edeps-identical-to-basic-trees']),
+    'check_deps_all_or_none': frozenset(['edeps-identical-to-basic-trees'])
+}
+
+
+
+def get_testids(cls, name):
+    """
+    Returns the test ids that a check can report, according to its docstring.
+
+    Parameters
+    ----------
+    cls : type
+        The validator class.
+    name : str
+        The name of the check method.
+
+    Returns
+    -------
+    testids : frozenset(str) or None
+        None if the docstring of the check has no Incidents section.
+    """
+    doc = inspect.getdoc(getattr(cls, name, None)) or ''
+    lines = doc.split('\n')
+    for i in range(len(lines) - 1):
+        if lines[i].strip() == 'Incidents' and re.fullmatch(r'\s*-+\s*', lines[i+1]):
+            break
+    else:
+        return None
+    testids = set()
+    for line in lines[i+2:]:
+        line = line.strip()
+        if not line:
+            break
+        if line[0] == '+':
+            for other in re.findall(r'check_\w+', line):
+                if other != name:
+                    testids |= get_testids(cls, other) or set()
+        else:
+            testids.add(line.split()[0])
+    return frozenset(testids)
+
+
+def get_skipped_checks(cls, config):
+    """
+    Returns the names of the checks of a validator class that need not run
+    because none of their incidents would be reported.
+
+    Parameters
+    ----------
+    cls : type
+        The validator class.
+    config : dict
+        The configuration of incident reporting (Validator.incfg), with the
+        optional keys 'exclude' and 'include_only'.
+
+    Returns
+    -------
+    skipped : frozenset(str)
+    """
+    exclude = set(config.get('exclude') or [])
+    include_only = config.get('include_only')
+    if not exclude and not include_only:
+        return frozenset()
+    skipped = set()
+    for name in dir(cls):
+        if not name.startswith('check_') or name in ALWAYS_RUN or not callable(getattr(cls, name)):
+            continue
+        testids = get_testids(cls, name)
+        if testids == None:
+            continue
+        testids = testids | RECORDS_FOR.get(name, frozenset())
+        if not any(x not in exclude and (not include_only or x in include_only) for x in testids):
+            skipped.add(name)
+    return frozenset(skipped)
+
+
+def skip_check(*args, **kwargs):
+    """
+    Replaces a skipped check method on the validator object.
+    """
+    return None
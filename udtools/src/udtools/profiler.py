@@ -0,0 +1,121 @@
+import sys
+import time
+import threading
+import collections
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.incident import IncidentType
+except ModuleNotFoundError:
+    from udtools.incident import IncidentType
+
+
+
+class CheckProfiler:
+    """
+    Measures the time spent in the check_* methods of a validator, and counts
+    their calls and the incidents they report. The profiler is activated by
+    instrument(), which replaces the check methods of one validator object by
+    wrappers; validators that are not profiled run their methods directly,
+    without any overhead.
+
+    Checks may call other checks. The time and incidents of a check are only
+    those of the check itself, not of the checks it called.
+    """
+    def __init__(self):
+        # Key: check name; value: [level, calls, seconds, Counter of incidents
+        # by (type, testclass)].
+        self.stats = {}
+        # Each thread has its own stack of the checks currently running.
+        self.local = threading.local()
+
+    def instrument(self, validator):
+        """
+        Replaces the check methods of the validator by measuring wrappers.
+
+        Parameters
+        ----------
+        validator : udtools.validator.Validator
+            The validator whose checks will be measured.
+        """
+        for cls in reversed(type(validator).__mro__):
+            # The level is taken from the name of the class that defines the
+            # check (Level1 ... Level6); checks defined elsewhere have no level.
+            level = cls.__name__[5:] if cls.__name__.startswith('Level') else ''
+            for name in cls.__dict__:
+                if name.startswith('check_') and callable(cls.__dict__[name]):
+                    self.stats[name] = [level, 0, 0.0, collections.Counter()]
+        for name in self.stats:
+            setattr(validator, name, self.wrap(name, getattr(validator, name)))
+
+    @staticmethod
+    def count_incidents(state):
+        return collections.Counter({(t, c): n for t in state.error_counter for c, n in state.error_counter[t].items()})
+
+    @staticmethod
+    def total_incidents(state):
+        total = 0
+        for x in state.error_counter.values():
+            total += sum(x.values())
+        return total
+
+    def wrap(self, name, method):
+        record = self.stats[name]
+        local = self.local
+        def wrapper(state, *args, **kwargs):
+            if not hasattr(local, 'stack'):
+                local.stack = []
+                local.state = None
+            # Counting the incidents by test class is expensive, so we count
+            # them only if the total number has changed. The last counts are
+            # kept in local.incidents (for local.state).
+            total = self.total_incidents(state)
+            if local.state is not state or local.total != total:
+                local.state = state
+                local.total = total
+                local.incidents = self.count_incidents(state)
+            incidents = local.incidents
+            # Time and incidents of the nested checks, to be subtracted.
+            local.stack.append([0.0, None])
+            start = time.perf_counter()
+            try:
+                return method(state, *args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                nested_seconds, nested_incidents = local.stack.pop()
+                if self.total_incidents(state) != total:
+                    local.state = state
+                    local.total = self.total_incidents(state)
+                    local.incidents = self.count_incidents(state)
+                    incidents = local.incidents - incidents
+                else:
+                    incidents = None
+                record[1] += 1
+                record[2] += seconds - nested_seconds
+                if incidents:
+                    record[3].update(incidents - nested_incidents if nested_incidents else incidents)
+                if local.stack:
+                    local.stack[-1][0] += seconds
+                    if incidents:
+                        if local.stack[-1][1] == None:
+                            local.stack[-1][1] = collections.Counter()
+                        local.stack[-1][1].update(incidents)
+        return wrapper
+
+    def report(self, file=sys.stderr):
+        """
+        Prints a table of the checks that have been called, sorted by the time
+        spent in them.
+        """
+        rows = sorted([(name,) + tuple(record) for name, record in self.stats.items() if record[1] > 0],
+                      key=lambda x: -x[3])
+        total = sum(row[3] for row in rows)
+        print(f"{'check':40} {'level':>5} {'calls':>10} {'seconds':>9} {'%':>6} {'us/call':>9} {'incidents':>9}  by test class", file=file)
+        for name, level, calls, seconds, incidents in rows:
+            percent = 100 * seconds / total if total else 0
+            byclass = ' '.join(f'{c}:{n}' if t == IncidentType.ERROR else f'{c}(warning):{n}' for (t, c), n in sorted(incidents.items()))
+            print(f'{name:40} {level:>5} {calls:>10} {seconds:9.3f} {percent:6.1f} {1e6*seconds/calls:9.2f} {sum(incidents.values()):9}  {byclass}', file=file)
+        print(f"{'total':40} {'':>5} {sum(row[2] for row in rows):>10} {total:9.3f}", file=file)
@@ -0,0 +1,175 @@
+from array import array
+
+
+
+class IdSet:
+    """
+    A set of strings (sentence ids, parallel ids) that takes much less memory
+    than the built-in set when it holds millions of ids, e.g. when the whole
+    UD release or a large silver corpus is validated in one run. It supports
+    the operations of set that the validator needs: add(), in, |=,
+    isdisjoint(), len() and iteration.
+
+    The ids are stored as UTF-8 bytes in one bytearray, and a hash table (an
+    array of integers) points to them; there are no Python objects per id.
+    The lower 32 bits of the hash of each id are stored too, so that most
+    lookups only compare them, but a match is always verified by comparing
+    the bytes, so the set is exact. The hashes are those of Python (randomized in each
+    process), hence only the ids are pickled and the table is built again
+    when the set is unpickled (e.g. in another process).
+    """
+    __slots__ = ('_blob', '_ends', '_hashes', '_table', '_mask')
+
+    def __init__(self, ids=()):
+        # The ids, one after another, and the end of each id in the blob.
+        # (The ends take 64 bits only if the blob grows over 4 GB.)
+        self._blob = bytearray()
+        self._ends = array('I')
+        # The lower 32 bits of the hash of each id.
+        self._hashes = array('I')
+        # Open addressing hash table with linear probing. Each slot holds the
+        # index of an id + 1, or 0 if it is empty. The size is a power of 2
+        # and the table is at most 2/3 full.
+        self._table = array('I', [0]) * 8
+        self._mask = 7
+        for x in ids:
+            self.add(x)
+
+    def _find(self, key, h):
+        """
+        Returns the index of the id (encoded as key, with the hash h), or -1
+        if it is not in the set, and the slot in the table where it is or
+        where it should be inserted.
+        """
+        table = self._table
+        mask = self._mask
+        i = h & mask
+        while True:
+            e = table[i]
+            if e == 0:
+                return -1, i
+            e -= 1
+            if self._hashes[e] == h & 0xffffffff and self._blob[self._ends[e-1] if e else 0:self._ends[e]] == key:
+                return e, i
+            i = (i + 1) & mask
+
+    def _grow(self):
+        size = 2 * (self._mask + 1)
+        self._table = table = array('I', [0]) * size
+        self._mask = mask = size - 1
+        # The table cannot be larger than 2**32, so the lower 32 bits of the
+        # hash are enough to find the slot.
+        for e, h in enumerate(self._hashes):
+            i = h & mask
+            while table[i]:
+                i = (i + 1) & mask
+            table[i] = e + 1
+
+    def _insert(self, key, h, slot):
+        """
+        Inserts an id that is not in the set, and returns its index.
+        """
+        e = len(self._ends)
+        self._blob += key
+        if len(self._blob) > 0xffffffff and self._ends.typecode == 'I':
+            self._ends = array('Q', self._ends)
+        self._ends.append(len(self._blob))
+        self._hashes.append(h & 0xffffffff)
+        self._table[slot] = e + 1
+        if 3 * len(self._ends) > 2 * (self._mask + 1):
+            self._grow()
+        return e
+
+    @staticmethod
+    def _encode(x):
+        key = x.encode('utf-8', 'surrogatepass')
+        return key, hash(key)
+
+    def add(self, x):
+        key, h = self._encode(x)
+        e, slot = self._find(key, h)
+        if e < 0:
+            self._insert(key, h, slot)
+
+    def __contains__(self, x):
+        if not isinstance(x, str):
+            return False
+        return self._find(*self._encode(x))[0] >= 0
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __iter__(self):
+        start = 0
+        for end in self._ends:
+            yield self._blob[start:end].decode('utf-8', 'surrogatepass')
+            start = end
+
+    def __ior__(self, other):
+        for x in other:
+            self.add(x)
+        return self
+
+    def isdisjoint(self, other):
+        if len(other) < len(self):
+            return not any(x in self for x in other)
+        return not any(x in other for x in self)
+
+    def keys(self):
+        return self
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self)!r})'
+
+    def __getstate__(self):
+        return list(self)
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+
+
+class IdMap(IdSet):
+    """
+    A dict from strings (e.g. parallel sentence ids) to arbitrary values,
+    with the memory layout of IdSet for the keys. It supports the operations
+    of dict that the validator needs: in, [], []=, update(), keys() and
+    iteration over the keys.
+    """
+    __slots__ = ('_values',)
+
+    def __init__(self, items=()):
+        self._values = []
+        super().__init__()
+        self.update(items)
+
+    def _insert(self, key, h, slot):
+        self._values.append(None)
+        return super()._insert(key, h, slot)
+
+    def __getitem__(self, x):
+        e = self._find(*self._encode(x))[0] if isinstance(x, str) else -1
+        if e < 0:
+            raise KeyError(x)
+        return self._values[e]
+
+    def __setitem__(self, x, value):
+        key, h = self._encode(x)
+        e, slot = self._find(key, h)
+        if e < 0:
+            e = self._insert(key, h, slot)
+        self._values[e] = value
+
+    def items(self):
+        return zip(self, self._values)
+
+    def update(self, other):
+        items = other.items() if hasattr(other, 'items') else other
+        for x, value in items:
+            self[x] = value
+
+    def __repr__(self):
+        return f'{type(self).__name__}({list(self.items())!r})'
+
+    def __getstate__(self):
+        return list(self.items())
@@ -0,0 +1,557 @@
+"""
+Lightweight representation of one sentence (basic tree and enhanced graph)
+for the validation tests at levels 2 to 5.
+
+The sentence is built directly from the token table that the level 1 tests
+have already split into columns (state.current_token_node_table), so the
+lines are not parsed a second time. The annotation is kept in parallel arrays
+indexed by node position (0 is the artificial root, 1 to n are the syntactic
+words, empty nodes follow after the last word). The Node objects are just
+thin views of a position in these arrays; they provide the subset of the
+Udapi node interface that the tests need, with the same semantics, so that
+Udapi is not needed for validation.
+"""
+from bisect import bisect_left
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.utils import ID, FORM, LEMMA, UPOS, XPOS, FEATS, HEAD, DEPREL, DEPS, MISC
+except ModuleNotFoundError:
+    from udtools.utils import ID, FORM, LEMMA, UPOS, XPOS, FEATS, HEAD, DEPREL, DEPS, MISC
+
+
+
+class AttributeDict(dict):
+    """
+    Contents of the FEATS or MISC column as a dictionary from attribute names
+    to values. As in Udapi, querying a missing attribute yields an empty
+    string, an attribute without '=' has the value True, and str() returns
+    the string representation ('_' if there are no attributes).
+    """
+    __slots__ = ('string',)
+
+    def __init__(self, string='_'):
+        super().__init__()
+        self.string = string if string else '_'
+        if self.string != '_':
+            for raw_attribute in self.string.split('|'):
+                namevalue = raw_attribute.split('=', 1)
+                if len(namevalue) == 2:
+                    self[namevalue[0]] = namevalue[1]
+                else:
+                    self[namevalue[0]] = True
+
+    def __missing__(self, key):
+        return ''
+
+    def __str__(self):
+        return self.string
+
+    def remove(self, key):
+        """
+        Removes an attribute if present and updates the string representation
+        the same way as Udapi does (attributes sorted case-insensitively).
+        """
+        self.pop(key, None)
+        serialized = [name if value is True else f'{name}={value}' for name, value in sorted(self.items(), key=lambda s: s[0].lower())]
+        self.string = '|'.join(serialized) if serialized else '_'
+
+
+
+class MultiwordToken:
+    """
+    A multiword token (its line in the CoNLL-U file and the list of its
+    syntactic words).
+    """
+    __slots__ = ('form', 'feats', 'misc', 'words')
+
+    def __init__(self, cols, words):
+        self.form = cols[FORM]
+        self.feats = AttributeDict(cols[FEATS])
+        self.misc = AttributeDict(cols[MISC])
+        self.words = words
+
+    @property
+    def ord_range(self):
+        """
+        The ID of the token as in the first column of CoNLL-U, e.g. '3-4'.
+        """
+        return '%d-%d' % (self.words[0].ord, self.words[-1].ord)
+
+
+
+class Sentence:
+    """
+    Array-backed sentence built from the token table of one sentence. It must
+    be built only after the level 1 and level 2 tests confirmed that the
+    columns are well-formed and that the basic tree is a tree; otherwise the
+    attributes may be meaningless.
+    """
+
+    def __init__(self, token_node_table):
+        """
+        Parameters
+        ----------
+        token_node_table : list(list(str))
+            The multiword token lines, word lines and empty node lines of the
+            sentence, split to columns (state.current_token_node_table).
+        """
+        self.ords = [0]
+        self.form = ['<ROOT>']
+        self.lemma = ['<ROOT>']
+        self.upos = ['<ROOT>']
+        self.xpos = ['<ROOT>']
+        self.raw_feats = ['_']
+        self.head = [None]
+        self.deprel = ['<ROOT>']
+        self.raw_deps = ['_']
+        self.raw_misc = ['_']
+        empty_rows = []
+        mwt_rows = []
+        for cols in token_node_table:
+            if '-' in cols[ID]:
+                mwt_rows.append(cols)
+            elif '.' in cols[ID]:
+                empty_rows.append(cols)
+            else:
+                self.ords.append(len(self.ords))
+                self.form.append(cols[FORM])
+                self.lemma.append(cols[LEMMA])
+                self.upos.append(cols[UPOS] if cols[UPOS] != '_' else None)
+                self.xpos.append(cols[XPOS] if cols[XPOS] != '_' else None)
+                self.raw_feats.append(cols[FEATS])
+                self.head.append(int(cols[HEAD]))
+                self.deprel.append(cols[DEPREL] if cols[DEPREL] != '_' else None)
+                self.raw_deps.append(cols[DEPS])
+                self.raw_misc.append(cols[MISC])
+        self.nwords = len(self.ords) - 1
+        # Empty nodes are not converted the way words are (Udapi does not do
+        # it either): UPOS and XPOS keep '_', and DEPREL is not read at all.
+        for cols in empty_rows:
+            self.ords.append(float(cols[ID]))
+            self.form.append(cols[FORM])
+            self.lemma.append(cols[LEMMA])
+            self.upos.append(cols[UPOS])
+            self.xpos.append(cols[XPOS])
+            self.raw_feats.append(cols[FEATS])
+            self.head.append(None)
+            self.deprel.append(None)
+            self.raw_deps.append(cols[DEPS])
+            self.raw_misc.append(cols[MISC])
+        # Parsed FEATS, MISC and DEPS are created on first access.
+        n = len(self.ords)
+        self.feats = [None] * n
+        self.misc = [None] * n
+        self.deps = [None] * n
+        self.children = [[] for i in range(n)]
+        self.mwt = [None] * n
+        # Projectivity index of the basic tree, created on first access (see
+        # index_projectivity()).
+        self.tin = None
+        self.tout = None
+        self.gappy = None
+        self.gappy_edges = None
+        self.gappy_starts = None
+        self.nodes = [Node(self, i) for i in range(n)]
+        # A sentence consisting of one word with Empty=Yes is how Udapi saves
+        # sentences without nodes. Udapi then drops the word from the tree.
+        if self.nwords == 1 and self.raw_misc[1] == 'Empty=Yes':
+            self.words = []
+        else:
+            self.words = self.nodes[1:self.nwords+1]
+            for i in range(1, self.nwords + 1):
+                self.children[self.head[i]].append(i)
+        self.tree_nodes = self.nodes[:len(self.words)+1]
+        self.empty_nodes = self.nodes[self.nwords+1:]
+        for cols in mwt_rows:
+            first, last = cols[ID].split('-')
+            words = self.nodes[int(first):int(last)+1]
+            mwt = MultiwordToken(cols, words)
+            for w in words:
+                self.mwt[w._i] = mwt
+
+    @property
+    def root(self):
+        """
+        The artificial root node of the sentence.
+        """
+        return self.nodes[0]
+
+    def get_feats(self, i):
+        if self.feats[i] is None:
+            self.feats[i] = AttributeDict(self.raw_feats[i])
+        return self.feats[i]
+
+    def get_misc(self, i):
+        if self.misc[i] is None:
+            misc = AttributeDict(self.raw_misc[i])
+            # Udapi moves SpaceAfter from the words to the multiword token.
+            if self.mwt[i] is not None:
+                misc.remove('SpaceAfter')
+            self.misc[i] = misc
+        return self.misc[i]
+
+    def get_deps(self, i):
+        """
+        Parses the DEPS column of the i-th node and returns the list of
+        incoming enhanced relations as dicts with the keys 'parent' (Node)
+        and 'deprel' (str).
+
+        Raises
+        ------
+        ValueError
+            If an empty node referenced as the parent does not exist.
+        """
+        if self.deps[i] is None:
+            deps = []
+            if self.raw_deps[i] != '_':
+                for raw_dependency in self.raw_deps[i].split('|'):
+                    head, deprel = raw_dependency.split(':', 1)
+                    if '.' in head:
+                        parent = next((x for x in self.empty_nodes if str(x.ord) == head), None)
+                        if parent is None:
+                            raise ValueError(f'Empty node with ord={head} not found')
+                    else:
+                        parent = self.tree_nodes[int(head)]
+                    deps.append({'parent': parent, 'deprel': deprel})
+            self.deps[i] = deps
+        return self.deps[i]
+
+    def index_projectivity(self):
+        """
+        Builds the projectivity index of the basic tree, so that the tests
+        of (non)projectivity need not collect subtrees over and over again:
+
+        tin, tout : the numbers of the words in the preorder and postorder
+            traversal (without the root); the i-th node dominates the j-th
+            node iff tin[i] < tin[j] and tout[j] < tout[i] (see dominates()).
+        gappy : is the subtree of the i-th node discontinuous (i.e., are
+            there nodes between its first and last word that it does not
+            dominate)? A relation can be nonprojective only if the subtree of
+            its parent is gappy, so most tests are over after one lookup.
+        gappy_edges : the relations whose parent has a gappy subtree (the only
+            candidates for nonprojectivity) as triples (first, last, i) of
+            the span of the relation and the index of the dependent, sorted by
+            the first word of the span; gappy_starts are the first words alone
+            (for bisect). Usually there are none or very few of them.
+        """
+        n = len(self.words) + 1
+        tin = [0] * n
+        tout = [0] * n
+        first = list(range(n))
+        last = list(range(n))
+        size = [1] * n
+        preorder = 0
+        postorder = 0
+        stack = [(0, iter(self.children[0]))]
+        while stack:
+            i, children = stack[-1]
+            j = next(children, None)
+            if j is not None:
+                preorder += 1
+                tin[j] = preorder
+                stack.append((j, iter(self.children[j])))
+            else:
+                stack.pop()
+                postorder += 1
+                tout[i] = postorder
+                if stack:
+                    parent = stack[-1][0]
+                    size[parent] += size[i]
+                    if first[i] < first[parent]:
+                        first[parent] = first[i]
+                    if last[i] > last[parent]:
+                        last[parent] = last[i]
+        # The artificial root is counted in the size of its subtree but it is
+        # not a word.
+        self.gappy = [last[i] - first[i] + 1 != size[i] for i in range(1, n)]
+        self.gappy.insert(0, False)
+        head = self.head
+        self.gappy_edges = sorted((min(i, head[i]), max(i, head[i]), i) for i in range(1, n) if self.gappy[head[i]])
+        self.gappy_starts = [x[0] for x in self.gappy_edges]
+        self.tin = tin
+        self.tout = tout
+
+    def dominates(self, i, j):
+        """
+        Does the i-th node dominate the j-th node (i.e., is it one of its
+        ancestors, not the node itself)? Only for the root and words.
+        """
+        if self.tin is None:
+            self.index_projectivity()
+        return self.tin[i] < self.tin[j] and self.tout[j] < self.tout[i]
+
+    def get_gap(self, i):
+        """
+        Returns the indices of the words between the i-th word and its parent
+        that are not dominated by the parent. If there are such words, the
+        i-th word is attached nonprojectively.
+        """
+        if self.tin is None:
+            self.index_projectivity()
+        head = self.head[i]
+        if not self.gappy[head]:
+            return []
+        tin, tout = self.tin, self.tout
+        return [j for j in range(min(i, head) + 1, max(i, head))
+                if not (tin[head] < tin[j] and tout[j] < tout[head])]
+
+    def get_crossing(self, i):
+        """
+        Returns the indices of the words whose relation to the parent goes
+        over the i-th word, although the parent is not an ancestor of the
+        i-th word (i.e., the words that are attached nonprojectively because
+        of the i-th word).
+        """
+        if self.tin is None:
+            self.index_projectivity()
+        tin, tout, head = self.tin, self.tout, self.head
+        crossing = []
+        # Only the relations of gappy subtrees can go over a word that their
+        # parent does not dominate, and only those that start before the word.
+        for first, last, j in self.gappy_edges[:bisect_left(self.gappy_starts, i)]:
+            h = head[j]
+            if i < last and not (tin[h] < tin[i] and tout[i] < tout[h]):
+                crossing.append(j)
+        crossing.sort()
+        return crossing
+
+    def get_descendants(self, i):
+        """
+        Returns the indices of all nodes in the subtree of the i-th node
+        (without the node itself), sorted by word order.
+        """
+        descendants = []
+        stack = list(self.children[i])
+        while stack:
+            j = stack.pop()
+            descendants.append(j)
+            stack.extend(self.children[j])
+        descendants.sort()
+        return descendants
+
+
+
+class Node:
+    """
+    View of one node of a Sentence. It mimics the interface of the Udapi
+    node (udapi.core.node.Node) as far as the validation tests need it.
+    There is exactly one Node object per node, so nodes can be compared by
+    identity; sorting compares their ords (word order).
+    """
+    __slots__ = ('_sentence', '_i')
+
+    def __init__(self, sentence, i):
+        self._sentence = sentence
+        self._i = i
+
+    def __lt__(self, other):
+        return self._sentence.ords[self._i] < other._sentence.ords[other._i]
+
+    def __repr__(self):
+        return f'<Node {self.ord} {self.form}>'
+
+    @property
+    def ord(self):
+        return self._sentence.ords[self._i]
+
+    @property
+    def form(self):
+        return self._sentence.form[self._i]
+
+    @property
+    def lemma(self):
+        return self._sentence.lemma[self._i]
+
+    @property
+    def upos(self):
+        return self._sentence.upos[self._i]
+
+    @property
+    def xpos(self):
+        return self._sentence.xpos[self._i]
+
+    @property
+    def feats(self):
+        return self._sentence.get_feats(self._i)
+
+    @property
+    def deprel(self):
+        return self._sentence.deprel[self._i]
+
+    @property
+    def udeprel(self):
+        deprel = self._sentence.deprel[self._i]
+        return deprel.split(':')[0] if deprel is not None else None
+
+    @property
+    def misc(self):
+        return self._sentence.get_misc(self._i)
+
+    @property
+    def deps(self):
+        return self._sentence.get_deps(self._i)
+
+    @property
+    def raw_deps(self):
+        """
+        The DEPS column. Once the relations have been parsed, it is serialized
+        from them like in Udapi (sorted, without duplicates).
+        """
+        deps = self._sentence.deps[self._i]
+        if deps:
+            return '|'.join(f'{p}:{r}' for p, r in sorted(set((d['parent'].ord, d['deprel']) for d in deps)))
+        return self._sentence.raw_deps[self._i]
+
+    @property
+    def parent(self):
+        head = self._sentence.head[self._i]
+        if head is None or not self._sentence.words:
+            return None
+        return self._sentence.nodes[head]
+
+    @property
+    def children(self):
+        nodes = self._sentence.nodes
+        return [nodes[j] for j in self._sentence.children[self._i]]
+
+    @property
+    def descendants(self):
+        nodes = self._sentence.nodes
+        if self._i == 0:
+            return list(self._sentence.words)
+        return [nodes[j] for j in self._sentence.get_descendants(self._i)]
+
+    @property
+    def descendants_and_empty(self):
+        """
+        All words and empty nodes of the sentence, sorted by their ords.
+        Meaningful only for the root node.
+        """
+        return sorted(self._sentence.words + self._sentence.empty_nodes)
+
+    @property
+    def root(self):
+        return self._sentence.nodes[0]
+
+    @property
+    def multiword_token(self):
+        return self._sentence.mwt[self._i]
+
+    def is_root(self):
+        return self._i == 0
+
+    def is_empty(self):
+        return self._i > self._sentence.nwords
+
+    def get_gap(self):
+        """
+        The words between the node and its parent that are not dominated by
+        the parent, sorted by their ords (see Sentence.get_gap()).
+        """
+        nodes = self._sentence.nodes
+        return [nodes[j] for j in self._sentence.get_gap(self._i)]
+
+    def get_crossing(self):
+        """
+        The words whose relation to the parent goes over the node although the
+        parent is not an ancestor of the node, sorted by their ords (see
+        Sentence.get_crossing()).
+        """
+        nodes = self._sentence.nodes
+        return [nodes[j] for j in self._sentence.get_crossing(self._i)]
+
+    def is_nonprojective(self):
+        """
+        Is the node attached to its parent nonprojectively, i.e., is there a
+        node between the node and its parent that is not dominated by the
+        parent? Nodes attached to the root are always projective.
+        """
+        sentence = self._sentence
+        head = sentence.head[self._i]
+        if not head or not sentence.words:
+            return False
+        return bool(sentence.get_gap(self._i))
+
+
+
+class SentenceContext:
+    """
+    Facts about one sentence that the level 3 tests need for every node, so
+    that each test does not derive them again: the universal relation of
+    each node, the children of each node grouped by their universal relation,
+    and the line numbers of the nodes. It is built once per sentence by
+    Validator.validate_sentence() and passed to the tests.
+
+    The arrays are indexed by the position of the node in the Sentence, which
+    is the ord for the root and the words (empty nodes follow after the last
+    word). Parsed FEATS and MISC are cached by the Sentence itself (see
+    feats() and misc()).
+    """
+    __slots__ = ('sentence', 'nodes', 'udeprels', 'linenos', 'children_by_udeprel')
+
+    def __init__(self, root, node_linenos):
+        """
+        Parameters
+        ----------
+        root : udtools.sentence.Node object
+            The artificial root node of the sentence.
+        node_linenos : dict(str: int)
+            Mapping from node ids (including empty nodes) to line numbers in
+            the input file (state.current_node_linenos).
+        """
+        sentence = root._sentence
+        self.sentence = sentence
+        self.nodes = sentence.nodes
+        self.udeprels = [d.split(':')[0] if d is not None else None for d in sentence.deprel]
+        self.linenos = [node_linenos.get(str(o)) for o in sentence.ords]
+        self.children_by_udeprel = [{} for i in range(len(sentence.nodes))]
+        for node in sentence.words:
+            j = node._i
+            groups = self.children_by_udeprel[sentence.head[j]]
+            udeprel = self.udeprels[j]
+            if udeprel in groups:
+                groups[udeprel].append(node)
+            else:
+                groups[udeprel] = [node]
+
+    def lineno(self, node):
+        """
+        Returns the line number of a node (word or empty node).
+        """
+        return self.linenos[node._i]
+
+    def udeprel(self, node):
+        """
+        Returns the universal part of the DEPREL of a node.
+        """
+        return self.udeprels[node._i]
+
+    def child_udeprels(self, node):
+        """
+        Returns the universal relations of the children of a node (the keys
+        of a dict, to be used like a set).
+        """
+        return self.children_by_udeprel[node._i].keys()
+
+    def children(self, node, udeprel):
+        """
+        Returns the children of a node attached via the given universal
+        relation, sorted by their ords. The list must not be modified.
+        """
+        return self.children_by_udeprel[node._i].get(udeprel, [])
+
+    def span(self, first, last):
+        """
+        Returns the words from the first to the last node (inclusive).
+        """
+        return self.nodes[first._i:last._i+1]
+
+    def feats(self, node):
+        return self.sentence.get_feats(node._i)
+
+    def misc(self, node):
+        return self.sentence.get_misc(node._i)
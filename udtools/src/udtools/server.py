@@ -0,0 +1,200 @@
+#! /usr/bin/env python3
+# Validation server for annotation tools: keeps the validation data loaded and
+# validates sentences sent over HTTP (udvalidate --serve).
+import sys
+import io
+import threading
+import json
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.validator import Validator
+    from udtools.src.udtools.state import State
+except ModuleNotFoundError:
+    from udtools.validator import Validator
+    from udtools.state import State
+
+
+
+class ValidationServer(ThreadingHTTPServer):
+    """
+    HTTP server that validates CoNLL-U text posted by clients, typically
+    annotation tools that validate a sentence after every edit. The
+    validation data are loaded only once and shared by all requests, which
+    are served in parallel threads.
+
+    POST /validate validates the CoNLL-U text in the body of the request.
+    The optional query parameters lang and level override the defaults of
+    the server. Without the session parameter, each request is validated
+    from scratch, as a separate file. With session=ID, the state of the
+    validation is kept between the requests with the same ID, as if they
+    were parts of one treebank (so that, e.g., duplicate sentence ids are
+    found across requests). POST /end?session=ID runs the final tests of
+    the treebank and forgets the session.
+
+    The response is a JSON object with the incidents (in the format of
+    Incident.json()) found in the request, whether the request (or the
+    session so far) passed, and the summary of the state.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, validator, args=None):
+        """
+        Parameters
+        ----------
+        address : tuple(str, int)
+            Host and port to listen on.
+        validator : udtools.validator.Validator
+            Validator with the default language and level. Its data will be
+            shared by the validators for other languages and levels.
+        args : argparse.Namespace, optional
+            Parsed command line arguments that configure the incidents (e.g.
+            --exclude, --no-warnings), passed to the validators.
+        """
+        super().__init__(address, ValidationRequestHandler)
+        self.args = args
+        self.default_validator = validator
+        # Key: (lang, level); value: Validator.
+        self.validators = {(validator.lang, validator.level): validator}
+        # Key: session id; value: (State, Lock).
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def get_validator(self, lang=None, level=None):
+        """
+        Returns the validator for the given language and level, creating it
+        if needed.
+        """
+        level = int(level) if level else self.default_validator.level
+        lang = lang if lang else self.default_validator.lang
+        # No language-specific tests for levels 1-3 (see parse_args_validator()).
+        if level < 4:
+            lang = 'ud'
+        with self.lock:
+            if not (lang, level) in self.validators:
+                # The options of batch validation (parallel processes, the
+                # cache of sentences, profiling) do not apply to the requests.
+                self.validators[(lang, level)] = Validator(lang=lang, level=level, args=self.args, output=None,
+                                                           data=self.default_validator.data,
+                                                           jobs=1, incremental=False, profile_checks=False)
+            return self.validators[(lang, level)]
+
+    def get_session(self, session):
+        """
+        Returns the state and the lock of a session, creating it if needed.
+        """
+        with self.lock:
+            if not session in self.sessions:
+                self.sessions[session] = (State(), threading.Lock())
+            return self.sessions[session]
+
+    def validate(self, text, lang=None, level=None, session=None):
+        """
+        Validates CoNLL-U text and returns the JSON response.
+        """
+        validator = self.get_validator(lang, level)
+        if session:
+            state, lock = self.get_session(session)
+        else:
+            state, lock = State(), threading.Lock()
+        with lock:
+            start = len(state.error_tracker)
+            validator.validate_file_handle(io.StringIO(text, newline=None), state)
+            return self.response(state, start)
+
+    def end(self, session, lang=None, level=None):
+        """
+        Runs the final tests on a session, forgets it and returns the JSON
+        response.
+        """
+        validator = self.get_validator(lang, level)
+        state, lock = self.get_session(session)
+        with lock:
+            start = len(state.error_tracker)
+            validator.validate_end(state)
+            with self.lock:
+                self.sessions.pop(session, None)
+            return self.response(state, start)
+
+    @staticmethod
+    def response(state, start):
+        """
+        Returns the JSON description of the incidents that have been stored
+        in the state since the position start, and the summary of the state.
+        """
+        return json.dumps({
+            'passed': state.passed(),
+            'summary': str(state),
+            'incidents': [x.dict() for x in state.error_tracker[start:]],
+        })
+
+
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    # Keep the connection open for subsequent requests of the client, and
+    # send the responses immediately.
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length', 0))
+        text = self.rfile.read(length).decode('utf-8')
+        try:
+            if url.path == '/validate':
+                body = self.server.validate(text, query.get('lang'), query.get('level'), query.get('session'))
+            elif url.path == '/end' and query.get('session'):
+                body = self.server.end(query['session'], query.get('lang'), query.get('level'))
+            else:
+                self.send_error(404)
+                return
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        except Exception as e:
+            # An unexpected error in a test must not leave the client
+            # without a response.
+            self.send_error(500, f'{type(e).__name__}: {e}')
+            return
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Do not print a line for every request.
+        pass
+
+
+
+def serve(validator, address, args=None):
+    """
+    Starts the validation server and serves requests until interrupted.
+
+    Parameters
+    ----------
+    validator : udtools.validator.Validator
+        Validator with the default language and level.
+    address : str
+        [HOST:]PORT to listen on. The default host is localhost.
+    args : argparse.Namespace, optional
+        Parsed command line arguments.
+    """
+    host, _, port = address.rpartition(':')
+    server = ValidationServer((host or 'localhost', int(port)), validator, args)
+    print(f'Validation server listening on http://{server.server_address[0]}:{server.server_address[1]}/validate', file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
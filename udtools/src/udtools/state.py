@@ -6,9 +6,11 @@ from collections import defaultdict
 # assuming that the user has installed udtools from PyPI and then called
 # from udtools import Validator.
 try:
-    from udtools.src.udtools.incident import IncidentType
+    from udtools.src.udtools.incident import IncidentType, IncidentDefaults
+    from udtools.src.udtools.registry import IdSet, IdMap
 except ModuleNotFoundError:
-    from udtools.incident import IncidentType
+    from udtools.incident import IncidentType, IncidentDefaults
+    from udtools.registry import IdSet, IdMap
 
 
 
@@ -45,6 +47,9 @@ class State:
         # Needed to check that no space after last word of sentence does not
         # co-occur with new paragraph or document.
         self.spaceafterno_in_effect = False
+        # Default level, test class and line number of the incidents that
+        # the checks are going to report.
+        self.incident_defaults = IncidentDefaults()
         # Incident counter by type. Key: incident type, test class; value: incident count
         # Incremented in Incident.report(), even if reporting is off or over --max_err.
         self.error_counter = defaultdict(lambda: defaultdict(int))
@@ -63,14 +68,15 @@ class State:
         # its occurrences.
         self.delayed_feature_errors = {}
         # Remember all sentence ids seen in all input files (presumably one
-        # corpus). We need it to check that each id is unique.
-        self.known_sent_ids = set()
+        # corpus). We need it to check that each id is unique. (There may be
+        # millions of them, hence IdSet instead of set, to save memory.)
+        self.known_sent_ids = IdSet()
         # Similarly, parallel ids should be unique in a corpus. (If multiple
         # sentences are equivalents of the same virtual sentence in the
         # parallel collection, they should be distinguished with 'altN'.)
-        self.known_parallel_ids = set()
-        self.parallel_id_lastalt = {}
-        self.parallel_id_lastpart = {}
+        self.known_parallel_ids = IdSet()
+        self.parallel_id_lastalt = IdMap()
+        self.parallel_id_lastpart = IdMap()
         #----------------------------------------------------------------------
         # Various things that we may have seen earlier in the corpus. The value
         # is None if we have not seen it, otherwise it is the line number of
@@ -82,6 +88,10 @@ class State:
         # Any difference between non-empty DEPS and HEAD:DEPREL.
         # (Because we can see many enhanced graphs but no real enhancements.)
         self.seen_enhancement = None
+        # The last node line of the most recent sentence with an enhanced
+        # graph. Enhanced graphs that only copy the basic trees are reported
+        # there at the end of the treebank.
+        self.last_enhanced_graph_line = None
         self.seen_empty_node = None
         self.seen_enhanced_orphan = None
         # global.entity comment line is needed for Entity annotations in MISC.
@@ -108,9 +118,15 @@ class State:
         # could use self.entity_types above.)
         self.entity_ids_this_document = {}
         self.entity_ids_other_documents = {}
-        # List of currently open entity mentions. Items are dictionaries with
+        # Currently open entity mentions, in the order in which they were
+        # opened. Key: serial number of the mention; value: dictionary with
         # entity mention information.
-        self.open_entity_mentions = []
+        self.open_entity_mentions = {}
+        # Key: beid (entity id, possibly with the part number); value: list of
+        # serial numbers of its open mentions, the last opened at the end.
+        self.open_entity_mentions_by_beid = {}
+        # The serial number of the last opened entity mention.
+        self.entity_mention_serial = 0
         # For each entity that has currently open discontinuous mention,
         # describe the last part of the mention. Key: entity id; value is dict,
         # its keys: last_ipart, npart, line.
@@ -119,7 +135,8 @@ class State:
         self.entity_bridge_relations = {}
         # Key: tgteid; value: sorted list of srceids, serialized to string.
         self.entity_split_antecedents = {}
-        # Key: [eid][sentid][str(mention_span)]; value: set of node ids.
+        # Mentions in the current sentence (only they are checked for crossing
+        # spans). Key: [eid][str(mention_span)]; value: set of node ids.
         self.entity_mention_spans = {}
 
 
@@ -165,6 +182,25 @@ class State:
         return result
 
 
+    def summary(self):
+        """
+        Returns the summary of the warnings and errors as a dict that can be
+        encoded in JSON (the final record of the --format jsonl output).
+        """
+        errors = {}
+        nwarning = 0
+        if self.error_counter:
+            nwarning = sum(self.error_counter[IncidentType.WARNING].values())
+            errors = {str(k): v for k, v in sorted(self.error_counter[IncidentType.ERROR].items())}
+        return {
+            'summary': True,
+            'passed': self.passed(),
+            'warnings': nwarning,
+            'errors': sum(errors.values()),
+            'errors_by_class': errors
+        }
+
+
     def passed(self):
         for k, v in self.error_counter[IncidentType.ERROR].items():
             if v > 0:
@@ -174,3 +210,207 @@ class State:
 
     def __bool__(self):
         return self.passed()
+
+
+    def merge(self, chunk):
+        """
+        Takes over the observations from a ChunkState, i.e., the state after
+        validating a continuous portion of the input separately (typically in
+        another process). The chunk is supposed to immediately follow the
+        part of the input that has been described by this state, and it
+        should have been verified by chunk.is_independent_of(self) that
+        validating it separately did not give different results. Incidents
+        are not merged: the caller should confirm them again in this state, so
+        that --max-err and the explanations work as in a single run.
+        Observations related to coreference and entities are not merged
+        either.
+
+        Parameters
+        ----------
+        chunk : udtools.state.ChunkState
+            The state after validating the chunk, starting from scratch.
+        """
+        self.current_line = chunk.current_line
+        self.comment_start_line = chunk.comment_start_line
+        self.sentence_line = chunk.sentence_line
+        self.current_lines = chunk.current_lines
+        self.current_token_node_table = chunk.current_token_node_table
+        self.current_node_linenos = chunk.current_node_linenos
+        # The final check of the corpus may use the line number last set by
+        # a check.
+        if chunk.incident_defaults.lineno != None:
+            self.incident_defaults.lineno = chunk.incident_defaults.lineno
+        if 'sentence_id' in chunk.written_attributes:
+            self.sentence_id = chunk.sentence_id
+        if 'spaceafterno_in_effect' in chunk.written_attributes:
+            self.spaceafterno_in_effect = chunk.spaceafterno_in_effect
+        # Delayed feature errors: If the chunk has seen a feature, it has also
+        # flushed its own delayed errors, and we know that we did not have any.
+        # Otherwise the chunk's delayed errors are appended to ours.
+        if not self.seen_morpho_feature:
+            self.seen_morpho_feature = chunk.seen_morpho_feature
+            for testid in chunk.delayed_feature_errors:
+                if not testid in self.delayed_feature_errors:
+                    self.delayed_feature_errors[testid] = {'occurrences': []}
+                self.delayed_feature_errors[testid]['occurrences'] += chunk.delayed_feature_errors[testid]['occurrences']
+        self.known_sent_ids |= chunk.known_sent_ids
+        self.known_parallel_ids |= chunk.known_parallel_ids
+        self.parallel_id_lastalt.update(chunk.parallel_id_lastalt)
+        self.parallel_id_lastpart.update(chunk.parallel_id_lastpart)
+        for attribute in ('seen_enhanced_graph', 'seen_tree_without_enhanced_graph',
+                          'seen_enhancement', 'seen_empty_node', 'seen_enhanced_orphan'):
+            if not getattr(self, attribute):
+                setattr(self, attribute, getattr(chunk, attribute))
+        if chunk.last_enhanced_graph_line:
+            self.last_enhanced_graph_line = chunk.last_enhanced_graph_line
+
+
+
+def _tracked_attribute(name):
+    """
+    Creates a property for ChunkState that remembers whether the attribute
+    has been written in the chunk, and whether it has been read before it was
+    written (i.e., whether the chunk depended on its value from the preceding
+    part of the input).
+    """
+    def getter(self):
+        if not name in self.written_attributes:
+            self.consulted_attributes.add(name)
+        return self.__dict__[name]
+    def setter(self, value):
+        self.written_attributes.add(name)
+        self.__dict__[name] = value
+    return property(getter, setter)
+
+
+
+class ChunkState(State):
+    """
+    The state of validation of a continuous portion (chunk) of the input that
+    is validated from scratch, without knowing the state after the preceding
+    portion. This is used to validate a file in parallel. Besides the normal
+    state, the object records which observations about the preceding input
+    the chunk has relied on, so that we can later decide whether the result
+    is the same as if the chunk was validated after the preceding input.
+    """
+    def __init__(self):
+        # Names of tracked attributes that have been assigned in this chunk.
+        self.written_attributes = set()
+        # Names of tracked attributes that have been read before they were
+        # assigned, or, in case of delayed_feature_errors, before the first
+        # feature was seen.
+        self.consulted_attributes = set()
+        super().__init__()
+        self.written_attributes = set()
+
+    sentence_id = _tracked_attribute('sentence_id')
+    spaceafterno_in_effect = _tracked_attribute('spaceafterno_in_effect')
+    seen_morpho_feature = _tracked_attribute('seen_morpho_feature')
+
+    @property
+    def delayed_feature_errors(self):
+        # Errors are only delayed (and the dictionary accessed for that
+        # purpose) before the first feature is seen. Afterwards it is
+        # accessed only to flush the errors that the chunk has delayed.
+        if not 'seen_morpho_feature' in self.written_attributes:
+            self.consulted_attributes.add('delayed_feature_errors')
+        return self.__dict__['delayed_feature_errors']
+
+    @delayed_feature_errors.setter
+    def delayed_feature_errors(self, value):
+        self.__dict__['delayed_feature_errors'] = value
+
+
+    def __getstate__(self):
+        # The chunk state is sent from the worker process to the main process.
+        # The incidents are sent separately and the counter cannot be pickled
+        # (it uses a lambda function).
+        state = self.__dict__.copy()
+        del state['error_counter']
+        state['error_tracker'] = []
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.error_counter = defaultdict(lambda: defaultdict(int))
+
+
+    def shift_lines(self, offset):
+        """
+        Moves the chunk by offset lines in the input file, i.e., adds offset
+        to all line numbers that the state remembers, including those of the
+        delayed incidents (but not of the incidents in error_tracker). Only
+        positive numbers are line numbers; None, 0 and negative numbers have
+        special meanings and are kept. Observations related to coreference
+        and entities are not shifted, as they are not merged either.
+
+        Parameters
+        ----------
+        offset : int
+            The number of lines to add (negative to move the chunk up).
+        """
+        def shift(lineno):
+            return lineno + offset if type(lineno) == int and lineno > 0 else lineno
+        self.current_line = shift(self.current_line)
+        self.comment_start_line = shift(self.comment_start_line)
+        self.sentence_line = shift(self.sentence_line)
+        self.current_node_linenos = {k: shift(v) for k, v in self.current_node_linenos.items()}
+        self.incident_defaults.lineno = shift(self.incident_defaults.lineno)
+        # Bypass the tracking of seen_morpho_feature.
+        self.__dict__['seen_morpho_feature'] = shift(self.__dict__['seen_morpho_feature'])
+        for attribute in ('seen_enhanced_graph', 'seen_tree_without_enhanced_graph', 'seen_enhancement',
+                          'last_enhanced_graph_line', 'seen_empty_node', 'seen_enhanced_orphan', 'seen_global_entity'):
+            setattr(self, attribute, shift(getattr(self, attribute)))
+        for testid in self.__dict__['delayed_feature_errors']:
+            for occurrence in self.__dict__['delayed_feature_errors'][testid]['occurrences']:
+                occurrence['incident'].shift_lines(offset)
+
+
+    def is_independent_of(self, state):
+        """
+        Checks that the incidents found in this chunk would be the same if the
+        chunk was validated with the given state (after the preceding part of
+        the input) instead of starting from scratch.
+
+        Parameters
+        ----------
+        state : udtools.state.State
+            The state after validating the input that precedes the chunk.
+
+        Returns
+        -------
+        independent : bool
+            True if the chunk can be merged to the state. False if it has to
+            be validated again.
+        """
+        if 'sentence_id' in self.consulted_attributes and state.sentence_id != None:
+            return False
+        if 'spaceafterno_in_effect' in self.consulted_attributes and state.spaceafterno_in_effect:
+            return False
+        # Errors are reported when we see the second of two incompatible
+        # things, and the message refers to the line of the first one.
+        if state.seen_enhanced_graph and self.seen_tree_without_enhanced_graph:
+            return False
+        if state.seen_tree_without_enhanced_graph and self.seen_enhanced_graph:
+            return False
+        if state.seen_empty_node and self.seen_enhanced_orphan:
+            return False
+        if state.seen_enhanced_orphan and self.seen_empty_node:
+            return False
+        # Feature errors are delayed until we see the first feature.
+        if state.seen_morpho_feature:
+            if 'delayed_feature_errors' in self.consulted_attributes:
+                return False
+        elif state.delayed_feature_errors and 'seen_morpho_feature' in self.written_attributes:
+            return False
+        # Sentence ids and parallel ids must be unique in the corpus.
+        if not self.known_sent_ids.isdisjoint(state.known_sent_ids):
+            return False
+        if not self.known_parallel_ids.isdisjoint(state.known_parallel_ids):
+            return False
+        if not state.parallel_id_lastalt.keys().isdisjoint(self.parallel_id_lastalt):
+            return False
+        if not state.parallel_id_lastpart.keys().isdisjoint(self.parallel_id_lastpart):
+            return False
+        return True
@@ -104,9 +104,21 @@ from __future__ import division
 from __future__ import print_function
 
 import io
+import json
+import multiprocessing
 import sys
 import unicodedata
 import unittest
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI.
+try:
+    from udtools.src.udtools.index import SentenceIndex
+    from udtools.src.udtools.compression import open_text
+except ModuleNotFoundError:
+    from udtools.index import SentenceIndex
+    from udtools.compression import open_text
 
 # CoNLL-U column names
 ID, FORM, LEMMA, UPOS, XPOS, FEATS, HEAD, DEPREL, DEPS, MISC = range(10)
@@ -129,6 +141,10 @@ UNIVERSAL_FEATURES = {
     "Tense", "Aspect", "Voice", "Evident", "Polarity", "Person", "Polite"
 }
 
+# The metrics in the order of the output tables
+METRICS = ["Tokens", "Sentences", "Words", "UPOS", "XPOS", "UFeats", "AllTags", "Lemmas", "UAS", "LAS", "CLAS", "MLAS", "BLEX"]
+ENHANCED_METRICS = ["ELAS", "EULAS"]
+
 # UD Error is used when raising exceptions in this module
 class UDError(Exception):
     pass
@@ -149,6 +165,105 @@ def process_enhanced_deps(deps) :
             edeps.append((hd,steps))   # (3,['conj:en','obj:voor'])
     return edeps
 
+# The filters of enhanced dependencies, switched on in treebank_type for
+# treebanks that do not have some types of enhancements (see --enhancements).
+ENHANCEMENT_FILTERS = [
+    'no_gapping', 'no_shared_parents_in_coordination', 'no_shared_dependents_in_coordination',
+    'no_control', 'no_external_arguments_of_relative_clauses', 'no_case_info'
+]
+
+# Translate a value of --enhancements (e.g. '0' or '12') to a treebank_type dict
+# with the corresponding filters.
+def enhancement_type(enhancements):
+    return {name: 1 if str(i + 1) in enhancements else 0 for i, name in enumerate(ENHANCEMENT_FILTERS)}
+
+# Return the enhanced deps of a word (a list of (parent, steps) tuples, where
+# parent is a UDWord, or 0 for the root) as they would be in a treebank of the
+# given type. The deps of the word stored by load_conllu() are not modified:
+# the filters create new lists where needed.
+def enhanced_deps_view(word, treebank_type):
+    enhanced_deps = word.columns[DEPS]
+
+    # ignore rel>rel dependencies, and instead append the original hd/rel edge
+    # note that this also ignores other extensions (like adding lemma's)
+    # note that this sometimes introduces duplicates (if orig hd/rel was already included in DEPS)
+    if treebank_type.get('no_gapping', False) : # enhancement 1
+        processed_deps = []
+        for (parent,steps) in enhanced_deps :
+            if len(steps) > 1 :
+                processed_deps.append((word.parent,[word.columns[DEPREL]]))
+            else :
+                if (parent,steps) in processed_deps :
+                    True
+                else :
+                    processed_deps.append((parent,steps))
+        enhanced_deps = processed_deps
+
+    # for a given conj node, any rel other than conj in DEPS can be ignored
+    if treebank_type.get('no_shared_parents_in_coordination', False) :   # enhancement  2
+        for (hd,steps) in enhanced_deps :
+            if len(steps) == 1 and steps[0].startswith('conj') :
+                enhanced_deps = [(hd,steps)]
+
+    # deprels not matching ud_hd/ud_dep are spurious.
+    #  czech/pud estonian/ewt syntagrus finnish/pud
+    # TO DO: treebanks that do not mark xcomp and relcl subjects
+    if treebank_type.get('no_shared_dependents_in_coordination', False) : # enhancement  3
+        processed_deps = []
+        for (hd,steps) in enhanced_deps :
+            duplicate = 0
+            for (hd2,steps2) in enhanced_deps :
+                if steps == steps2 and hd2 == word.columns[HEAD]  and hd != hd2  : # checking only for ud_hd here, check for ud_dep as well?
+                    duplicate = 1
+            if not(duplicate) :
+                processed_deps.append((hd,steps))
+        enhanced_deps = processed_deps
+
+    # if treebank does not have control relations: subjects of xcomp parents in system are to be skipped
+    # note that rel is actually a path sometimes rel1>rel2 in theory rel2 could be subj?
+    # from lassy-small: 7:conj:en>nsubj:pass|7:conj:en>nsubj:xsubj    (7,['conj:en','nsubj:xsubj'])
+    if treebank_type.get('no_control', False) : # enhancement 4
+        processed_deps = []
+        for (parent,steps) in enhanced_deps :
+            include = 1
+            if ( parent and parent.columns[DEPREL] == 'xcomp') :
+                for rel in steps:
+                    if rel.startswith('nsubj') :
+                        include = 0
+            if include :
+                processed_deps.append((parent,steps))
+        enhanced_deps = processed_deps
+
+    if treebank_type.get('no_external_arguments_of_relative_clauses', False) : # enhancement 5
+        processed_deps = []
+        for (parent,steps) in enhanced_deps :
+            if (steps[0] == 'ref') :
+                processed_deps.append((word.parent,[word.columns[DEPREL]]))  # append the original relation
+            # ignore external argument link
+            # external args are deps of an acl:relcl where that acl also is a dependent of external arg (i.e. ext arg introduces a cycle)
+            elif ( parent and parent.columns[DEPREL].startswith('acl')  and int(parent.columns[HEAD]) == word.position ) :
+                #print('removed external argument')
+                True
+            else :
+                processed_deps.append((parent,steps))
+        enhanced_deps = processed_deps
+
+    # treebanks where no lemma info has been added
+    if treebank_type.get('no_case_info', False) :  # enhancement number 6
+        processed_deps = []
+        for (hd,steps) in enhanced_deps :
+            processed_steps = []
+            for dep in steps :
+                depparts = dep.split(':')
+                if depparts[0] in  CASE_DEPRELS :
+                    if (len(depparts) == 2 and not(depparts[1] in UNIVERSAL_DEPREL_EXTENSIONS )) :
+                        dep = depparts[0]
+                processed_steps.append(dep)
+            processed_deps.append((hd,processed_steps))
+        enhanced_deps = processed_deps
+
+    return enhanced_deps
+
 # Load given CoNLL-U file into internal representation.
 # The file parameter is the open file object.
 # The path parameter is needed only for diagnostic messages.
@@ -156,9 +271,9 @@ def load_conllu(file, path, treebank_type):
     # Internal representation classes
     class UDRepresentation:
         def __init__(self):
-            # Characters of all the tokens in the whole file.
+            # Characters of all the tokens in the whole file, as one string.
             # Whitespace between tokens is not included.
-            self.characters = []
+            self.characters = ''
             # List of UDSpan instances with start&end indices into `characters`.
             self.tokens = []
             # List of UDWord instances.
@@ -167,7 +282,13 @@ def load_conllu(file, path, treebank_type):
             self.sentences = []
             # File path may be needed in error messages.
             self.path = ''
+            # The treebank type the file was loaded with. Its filters of
+            # enhanced dependencies are applied in evaluate().
+            self.treebank_type = {}
+    # Spans and words are created for every token and word of the file, so
+    # they do not have instance dictionaries.
     class UDSpan:
+        __slots__ = ('start', 'end', 'line')
         def __init__(self, start, end, line):
             self.start = start
             # Note that self.end marks the first position **after the end** of span,
@@ -176,6 +297,8 @@ def load_conllu(file, path, treebank_type):
             # Line number (1-based) will be useful if we need to report an error later.
             self.line = line
     class UDWord:
+        __slots__ = ('span', 'columns', 'is_multiword', 'parent', 'functional_children',
+                     'is_content_deprel', 'is_functional_deprel', 'position')
         def __init__(self, span, columns, is_multiword):
             # Span of this word (or MWT, see below) within ud_representation.characters.
             self.span = span
@@ -188,6 +311,8 @@ def load_conllu(file, path, treebank_type):
             self.parent = None
             # List of references to UDWord instances representing functional-deprel children.
             self.functional_children = []
+            # Position of the word in its sentence (0-based), set when the sentence is complete.
+            self.position = None
             # Only consider universal FEATS.
             self.columns[FEATS] = "|".join(sorted(feat for feat in columns[FEATS].split("|")
                                                   if feat.split("=", 1)[0] in UNIVERSAL_FEATURES))
@@ -204,6 +329,9 @@ def load_conllu(file, path, treebank_type):
 
     # Load the CoNLL-U file
     ud.path = path
+    ud.treebank_type = treebank_type
+    # The forms of the tokens, to be concatenated to ud.characters at the end.
+    forms = []
     index, sentence_start = 0, None
     line_idx = 0
     while True:
@@ -239,7 +367,6 @@ def load_conllu(file, path, treebank_type):
             position = sentence_start # need to incrementally keep track of current position for loop detection in relcl
             for word in ud.words[sentence_start:]:
                 process_word(word)
-                enhanced_deps = word.columns[DEPS]
                 # replace head positions of enhanced dependencies with parent word object -- GB
                 processed_deps = []
                 for (head,steps) in word.columns[DEPS] :       # (3,['conj:en','obj:voor'])
@@ -255,88 +382,11 @@ def load_conllu(file, path, treebank_type):
                     hd = int(head)
                     parent = ud.words[sentence_start + hd -1] if hd else hd  # just assign '0' to parent for root cases
                     processed_deps.append((parent,steps))
-                enhanced_deps = processed_deps
-
-                # ignore rel>rel dependencies, and instead append the original hd/rel edge
-                # note that this also ignores other extensions (like adding lemma's)
-                # note that this sometimes introduces duplicates (if orig hd/rel was already included in DEPS)
-                if treebank_type.get('no_gapping', False) : # enhancement 1
-                    processed_deps = []
-                    for (parent,steps) in enhanced_deps :
-                        if len(steps) > 1 :
-                            processed_deps.append((word.parent,[word.columns[DEPREL]]))
-                        else :
-                            if (parent,steps) in processed_deps :
-                                True
-                            else :
-                                processed_deps.append((parent,steps))
-                    enhanced_deps = processed_deps
-
-                # for a given conj node, any rel other than conj in DEPS can be ignored
-                if treebank_type.get('no_shared_parents_in_coordination', False) :   # enhancement  2
-                    for (hd,steps) in enhanced_deps :
-                        if len(steps) == 1 and steps[0].startswith('conj') :
-                            enhanced_deps = [(hd,steps)]
-
-                # deprels not matching ud_hd/ud_dep are spurious.
-                #  czech/pud estonian/ewt syntagrus finnish/pud
-                # TO DO: treebanks that do not mark xcomp and relcl subjects
-                if treebank_type.get('no_shared_dependents_in_coordination', False) : # enhancement  3
-                    processed_deps = []
-                    for (hd,steps) in enhanced_deps :
-                        duplicate = 0
-                        for (hd2,steps2) in enhanced_deps :
-                            if steps == steps2 and hd2 == word.columns[HEAD]  and hd != hd2  : # checking only for ud_hd here, check for ud_dep as well?
-                                duplicate = 1
-                        if not(duplicate) :
-                            processed_deps.append((hd,steps))
-                    enhanced_deps = processed_deps
-
-                # if treebank does not have control relations: subjects of xcomp parents in system are to be skipped
-                # note that rel is actually a path sometimes rel1>rel2 in theory rel2 could be subj?
-                # from lassy-small: 7:conj:en>nsubj:pass|7:conj:en>nsubj:xsubj    (7,['conj:en','nsubj:xsubj'])
-                if treebank_type.get('no_control', False) : # enhancement 4
-                    processed_deps = []
-                    for (parent,steps) in enhanced_deps :
-                        include = 1
-                        if ( parent and parent.columns[DEPREL] == 'xcomp') :
-                            for rel in steps:
-                                if rel.startswith('nsubj') :
-                                    include = 0
-                        if include :
-                            processed_deps.append((parent,steps))
-                    enhanced_deps = processed_deps
-
-                if treebank_type.get('no_external_arguments_of_relative_clauses', False) : # enhancement 5
-                    processed_deps = []
-                    for (parent,steps) in enhanced_deps :
-                        if (steps[0] == 'ref') :
-                            processed_deps.append((word.parent,[word.columns[DEPREL]]))  # append the original relation
-                        # ignore external argument link
-                        # external args are deps of an acl:relcl where that acl also is a dependent of external arg (i.e. ext arg introduces a cycle)
-                        elif ( parent and parent.columns[DEPREL].startswith('acl')  and int(parent.columns[HEAD]) == position - sentence_start ) :
-                            #print('removed external argument')
-                            True
-                        else :
-                            processed_deps.append((parent,steps))
-                    enhanced_deps = processed_deps
-
-                # treebanks where no lemma info has been added
-                if treebank_type.get('no_case_info', False) :  # enhancement number 6
-                    processed_deps = []
-                    for (hd,steps) in enhanced_deps :
-                        processed_steps = []
-                        for dep in steps :
-                            depparts = dep.split(':')
-                            if depparts[0] in  CASE_DEPRELS :
-                                if (len(depparts) == 2 and not(depparts[1] in UNIVERSAL_DEPREL_EXTENSIONS )) :
-                                    dep = depparts[0]
-                            processed_steps.append(dep)
-                        processed_deps.append((hd,processed_steps))
-                    enhanced_deps = processed_deps
-
+                # The filters of the treebank type are applied later by
+                # enhanced_deps_view(), which needs the position of the word.
+                word.columns[DEPS] = processed_deps
+                word.position = position - sentence_start
                 position += 1
-                word.columns[DEPS] = enhanced_deps
 
             # func_children cannot be assigned within process_word
             # because it is called recursively and may result in adding one child twice.
@@ -384,7 +434,7 @@ def load_conllu(file, path, treebank_type):
             raise UDError("There is an empty FORM in the CoNLL-U file at line %d" % line_idx)
 
         # Save token
-        ud.characters.extend(columns[FORM])
+        forms.append(columns[FORM])
         ud.tokens.append(UDSpan(index, index + len(columns[FORM]), line_idx))
         index += len(columns[FORM])
 
@@ -435,15 +485,33 @@ def load_conllu(file, path, treebank_type):
     if sentence_start is not None:
         raise UDError("The CoNLL-U file does not end with empty line")
 
+    ud.characters = "".join(forms)
     return ud
 
 
 
+# The score of one metric. It is defined at the module level, so that the
+# results of evaluate() can be sent from a worker process (see evaluate_systems()).
+class Score:
+    def __init__(self, gold_total, system_total, correct, aligned_total=None):
+        self.correct = correct
+        self.gold_total = gold_total
+        self.system_total = system_total
+        self.aligned_total = aligned_total
+        self.precision = correct / system_total if system_total else 0.0
+        self.recall = correct / gold_total if gold_total else 0.0
+        self.f1 = 2 * correct / (system_total + gold_total) if system_total + gold_total else 0.0
+        self.aligned_accuracy = correct / aligned_total if aligned_total else aligned_total
+
+
+
 # Evaluate the gold and system treebanks (loaded using load_conllu).
-def evaluate(gold_ud, system_ud):
+def evaluate(gold_ud, system_ud, enhancements=None):
     """
     Takes internal representations of two CoNLL-U files, compares their
-    contents and returns the scores.
+    contents and returns the scores. ELAS and EULAS are computed with the
+    filters of enhanced dependencies of the treebank type each file was
+    loaded with.
 
     Parameters
     ----------
@@ -451,6 +519,11 @@ def evaluate(gold_ud, system_ud):
         Gold standard data.
     system_ud : UDRepresentationi
         System output data.
+    enhancements : list(str), optional
+        Additional enhancement profiles in the format of --enhancements
+        (e.g. ['0', '1', '12']). For each profile p, ELAS and EULAS are also
+        computed with its filters applied to both files, as 'ELAS[p]' and
+        'EULAS[p]'. The files are aligned only once. The default is None.
 
     Raises
     ------
@@ -462,16 +535,6 @@ def evaluate(gold_ud, system_ud):
     dict
         Indexed by metric names, the values are scores.
     """
-    class Score:
-        def __init__(self, gold_total, system_total, correct, aligned_total=None):
-            self.correct = correct
-            self.gold_total = gold_total
-            self.system_total = system_total
-            self.aligned_total = aligned_total
-            self.precision = correct / system_total if system_total else 0.0
-            self.recall = correct / gold_total if gold_total else 0.0
-            self.f1 = 2 * correct / (system_total + gold_total) if system_total + gold_total else 0.0
-            self.aligned_accuracy = correct / aligned_total if aligned_total else aligned_total
     class AlignmentWord:
         def __init__(self, gold_word, system_word):
             self.gold_word = gold_word
@@ -500,57 +563,121 @@ def evaluate(gold_ud, system_ud):
 
         return Score(len(gold_spans), len(system_spans), correct)
 
-    def alignment_score(alignment, key_fn=None, filter_fn=None):
-        if filter_fn is not None:
-            gold = sum(1 for gold in alignment.gold_words if filter_fn(gold))
-            system = sum(1 for system in alignment.system_words if filter_fn(system))
-            aligned = sum(1 for word in alignment.matched_words if filter_fn(word.gold_word))
-        else:
-            gold = len(alignment.gold_words)
-            system = len(alignment.system_words)
-            aligned = len(alignment.matched_words)
-
-        if key_fn is None:
-            # Return score for whole aligned words
-            return Score(gold, system, aligned)
-
-        def gold_aligned_gold(word):
-            return word
-        def gold_aligned_system(word):
-            return alignment.matched_words_map.get(word, 'NotAligned') if word is not None else None
-        correct = 0
+    def deps_getter(treebank_type):
+        # Return a function that gives the enhanced deps of a word with the
+        # filters of treebank_type (if there are any).
+        if any(treebank_type.get(name, False) for name in ENHANCEMENT_FILTERS):
+            return lambda word: enhanced_deps_view(word, treebank_type)
+        return lambda word: word.columns[DEPS]
+
+    def enhanced_counts(matched, gold_deps, system_deps):
+        # Count the matching enhanced dependencies of a pair of aligned words
+        # for ELAS and EULAS. Parents are pointers to word objects (or 0 for
+        # the root), so the system parent is compared with the gold word
+        # aligned to it, as tokenization may introduce mismatches in the
+        # number of words per sentence. EULAS ignores the subtypes.
+        elas = eulas = 0
+        if gold_deps and system_deps:
+            system_deps = [(matched.get(sparent, 'NotAligned'), sparent == 0, sdep, [d.split(':')[0] for d in sdep])
+                           for (sparent, sdep) in system_deps]
+            for (parent, dep) in gold_deps:
+                eulas_dep = [d.split(':')[0] for d in dep]
+                for (aligned_sparent, sroot, sdep, eulas_sdep) in system_deps:
+                    if parent == aligned_sparent or (parent == 0 and sroot):
+                        if dep == sdep:
+                            elas += 1
+                            eulas += 1
+                        elif eulas_dep == eulas_sdep:
+                            eulas += 1
+        return elas, eulas
+
+    def alignment_scores(alignment, gold_type, system_type):
+        # Compute all the metrics on aligned words in one pass over the alignment.
+        # A system word (typically the parent or a functional child of a system
+        # word) is mapped to the gold word aligned with it, so that it can be
+        # compared with the gold word; unaligned system words are mapped to
+        # 'NotAligned', which is not equal to any gold word.
+        matched = alignment.matched_words_map
+        gold_deps_of, system_deps_of = deps_getter(gold_type), deps_getter(system_type)
+        gold, system = len(alignment.gold_words), len(alignment.system_words)
+        aligned = len(alignment.matched_words)
+        # CLAS, MLAS and BLEX only consider words with a content deprel.
+        gold_content = sum(1 for word in alignment.gold_words if word.is_content_deprel)
+        system_content = sum(1 for word in alignment.system_words if word.is_content_deprel)
+        aligned_content = 0
+        # ELAS and EULAS count the enhanced dependencies instead of words.
+        gold_deps = sum(len(gold_deps_of(word)) for word in alignment.gold_words)
+        system_deps = sum(len(system_deps_of(word)) for word in alignment.system_words)
+        upos = xpos = feats = alltags = lemmas = uas = las = clas = mlas = blex = elas = eulas = 0
         for words in alignment.matched_words:
-            if filter_fn is None or filter_fn(words.gold_word):
-                if key_fn(words.gold_word, gold_aligned_gold) == key_fn(words.system_word, gold_aligned_system):
-                    correct += 1
-
-        return Score(gold, system, correct, aligned)
-
-    def enhanced_alignment_score(alignment, EULAS):
-        # count all matching enhanced deprels in gold, system GB
-        # gold and system = sum of gold and predicted deps
-        # parents are pointers to word object, make sure to compare system parent with aligned word in gold in cases where
-        # tokenization introduces mismatches in number of words per sentence.
-        gold = 0
-        for gold_word in alignment.gold_words :
-            gold += len(gold_word.columns[DEPS])
-        system = 0
-        for system_word in alignment.system_words :
-            system += len(system_word.columns[DEPS])
-        correct = 0
+            gold_word, system_word = words.gold_word, words.system_word
+            gold_columns, system_columns = gold_word.columns, system_word.columns
+            upos_ok = gold_columns[UPOS] == system_columns[UPOS]
+            xpos_ok = gold_columns[XPOS] == system_columns[XPOS]
+            feats_ok = gold_columns[FEATS] == system_columns[FEATS]
+            # The lemma is not evaluated where the gold lemma is '_'.
+            lemma_ok = gold_columns[LEMMA] == "_" or gold_columns[LEMMA] == system_columns[LEMMA]
+            head_ok = gold_word.parent == (matched.get(system_word.parent, 'NotAligned')
+                                           if system_word.parent is not None else None)
+            label_ok = head_ok and gold_columns[DEPREL] == system_columns[DEPREL]
+            upos += upos_ok
+            xpos += xpos_ok
+            feats += feats_ok
+            alltags += upos_ok and xpos_ok and feats_ok
+            lemmas += lemma_ok
+            uas += head_ok
+            las += label_ok
+            if gold_word.is_content_deprel:
+                aligned_content += 1
+                clas += label_ok
+                blex += label_ok and lemma_ok
+                if label_ok and upos_ok and feats_ok:
+                    gold_children = gold_word.functional_children
+                    system_children = system_word.functional_children
+                    if len(gold_children) == len(system_children) and \
+                            all(g is matched.get(s, 'NotAligned') and
+                                g.columns[DEPREL] == s.columns[DEPREL] and
+                                g.columns[UPOS] == s.columns[UPOS] and
+                                g.columns[FEATS] == s.columns[FEATS]
+                                for g, s in zip(gold_children, system_children)):
+                        mlas += 1
+            word_elas, word_eulas = enhanced_counts(matched, gold_deps_of(gold_word), system_deps_of(system_word))
+            elas += word_elas
+            eulas += word_eulas
+        return {
+            "Words": Score(gold, system, aligned),
+            "UPOS": Score(gold, system, upos, aligned),
+            "XPOS": Score(gold, system, xpos, aligned),
+            "UFeats": Score(gold, system, feats, aligned),
+            "AllTags": Score(gold, system, alltags, aligned),
+            "Lemmas": Score(gold, system, lemmas, aligned),
+            "UAS": Score(gold, system, uas, aligned),
+            "LAS": Score(gold, system, las, aligned),
+            "ELAS": Score(gold_deps, system_deps, elas),
+            "EULAS": Score(gold_deps, system_deps, eulas),
+            "CLAS": Score(gold_content, system_content, clas, aligned_content),
+            "MLAS": Score(gold_content, system_content, mlas, aligned_content),
+            "BLEX": Score(gold_content, system_content, blex, aligned_content),
+        }
+
+    def enhancement_scores(alignment, enhancements):
+        # Compute ELAS and EULAS for each of the enhancement profiles, with
+        # its filters applied to the enhanced deps of both files.
+        matched = alignment.matched_words_map
+        deps_of = [deps_getter(enhancement_type(profile)) for profile in enhancements]
+        gold = [sum(len(f(word)) for word in alignment.gold_words) for f in deps_of]
+        system = [sum(len(f(word)) for word in alignment.system_words) for f in deps_of]
+        elas, eulas = [0] * len(enhancements), [0] * len(enhancements)
         for words in alignment.matched_words:
-            gold_deps = words.gold_word.columns[DEPS]
-            system_deps = words.system_word.columns[DEPS]
-            for (parent, dep) in gold_deps :
-                eulas_dep = [d.split(':')[0] for d in dep]
-                for (sparent, sdep) in system_deps:
-                    eulas_sdep = [d.split(':')[0] for d in sdep]
-                    if dep == sdep or ( eulas_dep == eulas_sdep and EULAS ) :
-                        if parent == alignment.matched_words_map.get(sparent, 'NotAligned') :
-                            correct += 1
-                        elif (parent == 0 and sparent == 0) :  # cases where parent is root
-                            correct += 1
-        return Score(gold, system, correct)
+            for i, f in enumerate(deps_of):
+                word_elas, word_eulas = enhanced_counts(matched, f(words.gold_word), f(words.system_word))
+                elas[i] += word_elas
+                eulas[i] += word_eulas
+        scores = {}
+        for i, profile in enumerate(enhancements):
+            scores["ELAS[{}]".format(profile)] = Score(gold[i], system[i], elas[i])
+            scores["EULAS[{}]".format(profile)] = Score(gold[i], system[i], eulas[i])
+        return scores
 
     def beyond_end(words, i, multiword_span_end):
         if i >= len(words):
@@ -640,7 +767,10 @@ def evaluate(gold_ud, system_ud):
     # Check that the underlying character sequences match.
     if gold_ud.characters != system_ud.characters:
         # Identify the surrounding tokens and line numbers so the error is easier to debug.
+        # Skip the identical blocks of characters first, then find the first differing character.
         index = 0
+        while gold_ud.characters[index:index + 4096] == system_ud.characters[index:index + 4096]:
+            index += 4096
         while index < len(gold_ud.characters) and index < len(system_ud.characters) and \
                 gold_ud.characters[index] == system_ud.characters[index]:
             index += 1
@@ -656,8 +786,8 @@ def evaluate(gold_ud, system_ud):
             nprev = 10 if gtindex >= 10 else gtindex
             nnext = 10 if gtindex + 10 <= len(gold_ud.tokens) else len(gold_ud.tokens) - gtindex
             nfirst = gtindex - nprev
-            prevtokens = ' '.join([''.join(gold_ud.characters[t.start:t.end]) for t in gold_ud.tokens[nfirst:gtindex]])
-            nexttokens = ' '.join([''.join(gold_ud.characters[t.start:t.end]) for t in gold_ud.tokens[gtindex:gtindex + nnext]])
+            prevtokens = ' '.join([gold_ud.characters[t.start:t.end] for t in gold_ud.tokens[nfirst:gtindex]])
+            nexttokens = ' '.join([gold_ud.characters[t.start:t.end] for t in gold_ud.tokens[gtindex:gtindex + nnext]])
             gtokenreport = "File '{}':\n".format(gold_ud.path)
             gtokenreport += "  Token no. {} on line no. {} is the last one with all characters reproduced in the other file.\n".format(gtindex, gold_ud.tokens[gtindex-1].line)
             gtokenreport += "  The previous {} tokens are '{}'.\n".format(nprev, prevtokens)
@@ -666,8 +796,8 @@ def evaluate(gold_ud, system_ud):
             nprev = 10 if stindex >= 10 else stindex
             nnext = 10 if stindex + 10 <= len(system_ud.tokens) else len(system_ud.tokens) - stindex
             nfirst = stindex - nprev
-            prevtokens = ' '.join([''.join(system_ud.characters[t.start:t.end]) for t in system_ud.tokens[nfirst:stindex]])
-            nexttokens = ' '.join([''.join(system_ud.characters[t.start:t.end]) for t in system_ud.tokens[stindex:stindex + nnext]])
+            prevtokens = ' '.join([system_ud.characters[t.start:t.end] for t in system_ud.tokens[nfirst:stindex]])
+            nexttokens = ' '.join([system_ud.characters[t.start:t.end] for t in system_ud.tokens[stindex:stindex + nnext]])
             stokenreport = "File '{}':\n".format(system_ud.path)
             stokenreport += "  Token no. {} on line no. {} is the last one with all characters reproduced in the other file.\n".format(stindex, system_ud.tokens[stindex-1].line)
             stokenreport += "  The previous {} tokens are '{}'.\n".format(nprev, prevtokens)
@@ -675,8 +805,8 @@ def evaluate(gold_ud, system_ud):
         raise UDError(
             "The concatenation of tokens in gold file and in system file differ!\n" + gtokenreport + stokenreport +
             "First 20 differing characters in gold file: '{}' and system file: '{}'".format(
-                "".join(gold_ud.characters[index:index + 20]),
-                "".join(system_ud.characters[index:index + 20])
+                gold_ud.characters[index:index + 20],
+                system_ud.characters[index:index + 20]
             )
         )
 
@@ -684,35 +814,21 @@ def evaluate(gold_ud, system_ud):
     alignment = align_words(gold_ud.words, system_ud.words)
 
     # Compute the F1-scores
-    return {
+    scores = {
         "Tokens": spans_score(gold_ud.tokens, system_ud.tokens),
         "Sentences": spans_score(gold_ud.sentences, system_ud.sentences),
-        "Words": alignment_score(alignment),
-        "UPOS": alignment_score(alignment, lambda w, _: w.columns[UPOS]),
-        "XPOS": alignment_score(alignment, lambda w, _: w.columns[XPOS]),
-        "UFeats": alignment_score(alignment, lambda w, _: w.columns[FEATS]),
-        "AllTags": alignment_score(alignment, lambda w, _: (w.columns[UPOS], w.columns[XPOS], w.columns[FEATS])),
-        "Lemmas": alignment_score(alignment, lambda w, ga: w.columns[LEMMA] if ga(w).columns[LEMMA] != "_" else "_"),
-        "UAS": alignment_score(alignment, lambda w, ga: ga(w.parent)),
-        "LAS": alignment_score(alignment, lambda w, ga: (ga(w.parent), w.columns[DEPREL])),
-        "ELAS": enhanced_alignment_score(alignment, 0),
-        "EULAS": enhanced_alignment_score(alignment, 1),
-        "CLAS": alignment_score(alignment, lambda w, ga: (ga(w.parent), w.columns[DEPREL]),
-                                filter_fn=lambda w: w.is_content_deprel),
-        "MLAS": alignment_score(alignment, lambda w, ga: (ga(w.parent), w.columns[DEPREL], w.columns[UPOS], w.columns[FEATS],
-                                                         [(ga(c), c.columns[DEPREL], c.columns[UPOS], c.columns[FEATS])
-                                                          for c in w.functional_children]),
-                                filter_fn=lambda w: w.is_content_deprel),
-        "BLEX": alignment_score(alignment, lambda w, ga: (ga(w.parent), w.columns[DEPREL],
-                                                          w.columns[LEMMA] if ga(w).columns[LEMMA] != "_" else "_"),
-                                filter_fn=lambda w: w.is_content_deprel),
     }
+    scores.update(alignment_scores(alignment, gold_ud.treebank_type, system_ud.treebank_type))
+    if enhancements:
+        scores.update(enhancement_scores(alignment, enhancements))
+    return scores
 
 
 
-def load_conllu_file(path, treebank_type=None):
+def load_conllu_file(path, treebank_type=None, sentences=None):
     """
-    Reads a CoNLL-U file into internal representation.
+    Reads a CoNLL-U file into internal representation. Files compressed by
+    gzip, xz or bzip2 are decompressed on the fly.
 
     Parameters
     ----------
@@ -720,6 +836,10 @@ def load_conllu_file(path, treebank_type=None):
         The name of (and path to) the file.
     treebank_type : dict, optional
         Additional information about what we expect / should read. The default is None.
+    sentences : list(int), optional
+        If provided, only these sentences (numbered from 0 in the order of the
+        file) are read, through the sentence index of the file (see
+        udtools.index.SentenceIndex). The default is None (the whole file).
 
     Returns
     -------
@@ -728,16 +848,65 @@ def load_conllu_file(path, treebank_type=None):
     """
     if treebank_type is None:
         treebank_type = {}
-    _file = open(path, mode="r", **({"encoding": "utf-8"}))
+    if sentences is not None:
+        with SentenceIndex.for_file(path) as index:
+            _file = io.StringIO("".join(index.read_text(i) for i in sentences))
+    else:
+        _file = open_text(path)
     return load_conllu(_file, path, treebank_type)
 
 
 
+def treebank_type_from_args(args):
+    """
+    Translates the command line options of the scorer to the treebank_type
+    dictionary expected by load_conllu().
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Command line arguments of the eval.py script.
+
+    Returns
+    -------
+    dict
+        The treebank type.
+    """
+    # With several enhancement profiles, ELAS and EULAS are computed with the
+    # first one (the others are given by enhancements_from_args()).
+    treebank_type = enhancement_type(args.enhancements.split(',')[0])
+    treebank_type['no_empty_nodes'] = args.no_empty_nodes
+    treebank_type['multiple_roots_okay'] = args.multiple_roots_okay
+    return treebank_type
+
+
+
+def enhancements_from_args(args):
+    """
+    Returns the enhancement profiles for evaluate() if the --enhancements
+    option lists more than one of them (e.g. '0,1,12').
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Command line arguments of the eval.py script.
+
+    Returns
+    -------
+    list(str) or None
+        The enhancement profiles, or None if there is only one.
+    """
+    enhancements = args.enhancements.split(',')
+    return enhancements if len(enhancements) > 1 else None
+
+
+
 def evaluate_wrapper(args):
     """
     Takes file names and options from command line arguments, loads the files,
     evaluates their similarity and returns the result of evaluate(). Use
     `--help` to obtain their description (or see udtools.argparser.parse_args_scorer()).
+    Only the first system file is evaluated; see evaluate_systems_wrapper().
 
     Parameters
     ----------
@@ -749,21 +918,252 @@ def evaluate_wrapper(args):
     dict
         Indexed by metric names, values are scores.
     """
-    treebank_type = {}
-    enhancements = list(args.enhancements)
-    treebank_type['no_gapping'] = 1 if '1' in enhancements else 0
-    treebank_type['no_shared_parents_in_coordination'] = 1 if '2' in enhancements else 0
-    treebank_type['no_shared_dependents_in_coordination'] = 1 if '3' in enhancements else 0
-    treebank_type['no_control'] = 1 if '4' in enhancements else 0
-    treebank_type['no_external_arguments_of_relative_clauses'] = 1 if '5' in enhancements else 0
-    treebank_type['no_case_info'] = 1 if '6' in enhancements else 0
-    treebank_type['no_empty_nodes'] = args.no_empty_nodes
-    treebank_type['multiple_roots_okay'] = args.multiple_roots_okay
+    treebank_type = treebank_type_from_args(args)
 
     # Load CoNLL-U files
     gold_ud = load_conllu_file(args.gold_file, treebank_type)
     system_ud = load_conllu_file(args.system_file, treebank_type)
-    return evaluate(gold_ud, system_ud)
+    return evaluate(gold_ud, system_ud, enhancements_from_args(args))
+
+
+
+# The gold data, the treebank type and the enhancement profiles in the worker
+# processes of evaluate_systems(). The workers are forked after they are set,
+# so the gold data are shared with the main process and not loaded or copied again.
+_worker_gold = None
+_worker_treebank_type = None
+_worker_enhancements = None
+
+def _evaluate_system(path):
+    try:
+        return evaluate(_worker_gold, load_conllu_file(path, _worker_treebank_type), _worker_enhancements)
+    except (UDError, OSError) as e:
+        return e
+
+
+
+def evaluate_systems(gold_ud, system_paths, treebank_type=None, jobs=1, enhancements=None):
+    """
+    Evaluates several system files against the same gold data, which are
+    loaded only once. With jobs > 1, the system files are loaded and
+    evaluated in a pool of worker processes. The workers are forked, so they
+    share the gold data with the calling process; where fork is not
+    available, the files are evaluated in the calling process.
+
+    Parameters
+    ----------
+    gold_ud : UDRepresentation
+        Gold standard data (see load_conllu_file()). They are not modified.
+    system_paths : list(str)
+        The names of (and paths to) the system files.
+    treebank_type : dict, optional
+        Passed to load_conllu() with each system file. The default is None.
+    jobs : int, optional
+        Number of worker processes. The default is 1 (no workers).
+    enhancements : list(str), optional
+        Additional enhancement profiles, passed to evaluate(). The default is None.
+
+    Returns
+    -------
+    list
+        For each system file in the order of system_paths, the result of
+        evaluate() (a dict indexed by metric names), or the UDError (or
+        OSError) if the file could not be loaded or evaluated.
+    """
+    global _worker_gold, _worker_treebank_type, _worker_enhancements
+    _worker_gold = gold_ud
+    _worker_treebank_type = treebank_type if treebank_type is not None else {}
+    _worker_enhancements = enhancements
+    try:
+        jobs = min(jobs, len(system_paths))
+        if jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            with multiprocessing.get_context('fork').Pool(jobs) as pool:
+                return pool.map(_evaluate_system, system_paths, chunksize=1)
+        return [_evaluate_system(path) for path in system_paths]
+    finally:
+        _worker_gold = None
+        _worker_treebank_type = None
+        _worker_enhancements = None
+
+
+
+def evaluate_systems_wrapper(args):
+    """
+    Takes file names and options from command line arguments, loads the gold
+    file and evaluates all the system files against it (see evaluate_systems()).
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Command line arguments of the eval.py script.
+
+    Returns
+    -------
+    list
+        The result of evaluate_systems() for [args.system_file] + args.more_system_files.
+    """
+    treebank_type = treebank_type_from_args(args)
+    gold_ud = load_conllu_file(args.gold_file, treebank_type)
+    system_paths = [args.system_file] + list(getattr(args, 'more_system_files', []))
+    return evaluate_systems(gold_ud, system_paths, treebank_type, getattr(args, 'jobs', 1), enhancements_from_args(args))
+
+
+
+def udapi_tree_lines(root):
+    """
+    Converts a Udapi tree to the CoNLL-U lines of the sentence, as far as
+    load_conllu() needs them (comments and empty nodes are omitted).
+
+    Parameters
+    ----------
+    root : udapi.core.root.Root
+        The root of the tree.
+
+    Returns
+    -------
+    list(str)
+        The CoNLL-U lines of the words and multiword tokens.
+    """
+    lines = []
+    for node in root.descendants:
+        mwt = node.multiword_token
+        if mwt and node is mwt.words[0]:
+            lines.append("\t".join(["{}-{}".format(node.ord, mwt.words[-1].ord), mwt.form,
+                                    "_", "_", "_", "_", "_", "_", "_", str(mwt.misc)]))
+        lines.append("\t".join([str(node.ord), node.form, node.lemma or "_", node.upos or "_", node.xpos or "_",
+                                str(node.feats), str(node.parent.ord), node.deprel or "_", node.raw_deps or "_", str(node.misc)]))
+    return lines
+
+
+
+class Evaluator:
+    """
+    Evaluates system output sentence by sentence against gold data that are
+    loaded only once, e.g. on the development data after every epoch of
+    training a parser. The system sentences are given in memory (no files are
+    written or read), each is aligned with the corresponding gold sentence and
+    scored as soon as it is added, and only the counts of the metrics are
+    kept. The system sentences must correspond to the gold sentences one to
+    one (i.e., their text must be the same up to whitespace); the scores are
+    then the same as those of evaluate() on the whole files.
+
+        evaluator = Evaluator('dev.conllu')
+        for sentence in parsed_sentences:
+            evaluator.add_system_sentence(sentence)
+        las = evaluator.scores()['LAS'].f1
+        evaluator.reset()
+    """
+    def __init__(self, gold, treebank_type=None, enhancements=None):
+        """
+        Parameters
+        ----------
+        gold : str or list(list(str))
+            The name of (and path to) the gold CoNLL-U file, or the gold
+            sentences, each as a list of its CoNLL-U lines.
+        treebank_type : dict, optional
+            Passed to load_conllu() with each gold and system sentence. The default is None.
+        enhancements : list(str), optional
+            Additional enhancement profiles, passed to evaluate(). The default is None.
+        """
+        self.treebank_type = treebank_type if treebank_type is not None else {}
+        self.enhancements = enhancements
+        if isinstance(gold, str):
+            path = gold
+            with open_text(gold) as f:
+                gold = self._split_sentences(f)
+        else:
+            path = 'gold sentence'
+        # The gold sentences, each loaded as a separate file.
+        self.gold = [self._load(lines, path) for lines in gold]
+        self.reset()
+
+    @staticmethod
+    def _split_sentences(file):
+        sentences, lines = [], []
+        for line in file:
+            line = line.rstrip("\r\n")
+            if line:
+                lines.append(line)
+            elif lines:
+                sentences.append(lines)
+                lines = []
+        if lines:
+            sentences.append(lines)
+        return sentences
+
+    def _load(self, lines, path):
+        lines = [line.rstrip("\r\n") for line in lines]
+        while lines and not lines[-1]:
+            lines.pop()
+        return load_conllu(io.StringIO("\n".join(lines) + "\n\n"), path, self.treebank_type)
+
+    def reset(self):
+        """
+        Forgets the system sentences added so far, so that another system
+        output (e.g. after the next epoch) can be evaluated.
+        """
+        self.n_sentences = 0
+        # For each metric, the sums of correct, gold_total, system_total and aligned_total.
+        self.counts = {}
+
+    def add_system_sentence(self, sentence):
+        """
+        Evaluates the next system sentence against the corresponding gold
+        sentence and adds its counts to the running totals.
+
+        Parameters
+        ----------
+        sentence : list(str) or udapi.core.root.Root
+            The CoNLL-U lines of the sentence (comments are allowed, the
+            terminating empty line is optional), or its Udapi tree.
+
+        Raises
+        ------
+        UDError
+            If the sentence cannot be loaded, if there are more system
+            sentences than gold sentences, or if the text of the sentence
+            does not match the gold sentence.
+        """
+        if self.n_sentences >= len(self.gold):
+            raise UDError("There are more system sentences than gold sentences ({})".format(len(self.gold)))
+        if hasattr(sentence, 'descendants'):
+            sentence = udapi_tree_lines(sentence)
+        system_ud = self._load(sentence, 'system sentence {}'.format(self.n_sentences + 1))
+        evaluation = evaluate(self.gold[self.n_sentences], system_ud, self.enhancements)
+        self.n_sentences += 1
+        for metric, score in evaluation.items():
+            counts = self.counts.setdefault(metric, [0, 0, 0, None])
+            counts[0] += score.correct
+            counts[1] += score.gold_total
+            counts[2] += score.system_total
+            if score.aligned_total is not None:
+                counts[3] = (counts[3] or 0) + score.aligned_total
+
+    def scores(self):
+        """
+        Returns the scores of the system sentences added so far.
+
+        Raises
+        ------
+        UDError
+            If a system sentence has not been added for every gold sentence.
+
+        Returns
+        -------
+        dict
+            Indexed by metric names, the values are scores (as in evaluate()).
+        """
+        if self.n_sentences != len(self.gold):
+            raise UDError("There are {} system sentences but {} gold sentences".format(self.n_sentences, len(self.gold)))
+        return {metric: Score(gold_total, system_total, correct, aligned_total)
+                for metric, (correct, gold_total, system_total, aligned_total) in self.counts.items()}
+
+
+
+# ELAS and EULAS, followed by the same metrics for each enhancement profile
+# in the evaluation (see the enhancements parameter of evaluate()).
+def enhanced_metrics(evaluation):
+    return ENHANCED_METRICS + [metric for metric in evaluation if metric.startswith(('ELAS[', 'EULAS['))]
 
 
 
@@ -797,17 +1197,15 @@ def build_evaluation_table(evaluation, verbose=True, counts=False, enhanced=Fals
         text.append("MLAS Score: {:.2f}".format(100 * evaluation["MLAS"].f1))
         text.append("BLEX Score: {:.2f}".format(100 * evaluation["BLEX"].f1))
         if enhanced:
-            text.append("ELAS F1 Score: {:.2f}".format(100 * evaluation["ELAS"].f1))
-            text.append("EULAS F1 Score: {:.2f}".format(100 * evaluation["EULAS"].f1))
+            for metric in enhanced_metrics(evaluation):
+                text.append("{} F1 Score: {:.2f}".format(metric, 100 * evaluation[metric].f1))
     else:
         if counts:
             text.append("Metric     | Correct   |      Gold | Predicted | Aligned")
         else:
             text.append("Metric     | Precision |    Recall |  F1 Score | AligndAcc")
         text.append("-----------+-----------+-----------+-----------+-----------")
-        metrics = ["Tokens", "Sentences", "Words", "UPOS", "XPOS", "UFeats", "AllTags", "Lemmas", "UAS", "LAS", "CLAS", "MLAS", "BLEX"]
-        if enhanced:
-            metrics += ["ELAS", "EULAS"]
+        metrics = METRICS + enhanced_metrics(evaluation) if enhanced else METRICS
         for metric in metrics:
             if counts:
                 text.append("{:11}|{:10} |{:10} |{:10} |{:10}".format(
@@ -830,6 +1228,87 @@ def build_evaluation_table(evaluation, verbose=True, counts=False, enhanced=Fals
 
 
 
+def build_systems_table(system_paths, evaluations, counts=False, enhanced=False):
+    """
+    Creates a plaintext table with one row per system file and the F1 scores
+    of all metrics in the columns.
+
+    Parameters
+    ----------
+    system_paths : list(str)
+        The names of the system files.
+    evaluations : list
+        The output of the evaluate_systems() function.
+    counts : bool, optional
+        Print the numbers of correct words (tokens, sentences, dependencies)
+        instead of F1. Default is False.
+    enhanced : bool, optional
+        Include evaluation of enhanced graphs. Default is False.
+
+    Returns
+    -------
+    str
+        The table with results.
+    """
+    evaluated = [evaluation for evaluation in evaluations if not isinstance(evaluation, Exception)]
+    metrics = METRICS + enhanced_metrics(evaluated[0] if evaluated else {}) if enhanced else METRICS
+    width = max([len("System")] + [len(path) for path in system_paths])
+    text = []
+    text.append("{:{}} |".format("System", width) + " |".join("{:>10}".format(metric) for metric in metrics))
+    text.append("-" * (width + 1) + "+" + "+".join("-" * 11 for metric in metrics[1:]) + "+" + "-" * 10)
+    for path, evaluation in zip(system_paths, evaluations):
+        if isinstance(evaluation, Exception):
+            text.append("{:{}} | ERROR: {}".format(path, width, str(evaluation).split("\n")[0]))
+        elif counts:
+            text.append("{:{}} |".format(path, width) + " |".join("{:10}".format(evaluation[metric].correct) for metric in metrics))
+        else:
+            text.append("{:{}} |".format(path, width) + " |".join("{:10.2f}".format(100 * evaluation[metric].f1) for metric in metrics))
+    return "\n".join(text)
+
+
+
+def build_evaluation_json(system_paths, evaluations, enhanced=False):
+    """
+    Creates a JSON list with one object per system file. The object has the
+    name of the file under `system` and either the scores under `metrics`
+    (precision, recall, f1, aligned_accuracy and the raw counts of each
+    metric), or the message under `error` if the file could not be evaluated.
+
+    Parameters
+    ----------
+    system_paths : list(str)
+        The names of the system files.
+    evaluations : list
+        The output of the evaluate_systems() function.
+    enhanced : bool, optional
+        Include evaluation of enhanced graphs. Default is False.
+
+    Returns
+    -------
+    str
+        The JSON text.
+    """
+    evaluated = [evaluation for evaluation in evaluations if not isinstance(evaluation, Exception)]
+    metrics = METRICS + enhanced_metrics(evaluated[0] if evaluated else {}) if enhanced else METRICS
+    rows = []
+    for path, evaluation in zip(system_paths, evaluations):
+        if isinstance(evaluation, Exception):
+            rows.append({'system': path, 'error': str(evaluation)})
+        else:
+            rows.append({'system': path, 'metrics': {metric: {
+                'precision': evaluation[metric].precision,
+                'recall': evaluation[metric].recall,
+                'f1': evaluation[metric].f1,
+                'aligned_accuracy': evaluation[metric].aligned_accuracy,
+                'correct': evaluation[metric].correct,
+                'gold_total': evaluation[metric].gold_total,
+                'system_total': evaluation[metric].system_total,
+                'aligned_total': evaluation[metric].aligned_total,
+            } for metric in metrics}})
+    return json.dumps(rows, ensure_ascii=False, indent=2)
+
+
+
 # Tests, which can be executed with `python -m unittest udeval`.
 class TestAlignment(unittest.TestCase):
     @staticmethod
@@ -862,6 +1341,11 @@ class TestAlignment(unittest.TestCase):
     def test_exception(self):
         self._test_exception(["a"], ["b"])
 
+    def test_characters(self):
+        self.assertEqual(self._load_words(["ab a b", "c"]).characters, "abc")
+        with self.assertRaisesRegex(UDError, "gold file: 'c' and system file: 'x'"):
+            evaluate(self._load_words(["ab", "c"]), self._load_words(["a", "bx"]))
+
     def test_equal(self):
         self._test_ok(["a"], ["a"], 1)
         self._test_ok(["a", "b", "c"], ["a", "b", "c"], 3)
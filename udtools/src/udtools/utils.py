@@ -1,3 +1,4 @@
+import unicodedata
 import regex as re
 # Allow using this module from the root folder of tools even if it is not
 # installed as a package: use the relative path validator/src/validator for
@@ -84,6 +85,10 @@ class CompiledRegexes:
 
 # Global variables:
 crex = CompiledRegexes()
+# All whitespace characters (str.isspace() is true for them) except TAB and LF,
+# the ASCII ones first. The \s of regular expressions matches the same
+# characters except \x1c-\x1f.
+OTHER_WHITESPACE = '\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000'
 
 
 
@@ -104,6 +109,47 @@ def is_whitespace(line):
     """
     return crex.ws.fullmatch(line)
 
+
+def is_nfc(text):
+    """
+    Checks whether a given text is in Unicode normalization form NFC. The
+    text can consist of multiple lines; the newline character does not
+    compose with anything, so the text is NFC iff all its lines are NFC.
+
+    Parameters
+    ----------
+    text : str
+        A line or lines of text.
+
+    Returns
+    -------
+    _ : bool
+    """
+    return text.isascii() or unicodedata.is_normalized('NFC', text)
+
+
+def has_suspicious_whitespace(text):
+    """
+    A bulk test of the token lines of a sentence (joined by newlines) for
+    everything that check_whitespace() could report: whitespace other than
+    TAB, and empty columns. If the test is negative, none of the lines needs
+    to be tested in detail.
+
+    Parameters
+    ----------
+    text : str
+        One or more token lines joined by newline characters.
+
+    Returns
+    -------
+    _ : bool
+    """
+    if '\t\t' in text or '\n\t' in text or '\t\n' in text or text.startswith('\t') or text.endswith('\t'):
+        return True
+    # Searching for each character separately is much faster than a regular
+    # expression.
+    return any(c in text for c in (OTHER_WHITESPACE[:8] if text.isascii() else OTHER_WHITESPACE))
+
 def is_word(cols):
     """
     Checks whether a CoNLL-U line represents a syntactic word by checking that
@@ -221,7 +267,7 @@ def formtl(node):
 
     Parameters
     ----------
-    node : udapi.core.node.Node object
+    node : udtools.sentence.Node object
         The node whose form we want to get.
 
     Returns
@@ -242,7 +288,7 @@ def lemmatl(node):
 
     Parameters
     ----------
-    node : udapi.core.node.Node object
+    node : udtools.sentence.Node object
         The node whose lemma we want to get.
 
     Returns
@@ -266,7 +312,7 @@ def get_alt_language(node):
 
     Parameters
     ----------
-    node : udapi.core.node.Node object
+    node : udtools.sentence.Node object
         The node (word) whose language is being queried.
     """
     if node.misc['Lang'] != '':
@@ -364,7 +410,9 @@ def next_sentence(state, inp):
         state.current_line = line_counter + 1
         line = line.rstrip("\n")
         sentence_lines.append(line)
-        if not line or is_whitespace(line):
+        # (A whitespace line must start with whitespace; testing the first
+        # character is much cheaper than the regular expression.)
+        if not line or line[0].isspace() and is_whitespace(line):
             # If a line is not empty but contains only whitespace, we will
             # pretend that it terminates a sentence in order to avoid
             # subsequent misleading error messages.
@@ -426,48 +474,28 @@ def get_caused_nonprojectivities(node):
 
     Parameters
     ----------
-    node : udapi.core.node.Node object
+    node : udtools.sentence.Node object
         The tree node to be tested.
 
     Returns
     -------
-    cross : list of udapi.core.node.Node objects
+    cross : list of udtools.sentence.Node objects
         The nodes whose attachment is nonprojective because of the current node.
     """
-    nodes = node.root.descendants
+    # The nodes whose relation goes over the current node although their
+    # parent is not its ancestor are found in the projectivity index of the
+    # sentence.
     iid = node.ord
-    # We need to find all nodes that are not ancestors of this node and lie
-    # on other side of this node than their parent. First get the set of
-    # ancestors.
-    ancestors = []
-    current_node = node
-    while not current_node.is_root():
-        current_node = current_node.parent
-        ancestors.append(current_node)
-    maxid = nodes[-1].ord
-    # Get the lists of nodes to either side of id.
-    # Do not look beyond the parent (if it is in the same gap, it is the parent's responsibility).
     pid = node.parent.ord
+    # Do not look beyond the parent (if it is in the same gap, it is the
+    # parent's responsibility), i.e., exclude nonprojectivities that are
+    # caused by ancestors of the current node.
     if pid < iid:
-        leftidrange = range(pid + 1, iid) # ranges are open from the right (i.e. iid-1 is the last number)
-        rightidrange = range(iid + 1, maxid + 1)
-    else:
-        leftidrange = range(1, iid)
-        rightidrange = range(iid + 1, pid)
-    left = [n for n in nodes if n.ord in leftidrange]
-    right = [n for n in nodes if n.ord in rightidrange]
-    # Exclude nodes whose parents are ancestors of id.
-    leftna = [x for x in left if x.parent not in ancestors]
-    rightna = [x for x in right if x.parent not in ancestors]
-    leftcross = [x for x in leftna if x.parent.ord > iid]
-    rightcross = [x for x in rightna if x.parent.ord < iid]
-    # Once again, exclude nonprojectivities that are caused by ancestors of id.
-    if pid < iid:
-        rightcross = [x for x in rightcross if x.parent.ord > pid]
+        cross = [x for x in node.get_crossing() if x.ord > pid and x.parent.ord > pid]
     else:
-        leftcross = [x for x in leftcross if x.parent.ord < pid]
+        cross = [x for x in node.get_crossing() if x.ord < pid and x.parent.ord < pid]
     # Do not return just a boolean value. Return the nonprojective nodes so we can report them.
-    return sorted(leftcross + rightcross)
+    return cross
 
 
 def get_gap(node):
@@ -482,25 +510,16 @@ def get_gap(node):
 
     Parameters
     ----------
-    node : udapi.core.node.Node object
+    node : udtools.sentence.Node object
         The tree node to be tested.
 
     Returns
     -------
-    gap : list of udapi.core.node.Node objects
+    gap : list of udtools.sentence.Node objects
         The nodes in the gap of the current node's relation to its parent,
         sorted by their ords (IDs).
     """
-    iid = node.ord
-    pid = node.parent.ord
-    if iid < pid:
-        rangebetween = range(iid + 1, pid)
-    else:
-        rangebetween = range(pid + 1, iid)
-    gap = []
-    if rangebetween:
-        gap = [n for n in node.root.descendants if n.ord in rangebetween and not n in node.parent.descendants]
-    return sorted(gap)
+    return node.get_gap()
 
 
 def create_references(nodes, state, comment=''):
@@ -510,7 +529,7 @@ def create_references(nodes, state, comment=''):
 
     Parameters
     ----------
-    nodes : list(udapi.core.node.Node)
+    nodes : list(udtools.sentence.Node)
         The nodes to which we wish to refer.
     state : udtools.state.State
         The state of the validation run.
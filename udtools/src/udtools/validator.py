@@ -5,10 +5,10 @@
 import sys
 import io
 import argparse
+import copy
+import collections
+import multiprocessing
 ###!!!import logging
-# Once we know that the low-level CoNLL-U format is OK, we will be able to use
-# the Udapi library to access the data and perform the tests at higher levels.
-import udapi.block.read.conllu
 # Allow using this module from the root folder of tools even if it is not
 # installed as a package: use the relative path udtools/src/udtools for
 # submodules. If the path is not available, try the standard qualification,
@@ -16,16 +16,30 @@ import udapi.block.read.conllu
 # from udtools import Validator.
 try:
     import udtools.src.udtools.utils as utils
-    from udtools.src.udtools.incident import Error, TestClass
-    from udtools.src.udtools.state import State
-    import udtools.src.udtools.data as data
+    from udtools.src.udtools.incident import Incident, Error, TestClass
+    from udtools.src.udtools.state import State, ChunkState
+    from udtools.src.udtools.sentence import Sentence, SentenceContext
+    from udtools.src.udtools.dispatch import NodeDispatcher
+    from udtools.src.udtools.plan import get_skipped_checks, skip_check
+    import udtools.src.udtools.data as udtools_data
+    from udtools.src.udtools.profiler import CheckProfiler
+    from udtools.src.udtools.cache import SentenceCache
+    from udtools.src.udtools.index import SentenceIndex
+    from udtools.src.udtools.compression import open_text
     from udtools.src.udtools.level6 import Level6
     ###!!!from udtools.src.udtools.logging_utils import setup_logging
 except ModuleNotFoundError:
     import udtools.utils as utils
-    from udtools.incident import Error, TestClass
-    from udtools.state import State
-    import udtools.data as data
+    from udtools.incident import Incident, Error, TestClass
+    from udtools.state import State, ChunkState
+    from udtools.sentence import Sentence, SentenceContext
+    from udtools.dispatch import NodeDispatcher
+    from udtools.plan import get_skipped_checks, skip_check
+    import udtools.data as udtools_data
+    from udtools.profiler import CheckProfiler
+    from udtools.cache import SentenceCache
+    from udtools.index import SentenceIndex
+    from udtools.compression import open_text
     from udtools.level6 import Level6
     ###!!!from udtools.logging_utils import setup_logging
 
@@ -34,8 +48,24 @@ except ModuleNotFoundError:
 
 
 
+# When a file is validated in parallel, each worker process has its own copy of
+# the validator, set up by _init_worker().
+_worker_validator = None
+
+def _init_worker(validator):
+    global _worker_validator
+    _worker_validator = validator
+
+def _validate_chunk(chunk):
+    return _worker_validator.validate_chunk(*chunk)
+
+
+
 class Validator(Level6):
-    def __init__(self, lang=None, level=None, check_coref=None, args=None, datapath=None, output=sys.stderr, max_store=0):
+    # Number of sentences that are sent to a worker process at once.
+    chunk_size = 500
+
+    def __init__(self, lang=None, level=None, check_coref=None, args=None, datapath=None, output=sys.stderr, max_store=0, jobs=None, data=None, profile_checks=None, incremental=None):
         """
         Initialization of the Validator class.
 
@@ -77,8 +107,31 @@ class Validator(Level6):
             intended use of the Validator object is to immediately report
             incidents without returning to them later. The limit is applied
             separately to each test class.
+        jobs : int, optional
+            Number of processes that validate a file in parallel. If not
+            provided separately, it will be searched for in args. The default
+            value is 1 (no parallelization). The results are the same as with
+            one process. With check_coref, files are always validated in one
+            process.
+        data : udtools.data.Data, optional
+            Validation data loaded previously, e.g. by another validator. The
+            data can be shared by validators running in parallel threads. If
+            not provided, the data will be loaded from datapath.
+        profile_checks : bool, optional
+            Should the time spent in each check be measured (see
+            udtools.profiler.CheckProfiler)? If not provided separately, it
+            will be searched for in args. The default value is False. The
+            profiled validator works in one process (jobs=1).
+        incremental : bool or str, optional
+            Should the results of individual sentences be cached on disk and
+            reused when the same sentence is validated again (see
+            udtools.cache.SentenceCache)? A string is the folder for the
+            cache. If not provided separately, it will be searched for in
+            args. The default value is False. The incremental validation
+            works in one process (jobs=1); it is not used with check_coref
+            or profile_checks.
         """
-        self.data = data.Data(datapath=datapath)
+        self.data = data if data else udtools_data.Data(datapath=datapath)
         if not args:
             args = argparse.Namespace()
         # Since we allow args that were not created by our ArgumentParser,
@@ -100,9 +153,31 @@ class Validator(Level6):
                 check_coref = args_dict['check_coref']
             else:
                 check_coref = False
+        if not jobs:
+            if 'jobs' in args_dict and args_dict['jobs'] != None:
+                jobs = args_dict['jobs']
+            else:
+                jobs = 1
+        if profile_checks == None:
+            if 'profile_checks' in args_dict and args_dict['profile_checks'] != None:
+                profile_checks = args_dict['profile_checks']
+            else:
+                profile_checks = False
+        if incremental == None:
+            if 'incremental' in args_dict and args_dict['incremental'] != None:
+                incremental = args_dict['incremental']
+            else:
+                incremental = False
         self.lang = lang
         self.level = level
         self.check_coref = check_coref
+        self.jobs = jobs
+        # The profiler, if the checks should be measured.
+        self.profiler = None
+        if profile_checks:
+            self.profiler = CheckProfiler()
+            self.profiler.instrument(self)
+            self.jobs = 1
         # Instead of saving the args namespace, we should just save the
         # configuration of incident storing and reporting.
         self.incfg = {}
@@ -116,11 +191,38 @@ class Validator(Level6):
             self.incfg['include_only'] = args_dict['include_only']
         if 'max_err' in args_dict:
             self.incfg['max_err'] = args_dict['max_err']
+        if 'format' in args_dict and args_dict['format']:
+            self.incfg['format'] = args_dict['format']
         if 'input' in args_dict and len(args_dict['input']) > 1:
             self.incfg['report_filename'] = True
         self.incfg['output'] = output
         self.incfg['max_store'] = max_store
-        self.conllu_reader = udapi.block.read.conllu.Conllu()
+        # The cache of the results of individual sentences, if the validation
+        # should be incremental.
+        self.cache = None
+        if incremental and not check_coref and not profile_checks:
+            self.cache = SentenceCache(self, cachedir=incremental if type(incremental) == str else None)
+            self.jobs = 1
+        # Checks that cannot report any incident that would be reported
+        # (because of --include-only or --exclude) are replaced by a function
+        # that does nothing (see udtools.plan).
+        self.skipped_checks = get_skipped_checks(type(self), self.incfg)
+        for name in self.skipped_checks:
+            setattr(self, name, skip_check)
+        # The dispatchers of the tests of nodes (see get_node_dispatchers()).
+        self.node_dispatchers = None
+        self.tree_needed = True
+
+
+    def __getstate__(self):
+        # The validator is sent to worker processes when validating in
+        # parallel. The output stream cannot be pickled.
+        state = self.__dict__.copy()
+        state['incfg'] = dict(self.incfg, output=None)
+        # The dispatchers hold bound methods, which may be instrumented by
+        # the profiler; they are created again in the worker.
+        state['node_dispatchers'] = None
+        return state
 
 
 
@@ -129,7 +231,7 @@ class Validator(Level6):
 #==============================================================================
 
 
-    def validate_files(self, filenames, state=None):
+    def validate_files(self, filenames, state=None, sent_ids=None, linenos=None):
         """
         The main entry point, takes a list of filenames that constitute
         the treebank to be validated. Note that there are tests that consider
@@ -148,6 +250,13 @@ class Validator(Level6):
             State from previous validation calls if the current call should
             take them into account. If not provided, a new state will be
             initialized.
+        sent_ids : list(str), optional
+            If provided (or if linenos are provided), only the sentences with
+            these ids are validated (see validate_file_sentences()), and the
+            tests of the whole treebank are skipped.
+        linenos : list(int), optional
+            If provided (or if sent_ids are provided), only the sentences that
+            contain these lines are validated.
 
         Returns
         -------
@@ -157,6 +266,10 @@ class Validator(Level6):
         """
         if state == None:
             state = State()
+        if sent_ids or linenos:
+            for filename in filenames:
+                self.validate_file_sentences(filename, sent_ids, linenos, state)
+            return state
         for filename in filenames:
             self.validate_file(filename, state)
         self.validate_end(state)
@@ -166,7 +279,9 @@ class Validator(Level6):
     def validate_file(self, filename, state=None):
         """
         An envelope around validate_file_handle(). Opens a file or uses STDIN,
-        then calls validate_file_handle() on it.
+        then calls validate_file_handle() on it. Files compressed by gzip, xz
+        or bzip2 are recognized and decompressed on the fly (see
+        udtools.compression.open_text()).
 
         Parameters
         ----------
@@ -192,12 +307,50 @@ class Validator(Level6):
             # locale-dependent encoding will be used elsewhere.
             self.validate_file_handle(sys.stdin, state)
         else:
-            with io.open(filename, 'r', encoding='utf-8') as inp:
+            with open_text(filename) as inp:
                 ###!!!logger.info("Opening file %s", filename)
                 self.validate_file_handle(inp, state)
         return state
 
 
+    def validate_file_sentences(self, filename, sent_ids=None, linenos=None, state=None):
+        """
+        Validates selected sentences of a file: those with the given sentence
+        ids and those that contain the given lines. The sentences are found
+        through the sentence index of the file (see
+        udtools.index.SentenceIndex), so the rest of the file is not read.
+        The line numbers in the incidents are those of the file. Ids and
+        lines that are not in the file are ignored.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file (not STDIN).
+        sent_ids : list(str), optional
+            Ids of the sentences to be validated.
+        linenos : list(int), optional
+            Numbers of lines (1-based) in the sentences to be validated.
+        state : udtools.state.State, optional
+            The state of the validation run. If not provided, a new state will
+            be initialized.
+
+        Returns
+        -------
+        state : udtools.state.State
+            The resulting state of the validation.
+        """
+        if state == None:
+            state = State()
+        state.current_file_name = filename
+        with SentenceIndex.for_file(filename) as index:
+            numbers = [index.find_sent_id(x) for x in sent_ids or []] + [index.find_line(x) for x in linenos or []]
+            for i in sorted(set(x for x in numbers if x != None)):
+                lines = index.sentence_lines(i)
+                state.current_line = index.first_line(i) + len(lines)
+                self.validate_sentence(lines, state)
+        return state
+
+
     def validate_file_handle(self, inp, state=None):
         """
         The main entry point for all validation tests applied to one input file.
@@ -220,12 +373,181 @@ class Validator(Level6):
         """
         if state == None:
             state = State()
-        for lines in utils.next_sentence(state, inp):
-            self.validate_sentence(lines, state)
+        if self.jobs > 1 and not self.check_coref:
+            self.validate_file_handle_parallel(inp, state)
+        elif self.cache:
+            self.validate_file_handle_cached(inp, state)
+        else:
+            for lines in utils.next_sentence(state, inp):
+                self.validate_sentence(lines, state)
         self.check_newlines(state, inp) # level 1
         return state
 
 
+    def validate_file_handle_parallel(self, inp, state):
+        """
+        Splits the input stream at sentence boundaries to chunks and validates
+        the chunks in a pool of self.jobs worker processes. Each chunk is
+        validated from scratch (with a new ChunkState), then the incidents are
+        confirmed again in the main state in the order of the input, so that
+        the output is the same as with validate_file_handle() in one process.
+        If the result of a chunk could depend on the preceding input (e.g.,
+        a sentence id from the chunk occurred earlier), the chunk is validated
+        again in the main process.
+
+        Parameters
+        ----------
+        inp : open file handle
+            The CoNLL-U-formatted input stream.
+        state : udtools.state.State
+            The state of the validation run.
+        """
+        # Workers do not print anything and keep all incidents for us.
+        worker = copy.copy(self)
+        worker.incfg = dict(self.incfg, output=None, max_err=0, max_store=0)
+        worker.jobs = 1
+        # The chunks are read here and at most chunks_in_flight of them are
+        # submitted to the workers before we take the result of the oldest
+        # one, so that the memory does not grow with the size of the input.
+        # We keep the chunks until we get their results, in case they must be
+        # validated again.
+        chunks_in_flight = 2 * self.jobs
+        pending = collections.deque()
+        def read_chunks():
+            reader_state = State()
+            first_line = 0
+            sentences = []
+            for lines in utils.next_sentence(reader_state, inp):
+                sentences.append(lines)
+                if len(sentences) == self.chunk_size:
+                    yield first_line, sentences
+                    first_line = reader_state.current_line
+                    sentences = []
+            if sentences:
+                yield first_line, sentences
+        def take_result():
+            first_line, sentences, result = pending.popleft()
+            incidents, chunk_state = result.get()
+            if chunk_state.is_independent_of(state):
+                self.merge_chunk(state, incidents, chunk_state)
+            else:
+                state.current_line = first_line
+                for lines in sentences:
+                    state.current_line += len(lines)
+                    self.validate_sentence(lines, state)
+        with multiprocessing.Pool(self.jobs, _init_worker, (worker,)) as pool:
+            for first_line, sentences in read_chunks():
+                result = pool.apply_async(_validate_chunk, ((state.current_file_name, first_line, sentences),))
+                pending.append((first_line, sentences, result))
+                if len(pending) >= chunks_in_flight:
+                    take_result()
+            while pending:
+                take_result()
+
+
+    def validate_file_handle_cached(self, inp, state):
+        """
+        Validates the input stream incrementally: the result of each sentence
+        is taken from self.cache if the same sentence has been validated
+        before. Otherwise the sentence is validated from scratch (as a chunk
+        of one sentence) and the result is stored in the cache. The output is
+        the same as with validate_file_handle() without the cache: if the
+        result of a sentence could depend on the preceding input (e.g., its
+        sentence id occurred earlier), the sentence is validated again.
+
+        Parameters
+        ----------
+        inp : open file handle
+            The CoNLL-U-formatted input stream.
+        state : udtools.state.State
+            The state of the validation run.
+        """
+        # The sentences are validated from scratch the same way as in the
+        # worker processes of validate_file_handle_parallel().
+        worker = copy.copy(self)
+        worker.incfg = dict(self.incfg, output=None, max_err=0, max_store=0)
+        worker.cache = None
+        filename = state.current_file_name
+        cached = self.cache.load(filename)
+        entries = {}
+        for lines in utils.next_sentence(state, inp):
+            first_line = state.current_line - len(lines)
+            key = self.cache.sentence_key(lines)
+            # The same sentence may also occur repeatedly in the file.
+            entry = cached.get(key) or entries.get(key)
+            result = self.cache.restore(entry, first_line) if entry else None
+            if result:
+                entries[key] = entry
+                incidents, chunk_state = result
+            else:
+                incidents, chunk_state = worker.validate_chunk(filename, first_line, [lines])
+                entries[key] = self.cache.record(first_line, lines, incidents, chunk_state)
+            if chunk_state.is_independent_of(state):
+                self.merge_chunk(state, incidents, chunk_state)
+                state.current_lines = lines
+            else:
+                self.validate_sentence(lines, state)
+        self.cache.save(filename, entries)
+
+
+    def merge_chunk(self, state, incidents, chunk_state):
+        """
+        Confirms the incidents of a chunk that has been validated separately
+        in the main state, and merges the chunk state in the main state (see
+        udtools.state.State.merge()). The chunk must be independent of the
+        main state (see udtools.state.ChunkState.is_independent_of()).
+
+        Parameters
+        ----------
+        state : udtools.state.State
+            The state of the validation run.
+        incidents : list(udtools.incident.Incident)
+            The incidents confirmed in the chunk, in the order of confirmation.
+        chunk_state : udtools.state.ChunkState
+            The resulting state of the validation of the chunk.
+        """
+        for incident in incidents:
+            incident.state = state
+            incident.config = self.incfg
+            incident.confirm()
+        for testid in chunk_state.delayed_feature_errors:
+            for occurrence in chunk_state.delayed_feature_errors[testid]['occurrences']:
+                occurrence['incident'].state = state
+                occurrence['incident'].config = self.incfg
+        state.merge(chunk_state)
+
+
+    def validate_chunk(self, filename, first_line, sentences):
+        """
+        Validates a chunk of sentences from scratch. This is called in worker
+        processes by validate_file_handle_parallel().
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file from which the chunk comes.
+        first_line : int
+            Number of the last line in the file before the chunk.
+        sentences : list(list(str))
+            The sentences in the chunk, each as a list of lines including the
+            final empty line, without newline characters.
+
+        Returns
+        -------
+        incidents : list(udtools.incident.Incident)
+            Incidents confirmed in the chunk, in the order of confirmation.
+        state : udtools.state.ChunkState
+            The resulting state of the validation of the chunk.
+        """
+        state = ChunkState()
+        state.current_file_name = filename
+        state.current_line = first_line
+        for lines in sentences:
+            state.current_line += len(lines)
+            self.validate_sentence(lines, state)
+        return state.error_tracker, state
+
+
     def validate_sentence(self, all_lines, state=None):
         """
         Entry point for all validation tests applied to one sentence. It can
@@ -270,8 +592,8 @@ class Validator(Level6):
             # Check that the basic tree is single-rooted, connected, cycle-free.
             if not self.check_tree(state): # level 2
                 return state
-            # Tests of individual nodes that operate on pre-Udapi data structures.
-            # Some of them (bad feature format) may lead to skipping Udapi completely.
+            # Tests of individual nodes that operate on the token table before the tree is built.
+            # Some of them (bad feature format) may lead to not building the tree at all.
             colssafe = True
             for i in range(len(state.current_token_node_table)):
                 lineno = state.sentence_line + i
@@ -286,8 +608,8 @@ class Validator(Level6):
                     self.check_xpos_format(state, cols, lineno) # level 2
                     colssafe = self.check_feats_format(state, cols, lineno) and colssafe # level 2 (level 4 tests will be called later)
                     self.check_deprel_format(state, cols, lineno) # level 2
-                    self.check_deps_format(state, cols, lineno) # level 2; must operate on pre-Udapi DEPS (to see order of relations)
-                self.check_misc(state, cols, lineno) # level 2; must operate on pre-Udapi MISC
+                    self.check_deps_format(state, cols, lineno) # level 2; must operate on raw DEPS (to see order of relations)
+                self.check_misc(state, cols, lineno) # level 2; must operate on raw MISC
             if not colssafe:
                 return state
             # Get line numbers for all nodes including empty ones (here linenos
@@ -300,57 +622,117 @@ class Validator(Level6):
             self.check_sent_id(state) # level 2
             self.check_parallel_id(state) # level 2
             self.check_text_meta(state) # level 2
+            # Most tests of nodes apply only to some relations or UPOS tags;
+            # the dispatchers select those that apply to the node. If none of
+            # the tests of the tree will run (see udtools.plan), the tree is
+            # not built at all.
+            node_dispatcher, basic_dispatcher = self.get_node_dispatchers()
             # If we successfully passed all the critical tests above, it is
-            # probably safe to give the lines to Udapi and ask it to build the
-            # tree data structure for us. Udapi does not want to get the
-            # terminating empty line.
-            tree = self.build_tree_udapi(all_lines)
-            # Tests of individual nodes with Udapi.
-            nodes = tree.descendants_and_empty
-            for node in nodes:
+            # probably safe to build the tree data structure from the token
+            # table.
+            if self.tree_needed:
+                tree = self.build_sentence(state)
+                # The level 3 tests share the facts about the sentence that they
+                # would otherwise derive again for every node.
                 if self.level >= 3:
-                    self.check_zero_root(state, node) # level 3
-                    self.check_enhanced_orphan(state, node) # level 3
-                    if self.level >= 4:
-                        # To disallow words with spaces everywhere, use --lang ud.
-                        self.check_words_with_spaces(state, node) # level 4
-                        self.check_feature_values(state, node) # level 4
-                        self.check_deprels(state, node) # level 4
-                        if self.level >= 5:
-                            self.check_auxiliary_verbs(state, node) # level 5
-                            self.check_copula_lemmas(state, node) # level 5
-            # Tests on whole trees and enhanced graphs.
-            self.check_egraph_connected(state, nodes) # level 2
-            if self.level >= 3:
-                # Level 3 checks universally valid consequences of annotation
-                # guidelines. Look at regular nodes and basic tree, not at
-                # enhanced graph.
-                basic_nodes = tree.descendants
-                for node in basic_nodes:
-                    self.check_expected_features(state, node)
-                    self.check_upos_vs_deprel(state, node)
-                    self.check_flat_foreign(state, node)
-                    self.check_left_to_right_relations(state, node)
-                    self.check_single_subject(state, node)
-                    self.check_single_object(state, node)
-                    self.check_nmod_obl(state, node)
-                    self.check_orphan(state, node)
-                    self.check_functional_leaves(state, node)
-                    self.check_fixed_span(state, node)
-                    self.check_goeswith_span(state, node)
-                    self.check_goeswith_morphology_and_edeps(state, node)
-                    self.check_projective_punctuation(state, node)
+                    context = SentenceContext(tree, state.current_node_linenos)
+                # Tests of individual nodes in the tree.
+                nodes = tree.descendants_and_empty
+                for node in nodes:
+                    if self.level >= 3:
+                        self.check_zero_root(state, node, context) # level 3
+                        self.check_enhanced_orphan(state, node, context) # level 3
+                        # Levels 4 and 5.
+                        for check in node_dispatcher.select(context.udeprel(node), node.upos):
+                            check(state, node)
+                # Tests on whole trees and enhanced graphs.
+                self.check_egraph_connected(state, nodes) # level 2
+                if self.level >= 3:
+                    # Level 3 checks universally valid consequences of annotation
+                    # guidelines. Look at regular nodes and basic tree, not at
+                    # enhanced graph.
+                    basic_nodes = tree.descendants
+                    for node in basic_nodes:
+                        for check in basic_dispatcher.select(context.udeprel(node), node.upos):
+                            check(state, node, context)
             # Optional checks for CorefUD treebanks. They operate on MISC and
-            # currently do not use the Udapi data structures.
+            # currently do not use the tree data structures.
             if self.check_coref:
                 self.check_misc_entity(state)
         return state
 
 
+    def get_node_dispatchers(self):
+        """
+        Returns the dispatchers (udtools.dispatch.NodeDispatcher) of the tests
+        of individual nodes that validate_sentence() calls for the current
+        level: the level 4 and 5 tests of all nodes (including empty nodes),
+        and the level 3 tests of the nodes of the basic tree. They are created
+        on first use, i.e., after the profiler (if any) has instrumented the
+        checks.
+
+        Returns
+        -------
+        node_dispatcher : udtools.dispatch.NodeDispatcher
+        basic_dispatcher : udtools.dispatch.NodeDispatcher
+        """
+        if self.node_dispatchers == None:
+            node_checks = []
+            basic_checks = []
+            if self.level >= 3:
+                basic_checks = ['check_expected_features', 'check_upos_vs_deprel', 'check_flat_foreign',
+                                'check_left_to_right_relations', 'check_single_subject', 'check_single_object',
+                                'check_nmod_obl', 'check_orphan', 'check_functional_leaves', 'check_fixed_span',
+                                'check_goeswith_span', 'check_goeswith_morphology_and_edeps',
+                                'check_projective_punctuation']
+            if self.level >= 4:
+                # To disallow words with spaces everywhere, use --lang ud.
+                node_checks += ['check_words_with_spaces', 'check_feature_values', 'check_deprels']
+            if self.level >= 5:
+                node_checks += ['check_auxiliary_verbs', 'check_copula_lemmas']
+            node_checks = [x for x in node_checks if not x in self.skipped_checks]
+            basic_checks = [x for x in basic_checks if not x in self.skipped_checks]
+            self.node_dispatchers = (NodeDispatcher(self, node_checks), NodeDispatcher(self, basic_checks))
+            tree_checks = ['check_egraph_connected']
+            if self.level >= 3:
+                tree_checks += ['check_zero_root', 'check_enhanced_orphan']
+            self.tree_needed = bool(node_checks or basic_checks) or any(not x in self.skipped_checks for x in tree_checks)
+        return self.node_dispatchers
+
+
+    def build_sentence(self, state):
+        """
+        Builds the tree data structure of the current sentence from the token
+        table that has been read by the level 1 tests. The validation tests
+        at levels 2 to 5 use this structure; it provides the subset of the
+        Udapi node interface that the tests need.
+
+        Parameters
+        ----------
+        state : udtools.state.State
+            The state of the validation run.
+
+        Reads from state
+        ----------------
+        current_token_node_table : list(list(str))
+            The list of multiword token lines / regular node lines / empty
+            node lines, each split to fields (columns).
+
+        Returns
+        -------
+        root : udtools.sentence.Node object
+            The artificial root node (all other nodes and all tree attributes
+            can be accessed from it).
+        """
+        return Sentence(state.current_token_node_table).root
+
+
     def build_tree_udapi(self, lines):
         """
         Calls Udapi to build its data structures from the CoNLL-U lines
-        representing one sentence.
+        representing one sentence. The validator itself does not need Udapi
+        any more (see build_sentence()) but this method is kept for callers
+        who want the full Udapi tree; it requires Udapi to be installed.
 
         Parameters
         ----------
@@ -367,10 +749,11 @@ class Validator(Level6):
         """
         # If the final empty line is present, get rid of it. Udapi would die
         # when trying to access line[0].
+        import udapi.block.read.conllu
         mylines = lines
         if len(mylines) > 0 and (not mylines[-1] or utils.is_whitespace(mylines[-1])):
             mylines = lines[0:-1]
-        root = self.conllu_reader.read_tree_from_lines(mylines)
+        root = udapi.block.read.conllu.Conllu().read_tree_from_lines(mylines)
         # We should not return an empty tree (root should not be None).
         # But we should not be here if the lines are so bad that no tree is built.
         assert(root)
@@ -405,6 +788,7 @@ class Validator(Level6):
                 state=state, config=self.incfg,
                 level=3,
                 testclass=TestClass.ENHANCED,
+                lineno=state.last_enhanced_graph_line,
                 testid='edeps-identical-to-basic-trees',
                 message="Enhanced graphs are copies of basic trees in the entire dataset. This can happen for some simple sentences where there is nothing to enhance, but not for all sentences. If none of the enhancements from the guidelines (https://universaldependencies.org/u/overview/enhanced-syntax.html) are annotated, the DEPS should be left unspecified"
             ).confirm()
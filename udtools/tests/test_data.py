@@ -0,0 +1,74 @@
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    import udtools.src.udtools.data as data
+except ModuleNotFoundError:
+    import udtools.data as data
+import os
+import pickle
+import pytest
+
+def test_snapshot(tmp_path):
+    fresh = data.Data(snapshotdir=tmp_path)
+    snapshots = os.listdir(tmp_path)
+    assert len(snapshots) == 1
+    cached = data.Data(snapshotdir=tmp_path)
+    assert os.listdir(tmp_path) == snapshots
+    for lcode in ['cs', 'en', 'ud', 'xx']:
+        assert cached.get_deprel_for_language(lcode) == fresh.get_deprel_for_language(lcode)
+        assert cached.get_edeprel_for_language(lcode) == fresh.get_edeprel_for_language(lcode)
+        assert cached.get_auxcop_for_language(lcode) == fresh.get_auxcop_for_language(lcode)
+        assert cached.explain_feats(lcode) == fresh.explain_feats(lcode)
+        assert cached.explain_deprel(lcode) == fresh.explain_deprel(lcode)
+        assert cached.explain_tospace(lcode) == fresh.explain_tospace(lcode)
+        for f, record in fresh.get_feats_for_language(lcode).items():
+            for field in data.FEATS_FIELDS:
+                assert cached.get_feats_for_language(lcode)[f][field] == record[field]
+    # A damaged snapshot is ignored (and replaced).
+    with open(os.path.join(tmp_path, snapshots[0], 'index.pickle'), 'wb') as f:
+        f.write(b'garbage')
+    assert data.Data(snapshotdir=tmp_path).upos == fresh.upos
+    assert data.Data(snapshotdir=tmp_path).snapshot
+    assert data.Data(snapshotdir=tmp_path).get_deprel_for_language('cs') == fresh.get_deprel_for_language('cs')
+
+def test_lazy_loading(tmp_path):
+    data.Data(snapshotdir=tmp_path)
+    # From the snapshot, only the languages that are asked for are loaded.
+    cached = data.Data(snapshotdir=tmp_path)
+    assert cached.feats == {} and cached.deprel == {}
+    cached.get_feats_for_language('cs')
+    assert set(cached.feats) == {'cs'} and set(cached.deprel) == {'cs'}
+    assert cached.get_deprel_for_language('ud') == cached.udeprel
+    assert set(cached.deprel) == {'cs'}
+    # Without the snapshot, only the tables that are asked for are loaded.
+    uncached = data.Data(snapshotdir=False)
+    assert uncached.get_deprel_for_language('cs') == cached.get_deprel_for_language('cs')
+    assert uncached.loaded_tables == {'deprel'}
+    assert uncached.feats == {}
+
+def test_profile():
+    d = data.Data(snapshotdir=False)
+    profile = d.get_profile('cs')
+    assert d.get_profile('cs') is profile
+    # Only the tables of the parts that are used are loaded.
+    assert profile.tospace == d.get_tospace_for_language('cs')
+    assert d.loaded_tables == {'tospace'}
+    assert profile.deprels == d.get_deprel_for_language('cs')
+    assert profile.aux == set(d.get_aux_for_language('cs'))
+    assert profile.cop == set(d.get_cop_for_language('cs'))
+    for f, record in d.get_feats_for_language('cs').items():
+        assert (f in profile.permitted_features) == (record['permitted'] != 0)
+        for upos, values in record['byupos'].items():
+            for v in values:
+                assert ((f, upos, v) in profile.feature_upos_values) == (values[v] != 0)
+    assert d.get_profile('ud').features == frozenset()
+    # The profile cannot be modified and it is compiled again after pickling.
+    with pytest.raises(TypeError):
+        profile.feature_values['Case'] = frozenset()
+    with pytest.raises(AttributeError):
+        profile.lcode = 'en'
+    copy = pickle.loads(pickle.dumps(profile))
+    assert copy.lcode == 'cs' and copy.feature_values == profile.feature_values
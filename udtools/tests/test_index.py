@@ -0,0 +1,66 @@
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.index import SentenceIndex
+    from udtools.src.udtools.validator import Validator
+    from udtools.src.udtools.state import State
+    import udtools.src.udtools.udeval as udeval
+except ModuleNotFoundError:
+    from udtools.index import SentenceIndex
+    from udtools.validator import Validator
+    from udtools.state import State
+    import udtools.udeval as udeval
+
+TEXT = ('# sent_id = a\n1\tPes\tpes\tNOUN\t_\t_\t0\troot\t_\t_\n\n'
+        '# sent_id = b\r\n# text = Kůň\r\n1\tKůň\tkůň\tNOUN\t_\t_\t0\troot\t_\t_\r\n\r\n'
+        ' \n'
+        '# sent_id = c\n1\tx\tx\tX\t_\t_\t0\troot\t_\t_')
+
+def test_index(tmp_path):
+    path = tmp_path / 'sample.conllu'
+    path.write_bytes(TEXT.encode('utf-8'))
+    index = SentenceIndex.for_file(str(path))
+    assert len(index) == 4
+    assert [index.find_sent_id(x) for x in ('a', 'b', 'c', 'd')] == [0, 1, 3, None]
+    assert [index.find_line(x) for x in range(10)] == [None, 0, 0, 0, 1, 1, 1, 1, 2, 3]
+    assert [index.first_line(i) for i in range(4)] == [0, 3, 7, 8]
+    assert index.sentence_lines(1) == ['# sent_id = b', '# text = Kůň', '1\tKůň\tkůň\tNOUN\t_\t_\t0\troot\t_\t_', '']
+    assert index.sentence_lines(2) == [' ']
+    assert index.sentence_lines(3)[-1].endswith('_')
+    assert index.shards(2) == [(0, 2), (2, 4)]
+    assert index.shards(10)[-1][1] == 4
+    index.close()
+    # The sidecar index is used until the file changes.
+    assert (tmp_path / 'sample.conllu.udindex').exists()
+    loaded = SentenceIndex(str(path))
+    assert loaded.load() and list(loaded.offsets) == list(index.offsets)
+    path.write_bytes(TEXT.replace('\r\n', '\n').encode('utf-8'))
+    assert not SentenceIndex(str(path)).load()
+    assert SentenceIndex.for_file(str(path)).sentence_lines(1)[0] == '# sent_id = b'
+
+def test_validate_selected(tmp_path):
+    import io
+    import os
+    gold = os.path.join(os.path.dirname(__file__), 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    # A sentence validated through the index must have the same incidents
+    # (with the same line numbers) as in the whole file.
+    path = tmp_path / 'sample.conllu'
+    with open(gold, encoding='utf-8') as f:
+        sentences = f.read().split('\n\n')[:20]
+    sentences[12] = sentences[12].replace('\troot\t', '\tnsubj\t', 1)
+    path.write_text('\n\n'.join(sentences) + '\n\n', encoding='utf-8')
+    validator = Validator(lang='cs', output=None)
+    whole = validator.validate_files([str(path)])
+    index = SentenceIndex.for_file(str(path))
+    lineno = index.first_line(12) + 3
+    selected = validator.validate_files([str(path)], linenos=[lineno])
+    expected = [x.lineno for x in whole.error_tracker if index.find_line(x.lineno) == 12]
+    assert expected and [x.lineno for x in selected.error_tracker] == expected
+    sent_id = [x for x in sentences[12].split('\n') if x.startswith('# sent_id')][0].split(' = ')[1]
+    assert str(validator.validate_files([str(path)], sent_ids=[sent_id])) == str(selected)
+    # The evaluator can read selected sentences, too.
+    ud = udeval.load_conllu_file(str(path), sentences=[3, 4])
+    assert len(ud.words) == len(udeval.load_conllu(io.StringIO('\n\n'.join(sentences[3:5]) + '\n\n'), 'x', {}).words)
@@ -0,0 +1,94 @@
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.validator import Validator
+    from udtools.src.udtools.plan import get_testids, get_skipped_checks
+except ModuleNotFoundError:
+    from udtools.validator import Validator
+    from udtools.plan import get_testids, get_skipped_checks
+import argparse
+import ast
+import glob
+import inspect
+import io
+import os
+import re
+
+TEST_CASES = os.path.join(os.path.dirname(__file__), 'test-cases')
+
+def test_docstrings_list_all_testids():
+    # The plan relies on the Incidents sections of the docstrings, so they
+    # must list every test id that the check can report.
+    for name in dir(Validator):
+        if not name.startswith('check_'):
+            continue
+        function = ast.parse(inspect.cleandoc('\n' + inspect.getsource(getattr(Validator, name)))).body[0]
+        documented = get_testids(Validator, name) or frozenset()
+        for node in ast.walk(function):
+            if isinstance(node, ast.keyword) and node.arg == 'testid':
+                if isinstance(node.value, ast.Constant):
+                    assert node.value.value in documented, (name, node.value.value)
+                else:
+                    # f-string: at least one documented test id must match.
+                    pattern = ''.join(re.escape(x.value) if isinstance(x, ast.Constant) else '.+' for x in node.value.values)
+                    assert any(re.fullmatch(pattern, x) for x in documented), (name, pattern)
+
+def test_skipped_checks():
+    assert get_testids(Validator, 'check_sentence_columns') >= {'number-of-columns', 'invalid-whitespace'}
+    assert get_skipped_checks(Validator, {}) == frozenset()
+    skipped = get_skipped_checks(Validator, {'include_only': ['missing-sent-id', 'non-unique-sent-id']})
+    assert 'check_sent_id' not in skipped and 'check_sentence_lines' not in skipped
+    assert {'check_text_meta', 'check_upos_vs_deprel', 'check_feature_values', 'check_misc_entity'} <= skipped
+    # The facts for edeps-identical-to-basic-trees are recorded by these checks.
+    skipped = get_skipped_checks(Validator, {'include_only': ['edeps-identical-to-basic-trees']})
+    assert not {'check_deps_format', 'check_deps_all_or_none'} & skipped
+    skipped = get_skipped_checks(Validator, {'exclude': ['too-many-objects']})
+    assert skipped == {'check_single_object'}
+
+def test_plan_gives_same_incidents():
+    # Skipping the checks does not change the incidents that are reported.
+    paths = sorted(glob.glob(os.path.join(TEST_CASES, 'invalid-level3', '*.conllu')) + glob.glob(os.path.join(TEST_CASES, 'invalid-level4-5', 'cs_*.conllu')))
+    def run(path, **kwargs):
+        validator = Validator(lang='cs', level=5, check_coref=True, output=None, max_store=10000, args=argparse.Namespace(**kwargs))
+        state = validator.validate_files([path])
+        return [(x.lineno, x.testid, x.nodeid, x.message) for x in state.error_tracker]
+    for path in paths:
+        full = run(path)
+        testids = sorted(set(x[1] for x in full))
+        assert testids
+        for testid in testids + ['missing-sent-id']:
+            assert run(path, include_only=[testid]) == [x for x in full if x[1] == testid]
+        assert run(path, exclude=testids[:2]) == [x for x in full if not x[1] in testids[:2]]
+    # Without any test of the tree, the tree is not built.
+    validator = Validator(lang='cs', level=5, output=None, args=argparse.Namespace(include_only=['missing-sent-id']))
+    validator.validate_files([paths[0]])
+    assert not validator.tree_needed
+
+def test_plan_gives_same_output(tmp_path):
+    # The printed incidents are the same line by line, including those that
+    # are reported at the end of the treebank (here the enhanced graphs are
+    # mere copies of the basic trees).
+    with open(os.path.join(TEST_CASES, 'eval', 'cs_pud-gold.conllu'), encoding='utf-8') as f:
+        sentences = f.read().split('\n\n')[:5]
+    lines = []
+    for sentence in sentences:
+        for line in sentence.split('\n'):
+            cols = line.split('\t')
+            if len(cols) == 10 and cols[0].isdigit():
+                cols[8] = cols[6] + ':' + cols[7]
+            lines.append('\t'.join(cols))
+        lines.append('')
+    path = tmp_path / 'copy.conllu'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    def run(**kwargs):
+        output = io.StringIO()
+        Validator(lang='cs', level=3, output=output, args=argparse.Namespace(**kwargs)).validate_files([str(path)])
+        return [x for x in output.getvalue().splitlines() if x.startswith('[Line ')]
+    full = run()
+    testids = sorted(set(re.search(r'\]: \[L\d \w+ ([\w-]+)\]', x).group(1) for x in full))
+    assert 'edeps-identical-to-basic-trees' in testids
+    for testid in testids:
+        assert run(include_only=[testid]) == [x for x in full if f' {testid}]' in x]
@@ -0,0 +1,50 @@
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.registry import IdSet, IdMap
+except ModuleNotFoundError:
+    from udtools.registry import IdSet, IdMap
+import pickle
+import random
+
+def test_idset():
+    # IdSet behaves like set, also after it grows and after pickling.
+    ids = IdSet()
+    expected = set()
+    rng = random.Random(1)
+    for i in range(5000):
+        x = f'train-s{rng.randint(0, 8000)}'
+        assert (x in ids) == (x in expected)
+        ids.add(x)
+        expected.add(x)
+    assert len(ids) == len(expected)
+    assert set(ids) == expected
+    ids = pickle.loads(pickle.dumps(ids))
+    assert set(ids) == expected
+    assert not 'train-s8001' in ids and not None in ids
+    other = IdSet(['ščř', 'train-s8001'])
+    assert ids.isdisjoint(other) and other.isdisjoint(ids)
+    ids |= other
+    assert 'ščř' in ids and not ids.isdisjoint(other)
+
+def test_idmap():
+    # IdMap behaves like dict.
+    lastalt = IdMap()
+    lastalt['pud/n01001'] = None
+    lastalt['pud/n01002'] = 1
+    lastalt['pud/n01002'] = 2
+    assert 'pud/n01001' in lastalt and lastalt['pud/n01001'] == None
+    assert lastalt['pud/n01002'] == 2
+    assert len(lastalt) == 2
+    other = IdMap([('pud/n01003', 1), ('pud/n01001', 3)])
+    assert not lastalt.keys().isdisjoint(other)
+    lastalt.update(pickle.loads(pickle.dumps(other)))
+    assert dict(lastalt.items()) == {'pud/n01001': 3, 'pud/n01002': 2, 'pud/n01003': 1}
+    try:
+        lastalt['pud/n01004']
+        assert False
+    except KeyError:
+        pass
@@ -0,0 +1,101 @@
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.sentence import Sentence, SentenceContext
+except ModuleNotFoundError:
+    from udtools.sentence import Sentence, SentenceContext
+import glob
+import os
+import pytest
+
+TEST_CASES = os.path.join(os.path.dirname(__file__), 'test-cases')
+
+def read_sentences(path):
+    with open(path, encoding='utf-8') as f:
+        for block in f.read().split('\n\n'):
+            lines = [l for l in block.split('\n') if l]
+            if any(not l.startswith('#') for l in lines):
+                yield lines
+
+def describe(node):
+    return (node.ord, node.form, node.lemma, node.upos, node.xpos, str(node.feats),
+            dict(node.feats), node.deprel, node.udeprel, dict(node.misc),
+            node.parent.ord if node.parent else None,
+            [x.ord for x in node.children], [x.ord for x in node.descendants],
+            [(x['parent'].ord, x['deprel']) for x in node.deps], node.raw_deps,
+            node.multiword_token.ord_range if node.multiword_token else None,
+            node.is_empty(), node.is_root(), node.is_nonprojective())
+
+def test_root():
+    root = Sentence([['1', 'a', 'a', 'X', '_', 'Foreign=Yes', '0', 'root', '0:root', 'Typo']]).root
+    assert root.is_root() and root.ord == 0 and root.parent is None
+    assert root.form == root.upos == root.udeprel == '<ROOT>'
+    node = root.descendants[0]
+    assert node.parent is root and node.root is root
+    assert str(node.feats) == 'Foreign=Yes' and node.feats['Case'] == ''
+    assert node.misc['Typo'] is True and str(root.misc) == '_'
+
+def test_same_as_udapi():
+    reader = pytest.importorskip('udapi.block.read.conllu').Conllu()
+    paths = glob.glob(os.path.join(TEST_CASES, 'valid', '*.conllu'))
+    paths.append(os.path.join(TEST_CASES, 'eval', 'cs_pud-gold.conllu'))
+    for path in paths:
+        for lines in read_sentences(path):
+            table = [l.split('\t') for l in lines if not l.startswith('#')]
+            udapi_tree = reader.read_tree_from_lines(lines)
+            tree = Sentence(table).root
+            assert [describe(n) for n in tree.descendants_and_empty] == [describe(n) for n in udapi_tree.descendants_and_empty]
+
+def test_projectivity_index():
+    # The projectivity index gives the same answers as collecting the
+    # subtrees (the way the tests used to do it), on random trees.
+    import random
+    rnd = random.Random(1)
+    for n in list(range(1, 12)) * 30 + [60] * 20:
+        heads = [0] * (n + 1)
+        order = list(range(1, n + 1))
+        rnd.shuffle(order)
+        for k, i in enumerate(order):
+            heads[i] = order[rnd.randrange(k)] if k else 0
+        root = Sentence([[str(i), 'x', 'x', 'X', '_', '_', str(heads[i]), 'dep' if heads[i] else 'root', '_', '_']
+                         for i in range(1, n + 1)]).root
+        nodes = root.descendants
+        def dominated(i):
+            return set(x.ord for x in nodes[i-1].descendants)
+        for node in nodes:
+            i, h = node.ord, heads[node.ord]
+            ancestors = set()
+            a = h
+            while a:
+                ancestors.add(a)
+                a = heads[a]
+            ancestors.add(0)
+            gap = [j for j in range(min(i, h) + 1, max(i, h)) if h and j not in dominated(h)]
+            assert [x.ord for x in node.get_gap()] == gap
+            assert node.is_nonprojective() == bool(gap)
+            crossing = [j for j in range(1, n + 1) if min(j, heads[j]) < i < max(j, heads[j]) and heads[j] not in ancestors]
+            assert [x.ord for x in node.get_crossing()] == crossing
+
+def test_sentence_context():
+    # The context gives the same answers as the nodes themselves.
+    for path in glob.glob(os.path.join(TEST_CASES, 'valid', '*.conllu')):
+        for lines in read_sentences(path):
+            table = [l.split('\t') for l in lines if not l.startswith('#')]
+            linenos = {cols[0]: 100 + k for k, cols in enumerate(table)}
+            root = Sentence(table).root
+            context = SentenceContext(root, linenos)
+            for node in root.descendants_and_empty:
+                assert context.lineno(node) == linenos[str(node.ord)]
+                assert context.udeprel(node) == node.udeprel
+                assert context.feats(node) is node.feats and context.misc(node) is node.misc
+            for node in [root] + root.descendants:
+                assert set(context.child_udeprels(node)) == set(x.udeprel for x in node.children)
+                for udeprel in context.child_udeprels(node):
+                    assert context.children(node, udeprel) == [x for x in node.children if x.udeprel == udeprel]
+                assert context.children(node, 'nonexistent') == []
+                if not node.is_root() and node.descendants and node.descendants[-1].ord > node.ord:
+                    last = node.descendants[-1]
+                    assert context.span(node, last) == [x for x in root.descendants if node.ord <= x.ord <= last.ord]
@@ -0,0 +1,98 @@
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI and then called
+# from udtools import Validator.
+try:
+    from udtools.src.udtools.validator import Validator
+    from udtools.src.udtools.server import ValidationServer
+except ModuleNotFoundError:
+    from udtools.validator import Validator
+    from udtools.server import ValidationServer
+import json
+import os
+import threading
+import urllib.request
+
+def test_server():
+    gold = os.path.join(os.path.dirname(__file__), 'test-cases', 'eval', 'cs_pud-gold.conllu')
+    with open(gold, encoding='utf-8') as f:
+        text = '\n\n'.join(f.read().split('\n\n')[:3]) + '\n\n'
+    server = ValidationServer(('localhost', 0), Validator(lang='cs', output=None, jobs=1))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    def post(path, data=''):
+        url = f'http://localhost:{server.server_address[1]}{path}'
+        with urllib.request.urlopen(url, data=data.encode('utf-8')) as response:
+            return json.loads(response.read())
+    try:
+        # Requests without session are validated from scratch.
+        for i in range(2):
+            response = post('/validate', text)
+            assert response['passed'] and response['incidents'] == []
+        # Requests in a session are validated as one treebank.
+        assert post('/validate?session=a', text)['passed']
+        response = post('/validate?session=a', text)
+        assert not response['passed']
+        assert {x['testid'] for x in response['incidents']} == {'non-unique-sent-id', 'non-unique-parallel-id'}
+        assert post('/end?session=a')['incidents'] == []
+        assert post('/validate?session=a', text)['passed']
+        # The language and the level can be chosen for each request.
+        response = post('/validate?lang=ud&level=4', text)
+        assert {x['testid'] for x in response['incidents']} >= {'feature-unknown', 'unknown-deprel'}
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_server_options(tmp_path):
+    # The options of batch validation do not apply to the validators of the
+    # server, and an unexpected error gives a response with status 500.
+    import argparse
+    import urllib.error
+    args = argparse.Namespace(jobs=4, incremental=str(tmp_path), profile_checks=True)
+    server = ValidationServer(('localhost', 0), Validator(lang='cs', output=None, args=args, jobs=1, incremental=False, profile_checks=False), args)
+    validator = server.get_validator('ud', 4)
+    assert validator.jobs == 1 and validator.cache is None and validator.profiler is None
+    def fail(*args):
+        raise RuntimeError('broken test')
+    validator.validate_file_handle = fail
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        url = f'http://localhost:{server.server_address[1]}/validate?lang=ud&level=4'
+        try:
+            urllib.request.urlopen(url, data=b'x')
+            assert False
+        except urllib.error.HTTPError as e:
+            assert e.code == 500
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_serve_entry_points(tmp_path, monkeypatch):
+    # The validate.py script and udvalidate start the server with a validator
+    # that does not take over the options of batch validation.
+    import importlib
+    import sys
+    monkeypatch.setenv('UDTOOLS_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(sys, 'argv', ['validate.py', '--lang', 'cs', '--serve', '0', '--jobs', '4', '--incremental', '--profile-checks'])
+    tested = 0
+    for name in ('validate', 'udtools.cli'):
+        try:
+            module = importlib.import_module(name)
+        except ModuleNotFoundError:
+            continue
+        served = []
+        monkeypatch.setattr(module, 'serve', lambda validator, address, args: served.append(validator) or 0)
+        assert module.main() == 0
+        validator = served[0]
+        assert validator.jobs == 1 and validator.cache is None and validator.profiler is None
+        tested += 1
+    assert tested
+    # Only the snapshot of the data is in the cache, no sentences.
+    assert [x.name for x in tmp_path.iterdir() if not x.name.startswith('data-')] == []
@@ -0,0 +1,106 @@
+# Allow using this module from the root folder of tools even if it is not
+# installed as a package: use the relative path udtools/src/udtools for
+# submodules. If the path is not available, try the standard qualification,
+# assuming that the user has installed udtools from PyPI.
+import io
+import os
+import pytest
+try:
+    import udtools.src.udtools.udeval as udeval
+except ModuleNotFoundError:
+    import udtools.udeval as udeval
+
+EVAL = os.path.join(os.path.dirname(__file__), 'test-cases', 'eval')
+GOLD = os.path.join(EVAL, 'cs_pud-gold.conllu')
+SYSTEM = os.path.join(EVAL, 'cs_pud-udpipe-pdtc-ud-2.17-251125.conllu')
+
+def test_evaluate():
+    # The scores of the UDPipe output are those in eval.txt.
+    evaluation = udeval.evaluate(udeval.load_conllu_file(GOLD), udeval.load_conllu_file(SYSTEM))
+    with open(os.path.join(EVAL, 'eval.txt'), encoding='utf-8') as f:
+        assert udeval.build_evaluation_table(evaluation, verbose=True, enhanced=True) == f.read().rstrip('\n')
+    assert (evaluation['MLAS'].correct, evaluation['MLAS'].gold_total, evaluation['MLAS'].aligned_total) == (8872, 11930, 11894)
+
+
+def test_evaluate_enhanced():
+    # ELAS requires the same enhanced relation including its subtypes,
+    # EULAS only the same universal relation.
+    gold = ('1\tPes\tpes\tNOUN\t_\t_\t2\tnsubj\t2:nsubj\t_\n'
+            '2\tštěká\tštěkat\tVERB\t_\t_\t0\troot\t0:root\t_\n'
+            '3\tna\tna\tADP\t_\t_\t4\tcase\t4:case\t_\n'
+            '4\tkočku\tkočka\tNOUN\t_\t_\t2\tobl\t2:obl:na:acc\t_\n\n')
+    system = gold.replace('2:obl:na:acc', '2:obl:na').replace('3\tna\tna', '3\tna\t_').replace('\tcase\t', '\tmark\t')
+    evaluation = udeval.evaluate(udeval.load_conllu(io.StringIO(gold), 'gold', {}),
+                                 udeval.load_conllu(io.StringIO(system), 'system', {}))
+    assert [evaluation[x].correct for x in ('ELAS', 'EULAS', 'LAS', 'Lemmas', 'CLAS', 'MLAS', 'BLEX')] == [3, 4, 3, 3, 3, 2, 3]
+
+
+def test_evaluate_systems(tmp_path):
+    # The gold data are loaded once and the system files are evaluated in
+    # worker processes with the same results as by evaluate(). A file that
+    # cannot be evaluated does not stop the others.
+    gold_ud = udeval.load_conllu_file(GOLD)
+    missing = str(tmp_path / 'missing.conllu')
+    evaluations = udeval.evaluate_systems(gold_ud, [SYSTEM, GOLD, missing], jobs=2)
+    expected = udeval.evaluate(gold_ud, udeval.load_conllu_file(SYSTEM))
+    assert [vars(evaluations[0][x]) for x in udeval.METRICS] == [vars(expected[x]) for x in udeval.METRICS]
+    assert all(evaluations[1][x].f1 == 1.0 for x in udeval.METRICS)
+    assert isinstance(evaluations[2], OSError)
+    table = udeval.build_systems_table([SYSTEM, GOLD, missing], evaluations).splitlines()
+    assert len(table) == 5 and table[3].endswith('100.00') and 'ERROR' in table[4]
+
+
+def test_evaluate_enhancements():
+    # ELAS and EULAS of several enhancement profiles, computed in one run
+    # over files loaded once, are the same as when the files are loaded
+    # with the filters of each profile.
+    with open(GOLD, encoding='utf-8') as f:
+        gold = f.read()
+    # The system output differs from the gold data in some subtypes.
+    system = gold.replace(':nom\t', '\t').replace('obl:arg', 'obl')
+    profiles = ['0', '2', '4', '5', '6', '123456']
+    evaluation = udeval.evaluate(udeval.load_conllu(io.StringIO(gold), 'gold', {}),
+                                 udeval.load_conllu(io.StringIO(system), 'system', {}), enhancements=profiles)
+    for profile in profiles:
+        treebank_type = udeval.enhancement_type(profile)
+        expected = udeval.evaluate(udeval.load_conllu(io.StringIO(gold), 'gold', treebank_type),
+                                   udeval.load_conllu(io.StringIO(system), 'system', treebank_type))
+        for metric in ('ELAS', 'EULAS'):
+            assert vars(evaluation['{}[{}]'.format(metric, profile)]) == vars(expected[metric])
+    assert evaluation['ELAS[0]'].correct < evaluation['EULAS[0]'].correct == evaluation['EULAS[0]'].gold_total
+    assert evaluation['ELAS[6]'].gold_total == evaluation['ELAS[0]'].gold_total > evaluation['ELAS[2]'].gold_total
+
+
+def test_evaluator():
+    # Sentence-by-sentence evaluation in memory gives the same scores as
+    # evaluate() on the whole files, and the evaluator can be used again.
+    with open(GOLD, encoding='utf-8') as f:
+        gold = f.read()
+    system = gold.replace('\tobl:arg\t', '\tobj\t').replace('\tADJ\t', '\tNOUN\t')
+    sentences = [x.split('\n') for x in system.split('\n\n') if x.strip()]
+    evaluator = udeval.Evaluator(GOLD, enhancements=['0', '2'])
+    expected = udeval.evaluate(udeval.load_conllu_file(GOLD), udeval.load_conllu(io.StringIO(system), 'system', {}), ['0', '2'])
+    for repeat in range(2):
+        for lines in sentences:
+            evaluator.add_system_sentence(lines)
+        scores = evaluator.scores()
+        assert {x: vars(y) for x, y in scores.items()} == {x: vars(y) for x, y in expected.items()}
+        assert scores['LAS'].f1 < 1.0
+        evaluator.reset()
+    with pytest.raises(udeval.UDError):
+        evaluator.scores()
+    with pytest.raises(udeval.UDError):
+        evaluator.add_system_sentence(sentences[1])
+
+
+def test_evaluator_udapi():
+    # Udapi trees (with multiword tokens) are evaluated like their lines.
+    udapi_conllu = pytest.importorskip('udapi.block.read.conllu')
+    with open(SYSTEM, encoding='utf-8') as f:
+        sentences = [x.split('\n') for x in f.read().split('\n\n')[:20]]
+    gold = [x for x in sentences if any(line.split('\t')[0].count('-') for line in x)][:5]
+    assert gold
+    evaluator = udeval.Evaluator(gold)
+    for lines in gold:
+        evaluator.add_system_sentence(udapi_conllu.Conllu().read_tree_from_lines(lines))
+    assert all(x.f1 == 1.0 for x in evaluator.scores().values() if x.gold_total)
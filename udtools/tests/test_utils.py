@@ -5,9 +5,13 @@
 # from udtools import Validator.
 try:
     import udtools.src.udtools.utils as utils
+    from udtools.src.udtools.sentence import Sentence
 except ModuleNotFoundError:
     import udtools.utils as utils
-from udapi.core.node import Node
+    from udtools.sentence import Sentence
+
+def Node(ord, form='_', lemma='_', misc='_'):
+    return Sentence([[str(ord+1), form, lemma, '_', '_', '_', '0', 'root', '_', misc]]).root.descendants[0]
 
 def test_parse_empty_node_id():
     empty_node = ["1.2", "_", "_", "_", "_", "_", "_", "_", "_", "_"]
@@ -52,3 +56,22 @@ def test_deps_list():
     line_w_deps = ["_", "_", "_", "_", "_", "_", "_", "_", "0:root|2:conj", "_"]
     assert utils.deps_list(line_wo_deps) == []
     assert utils.deps_list(line_w_deps) == [["0", "root"], ["2", "conj"]]
+
+def test_is_nfc():
+    assert utils.is_nfc('1\tPes\tpes\tNOUN')
+    assert utils.is_nfc('1\tkôň\tkôň\tNOUN\n2\t.')
+    assert not utils.is_nfc('1\tkôn\tkôn\tNOUN')
+    assert not utils.is_nfc('# text = ok\n1\tkôn')
+
+def test_has_suspicious_whitespace():
+    line = '1\tPes\tpes\tNOUN\t_\t_\t0\troot\t_\t_'
+    assert not utils.has_suspicious_whitespace(line)
+    assert not utils.has_suspicious_whitespace(line + '\n' + line.replace('Pes', 'Peň'))
+    # Every character that check_whitespace() would report is found.
+    for c in utils.OTHER_WHITESPACE:
+        assert utils.has_suspicious_whitespace(line + '\n' + line.replace('pes', 'p' + c + 's'))
+        assert utils.has_suspicious_whitespace(line.replace('Pes', 'Peň') + '\n' + line.replace('root', 'root' + c))
+    # Empty columns.
+    assert utils.has_suspicious_whitespace(line.replace('pes', ''))
+    assert utils.has_suspicious_whitespace(line[1:])
+    assert utils.has_suspicious_whitespace(line[:-1] + '\n' + line)
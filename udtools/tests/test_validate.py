@@ -5,8 +5,42 @@
 # from udtools import Validator.
 try:
     from udtools.src.udtools.validator import Validator
+    from udtools.src.udtools.incident import Error, Reference, jlenc
+    from udtools.src.udtools.state import State, ChunkState
+    from udtools.src.udtools.compression import open_text
+    import udtools.src.udtools.udeval as udeval
+    import udtools.src.udtools.utils as utils
 except ModuleNotFoundError:
     from udtools.validator import Validator
+    from udtools.incident import Error, Reference, jlenc
+    from udtools.state import State, ChunkState
+    from udtools.compression import open_text
+    import udtools.udeval as udeval
+    import udtools.utils as utils
+import argparse
+import bz2
+import glob
+import gzip
+import io
+import json
+import lzma
+import os
+import pickle
+import threading
+
+TEST_CASES = os.path.join(os.path.dirname(__file__), 'test-cases')
+GOLD = os.path.join(TEST_CASES, 'eval', 'cs_pud-gold.conllu')
+SYSTEM = os.path.join(TEST_CASES, 'eval', 'cs_pud-udpipe-pdtc-ud-2.17-251125.conllu')
+
+# The tests of whole files use samples of the evaluation data: the first n
+# sentences of a file, written to a temporary file.
+def read_sample(path, n):
+    with open(path, encoding='utf-8') as f:
+        return f.read().split('\n\n')[:n]
+
+def write_sample(path, sentences):
+    path.write_text('\n\n'.join(sentences) + '\n\n', encoding='utf-8')
+    return str(path)
 
 def test_mwt_empty_vals():
     True
@@ -18,3 +52,245 @@ def test_mwt_empty_vals():
 #    assert len(validator.check_mwt_empty_vals(['2','_','_','_','_','_','_','_','_','Feat=Val'], 4)) > 0
 #    assert len(validator.check_mwt_empty_vals(['2-3','_','_','_','_','Gender=Masc','_','_','_','Feat=Val'], 5)) > 0
 #    assert len(validator.check_mwt_empty_vals(['2-3','_','_','ADJ','_','_','_','_','_','Feat=Val'], 6)) > 0
+
+
+def test_parallel_validation(tmp_path):
+    # Parallel validation must give the same output as one process, even if
+    # some chunks depend on the preceding ones (the second half repeats the
+    # sentence ids of the first half).
+    sentences = read_sample(GOLD, 40)
+    path = write_sample(tmp_path / 'sample.conllu', sentences + sentences)
+    outputs = []
+    for jobs in (1, 2):
+        output = io.StringIO()
+        validator = Validator(lang='cs', output=output, jobs=jobs)
+        validator.chunk_size = 7
+        state = validator.validate_files([path])
+        outputs.append(output.getvalue() + str(state))
+    assert 'non-unique-sent-id' in outputs[0]
+    assert outputs[0] == outputs[1]
+    # The validator is sent to the worker processes.
+    assert pickle.loads(pickle.dumps(validator)).lang == 'cs'
+
+
+def test_parallel_chunks_in_flight(tmp_path, monkeypatch):
+    # The input is not read more than 2 * jobs chunks ahead of the results
+    # that have been taken from the workers.
+    path = write_sample(tmp_path / 'sample.conllu', read_sample(GOLD, 60))
+    read = []
+    next_sentence = utils.next_sentence
+    def counted_next_sentence(state, inp):
+        for lines in next_sentence(state, inp):
+            read.append(1)
+            yield lines
+    monkeypatch.setattr(utils, 'next_sentence', counted_next_sentence)
+    read_before_merge = []
+    merge_chunk = Validator.merge_chunk
+    def recorded_merge_chunk(self, *args):
+        read_before_merge.append(len(read))
+        return merge_chunk(self, *args)
+    monkeypatch.setattr(Validator, 'merge_chunk', recorded_merge_chunk)
+    validator = Validator(lang='cs', output=None, jobs=2)
+    validator.chunk_size = 3
+    validator.validate_files([path])
+    assert len(read_before_merge) == 20
+    assert max(n - 3 * k for k, n in enumerate(read_before_merge)) <= 4 * 3
+
+
+def test_lazy_messages():
+    # Messages given as functions are formatted only for incidents that are
+    # stored or printed.
+    formatted = []
+    def message():
+        formatted.append(1)
+        return 'Formatted message.'
+    state = State()
+    config = {'output': None, 'max_store': 1}
+    for i in range(3):
+        Error(state=state, config=config, lineno=i+1, message=message).confirm()
+    assert len(formatted) == 1
+    assert len(state.error_tracker) == 1
+    assert state.error_tracker[0].message == 'Formatted message.'
+    incident = state.error_tracker[0]
+    assert state.error_counter[incident.get_type()][incident.testclass] == 3
+    # Incidents from worker processes are pickled with their chunk state.
+    incident = Error(state=ChunkState(), config=config, lineno=1, message=message)
+    assert pickle.loads(pickle.dumps(incident)).message == 'Formatted message.'
+    # Delayed incidents (waiting for the first feature) are formatted at
+    # once, so that they do not keep their sentence in memory.
+    state = State()
+    validator = Validator(lang='ud', level=3, output=None)
+    validator.validate_sentence(['# sent_id = 1', '# text = it', '1\tit\tit\tPRON\t_\t_\t0\troot\t_\t_', ''], state)
+    delayed = state.delayed_feature_errors['pron-det-without-prontype']['occurrences'][0]['incident']
+    assert delayed._message == "The word 'it' is tagged 'PRON' but it lacks the 'PronType' feature"
+
+
+def test_threads(tmp_path):
+    # Validators in parallel threads, sharing the same data, must give the
+    # same output as one after another.
+    paths = [write_sample(tmp_path / os.path.basename(x), read_sample(x, 100)) for x in (GOLD, SYSTEM)] * 2
+    data = Validator(lang='cs').data
+    def validate(path, results, i):
+        output = io.StringIO()
+        state = Validator(lang='cs', output=output, data=data).validate_files([path])
+        results[i] = output.getvalue() + str(state)
+    expected = [None] * 4
+    for i, path in enumerate(paths):
+        validate(path, expected, i)
+    results = [None] * 4
+    threads = [threading.Thread(target=validate, args=(path, results, i)) for i, path in enumerate(paths)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == expected
+
+
+def test_profile_checks(tmp_path):
+    # The profiler attributes every incident to exactly one check.
+    path = write_sample(tmp_path / 'sample.conllu', read_sample(SYSTEM, 300))
+    validator = Validator(lang='cs', output=None, profile_checks=True)
+    state = validator.validate_files([path])
+    stats = validator.profiler.stats
+    assert stats['check_feature_values'][0] == '4'
+    assert stats['check_feature_values'][1] == stats['check_deprels'][1] > 0
+    assert sum(sum(x[3].values()) for x in stats.values()) == sum(sum(x.values()) for x in state.error_counter.values()) > 0
+    output = io.StringIO()
+    validator.profiler.report(file=output)
+    assert 'check_single_subject' in output.getvalue()
+
+
+def test_jsonl_output():
+    # The JSON Lines output has one record per printed incident, with the
+    # same information as the text output.
+    text = io.StringIO()
+    jsonl = io.StringIO()
+    args = argparse.Namespace(format='text', max_err=10)
+    Validator(lang='cs', output=text, args=args).validate_files([SYSTEM])
+    args = argparse.Namespace(format='jsonl', max_err=10)
+    state = Validator(lang='cs', output=jsonl, args=args).validate_files([SYSTEM])
+    lines = [x for x in text.getvalue().splitlines() if x.startswith('[Line ')]
+    records = [json.loads(x) for x in jsonl.getvalue().splitlines()]
+    assert len(records) == len(lines) > 0
+    assert all(x['message'] in y for x, y in zip(records, lines))
+    assert sum(1 for x in records if x['explanation']) == len(state.explanation_printed)
+    summary = json.loads(json.dumps(state.summary()))
+    assert not summary['passed']
+    assert summary['errors'] == sum(summary['errors_by_class'].values()) > 0
+    # The fast formatting gives the same JSON as the encoder.
+    reference = Reference(filename='a.conllu', lineno=2, sentid='s1', nodeid=1, comment='Předchozí výskyt.')
+    incident = Error(state=State(), config={}, lineno=3, message='Quote " and tab \t.', explanation='E.', references=[reference])
+    assert incident.jsonl() == jlenc.encode(incident.dict())
+
+
+def test_incremental(tmp_path, monkeypatch):
+    # Incremental validation gives the same output as validation from
+    # scratch, and only the sentences that have changed are tested again.
+    sentences = read_sample(SYSTEM, 200)
+    path = tmp_path / 'sample.conllu'
+    def validate(**kwargs):
+        output = io.StringIO()
+        validator = Validator(lang='cs', output=output, **kwargs)
+        tested = []
+        validate_chunk = Validator.validate_chunk
+        def counted_validate_chunk(self, *args):
+            tested.append(1)
+            return validate_chunk(self, *args)
+        monkeypatch.setattr(Validator, 'validate_chunk', counted_validate_chunk)
+        validator.validate_files([str(path)])
+        monkeypatch.undo()
+        return output.getvalue(), len(tested)
+    cachedir = str(tmp_path / 'cache')
+    write_sample(path, sentences)
+    expected, _ = validate()
+    assert validate(incremental=cachedir) == (expected, 200)
+    assert validate(incremental=cachedir) == (expected, 0)
+    # Remove a sentence (the following sentences move up), and repeat
+    # another one (its sentence id is no longer unique).
+    del sentences[10]
+    sentences.insert(50, sentences[100])
+    write_sample(path, sentences)
+    expected, _ = validate()
+    assert 'non-unique-sent-id' in expected
+    assert validate(incremental=cachedir) == (expected, 0)
+
+
+def test_compressed_input(tmp_path):
+    # Compressed files are recognized by their contents, not by their names,
+    # and validated the same way as the uncompressed file (including the
+    # test of the line breaks).
+    text = '\n\n'.join(read_sample(GOLD, 30)) + '\n\n'
+    text = text.replace('\troot\t', '\tnsubj\t', 1).replace('\n', '\r\n', 5)
+    data = text.encode('utf-8')
+    paths = {'plain': tmp_path / 'sample.conllu'}
+    paths['plain'].write_bytes(data)
+    for module in (gzip, lzma, bz2):
+        paths[module.__name__] = tmp_path / f'sample-{module.__name__}'
+        paths[module.__name__].write_bytes(module.compress(data))
+    validator = Validator(lang='cs', output=None)
+    results = {}
+    for name, path in paths.items():
+        state = validator.validate_files([str(path)])
+        results[name] = [(x.lineno, x.testid) for x in state.error_tracker]
+    assert 'non-unix-newline' in [testid for lineno, testid in results['plain']]
+    assert results['gzip'] == results['lzma'] == results['bz2'] == results['plain']
+    # The evaluator reads compressed files, too.
+    with open_text(str(paths['lzma']), threaded=True) as inp:
+        assert inp.read() == text.replace('\r\n', '\n')
+    assert len(udeval.load_conllu_file(str(paths['gzip'])).words) == len(udeval.load_conllu_file(str(paths['plain'])).words)
+
+
+def test_node_dispatch():
+    # Calling only the tests that the dispatchers select for each node must
+    # give the same incidents as calling every test for every node.
+    paths = sorted(glob.glob(os.path.join(TEST_CASES, 'invalid-level3', '*.conllu')) + glob.glob(os.path.join(TEST_CASES, 'invalid-level4-5', 'cs_*.conllu')))
+    assert paths
+    total = 0
+    for path in paths:
+        results = []
+        for dispatch in (True, False):
+            validator = Validator(lang='cs', level=5, output=None, max_store=10000)
+            if not dispatch:
+                for dispatcher in validator.get_node_dispatchers():
+                    dispatcher.checks = [(check, None, None) for check, udeprels, upos in dispatcher.checks]
+            state = validator.validate_files([path])
+            results.append([(x.lineno, x.testid, x.nodeid, x.message) for x in state.error_tracker])
+        assert results[0] == results[1], path
+        total += len(results[0])
+    assert total > 0
+    # A test overridden without the declaration is called for every node.
+    calls = []
+    class MyValidator(Validator):
+        def check_orphan(self, state, node, context):
+            calls.append(node.ord)
+    lines = ['# sent_id = 1', '# text = a b', '1\ta\ta\tX\t_\t_\t0\troot\t_\t_', '2\tb\tb\tX\t_\t_\t1\tdep\t_\t_']
+    MyValidator(lang='ud', level=3, output=None).validate_sentence(lines)
+    assert calls == [1, 2]
+
+
+def test_coref_mentions():
+    # Mentions are closed by their entity id even if they are not well nested,
+    # and nothing about the mentions is kept after the end of the sentence.
+    def sentence(sentid, entities):
+        lines = [f'# sent_id = {sentid}', '# text = ' + ' '.join(['w'] * len(entities))]
+        for i in range(len(entities)):
+            lines.append(f'{i+1}\tw\tw\tX\t_\t_\t{0 if i == 0 else 1}\t{"root" if i == 0 else "dep"}\t_\t{entities[i]}')
+        return lines + ['']
+    validator = Validator(lang='ud', level=2, check_coref=True, output=None, max_store=100)
+    state = State()
+    validator.validate_sentence(['# newdoc id = d', '# global.Entity = eid-etype-head-other'] + sentence('1', ['Entity=(e1-person-1(e2-place-1', 'Entity=e1)', 'Entity=e2)']), state)
+    assert [x.testid for x in state.error_tracker] == ['ill-nested-entities-warning']
+    assert not state.open_entity_mentions and not state.open_entity_mentions_by_beid
+    assert state.entity_mention_spans == {}
+    # Mentions in different sentences do not cross, even if the sentences
+    # have the same sent_id.
+    validator.validate_sentence(sentence('2', ['_', 'Entity=(e1-person-1', 'Entity=e1)', '_']), state)
+    validator.validate_sentence(sentence('2', ['_', '_', 'Entity=(e1-person-1', 'Entity=e1)']), state)
+    assert [x.testid for x in state.error_tracker][1:] == ['non-unique-sent-id']
+    validator.validate_sentence(sentence('3', ['Entity=(e1-person-1', 'Entity=(e1-person-1)', 'Entity=e1)(e1-person-1', 'Entity=e1)']), state)
+    # The mentions of e1 cross each other.
+    assert [x.testid for x in state.error_tracker][2:] == ['crossing-mentions-same-entity']
+    # A mention that is still open is closed at the end of the sentence.
+    validator.validate_sentence(sentence('4', ['Entity=(e3-person-1', 'Entity=(e1-person-1', 'Entity=e1)']), state)
+    assert [x.testid for x in state.error_tracker][3:] == ['cross-sentence-mention']
+    assert not state.open_entity_mentions and not state.open_entity_mentions_by_beid
@@ -7,6 +7,8 @@ import sys
 # is installed as a package.
 from udtools.src.udtools.validator import Validator
 from udtools.src.udtools.argparser import parse_args_validator
+from udtools.src.udtools.server import serve
+from udtools.src.udtools.incident import jlenc
 ###!!!import logging
 ###!!!import udtools.src.udtools.logging_utils as logging_utils
 
@@ -24,12 +26,33 @@ from udtools.src.udtools.argparser import parse_args_validator
 def main():
     args = parse_args_validator()
     ###!!!logger.info("Arguments: \n%s", logging_utils.pprint(vars(args)))
-    validator = Validator(lang=args.lang, level=args.level, max_store=10, args=args)
-    state = validator.validate_files(args.input)
+    if args.serve:
+        validator = Validator(lang=args.lang, level=args.level, output=None, args=args,
+                              jobs=1, incremental=False, profile_checks=False)
+        return serve(validator, args.serve, args)
+    if args.format == 'jsonl':
+        # Machine-readable output goes to a buffered stream on stdout; it is
+        # flushed once at the end (or whenever the buffer is full).
+        output = open(sys.stdout.fileno(), 'w', encoding='utf-8', buffering=1<<16, closefd=False)
+    else:
+        output = sys.stderr
+    validator = Validator(lang=args.lang, level=args.level, max_store=10, args=args, output=output)
+    if args.pstats:
+        import cProfile
+        profile = cProfile.Profile()
+        state = profile.runcall(validator.validate_files, args.input, sent_ids=args.sent_id, linenos=args.line)
+        profile.dump_stats(args.pstats)
+    else:
+        state = validator.validate_files(args.input, sent_ids=args.sent_id, linenos=args.line)
+    if validator.profiler:
+        validator.profiler.report(file=sys.stderr)
     # Summarize the warnings and errors.
-    summary = str(state)
-    if not args.quiet:
-        print(summary, file=sys.stderr)
+    if args.format == 'jsonl':
+        if not args.quiet:
+            output.write(jlenc.encode(state.summary()) + '\n')
+        output.close()
+    elif not args.quiet:
+        print(str(state), file=sys.stderr)
     if state.passed():
         return 0
     else: